@@ -12,692 +12,4405 @@ This Flask application demonstrates:
 
 This showcases how a containerized application interacts with Kubernetes features.
 """
-from flask import Flask, jsonify, render_template_string, request, redirect, url_for
+from flask import Flask, Request, Response, request, redirect, send_file, g
+from html import escape as html_escape
+from urllib.parse import quote, urlencode
+from werkzeug.exceptions import HTTPException
+from werkzeug.http import http_date, is_resource_modified, quote_etag
 import os
+import re
+import stat
+import shutil
+import hashlib
 import socket
 import datetime
 import json
+import codecs
+import select
+import io
+import collections
+import bisect
+import array
+import mmap
+import struct
+import zlib
+import importlib.util
+import tarfile
+import base64
+import concurrent.futures
+import contextlib
+import gzip
+import tempfile
 import logging
-import uuid
-import platform
-import psutil  # For resource usage statistics
+import logging.handlers
+import queue
+import atexit
+import functools
+import heapq
+import itertools
+import math
 import time
 import threading
 import sys
 
+# Startup timing - with STARTUP_REPORT=1 the time spent in each stage of
+# loading this module is printed once it has loaded. The imports themselves
+# can be profiled with: python -X importtime -c "import app"
+STARTUP_REPORT = os.environ.get('STARTUP_REPORT', '') == '1'
+startup_marks = [('', time.perf_counter())]
+
+def mark_startup(stage):
+    """Record that a stage of module loading has finished"""
+    startup_marks.append((stage, time.perf_counter()))
+
+def startup_report():
+    """Return [(stage, milliseconds)] for each stage recorded so far"""
+    return [(stage, (finished - startup_marks[i][1]) * 1000)
+            for i, (stage, finished) in enumerate(startup_marks[1:])]
+
 # Initialize Flask application
 app = Flask(__name__)
 
-# Set up logging to print to console and file
-log_dir =os.environ.get("LOG_PATH", "/logs")
-if os.path.isdir(log_dir):
-    log_file = os.path.join(log_dir, "app.log")
-else:
-    log_file = log_dir
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s -%(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler(log_file)
-    ]
-)
-logger = logging.getLogger('k8s-master-app')
+# Logging is configured once the metrics registry exists (see "Logging
+# pipeline" below) so that dropped log records can be counted
+logger = logging.getLogger('k8s-master-app')
+
+# Read configuration from environment variables (from ConfigMaps)
+APP_NAME = os.environ.get('APP_NAME', 'k8s-master-app')
+APP_VERSION = os.environ.get('APP_VERSION', '1.0.0')
+ENVIRONMENT = os.environ.get('ENVIRONMENT', 'development')
+DATA_PATH = os.environ.get('DATA_PATH', '/data')
+CONFIG_PATH = os.environ.get('CONFIG_PATH', '/config')
+LOG_PATH = os.environ.get('LOG_PATH', '/logs')
+
+# Read secrets from environment variables (from Secrets)
+# In a real app, these would be more sensitive values like API keys
+SECRET_KEY = os.environ.get('SECRET_KEY', 'default-dev-key')
+DB_PASSWORD = os.environ.get('DB_PASSWORD', 'default-password')
+
+# Generate a unique instance ID to demonstrate statelessness
+INSTANCE_ID = os.urandom(4).hex()
+
+@functools.lru_cache(maxsize=None)
+def host_facts():
+    """
+    Facts about the host that cannot change while the process runs.
+    Computed on first use - platform and psutil are only imported then -
+    and cached afterwards.
+    """
+    import platform
+    import psutil
+    return {
+        'hostname': socket.gethostname(),
+        'platform': platform.platform(),
+        'python_version': platform.python_version(),
+        'cpu_count': psutil.cpu_count()
+    }
+
+mark_startup('configuration')
+
+# Track request count and application metrics
+start_time = time.time()
+
+# When several worker processes serve the app (e.g. gunicorn), point this at a
+# directory shared by all of them and each worker publishes its metrics into
+# an mmap'd file there so /api/metrics can report totals across workers.
+# The directory should be emptied before the workers start.
+METRICS_MULTIPROC_DIR = os.environ.get('METRICS_MULTIPROC_DIR', '')
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class ShardedValues:
+    """
+    A fixed-size list of numbers with one shard per writing thread.
+    Each thread only ever adds to its own shard, so increments take no lock;
+    the shards are summed when the value is read. Shards of threads that have
+    exited are folded into a retired total, which keeps the shard list short
+    under the thread-per-request development server.
+    """
+    def __init__(self, size=1):
+        self._size = size
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards = []
+        self._retired = [0] * size
+        self._retire_at = 64
+
+    def shard(self):
+        """Return the calling thread's shard, creating it on first use"""
+        try:
+            return self._local.shard
+        except AttributeError:
+            pass
+        shard = [0] * self._size
+        with self._lock:
+            if len(self._shards) >= self._retire_at:
+                self._retire_dead_shards()
+                self._retire_at = max(64, 2 * len(self._shards))
+            self._shards.append((threading.current_thread(), shard))
+        self._local.shard = shard
+        return shard
+
+    def _retire_dead_shards(self):
+        # Callers hold self._lock. A thread that is no longer alive cannot
+        # write to its shard again, so folding it in loses nothing.
+        live = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                live.append((thread, shard))
+            else:
+                for i, value in enumerate(shard):
+                    self._retired[i] += value
+        self._shards = live
+
+    def values(self):
+        """Sum all shards into a single list"""
+        with self._lock:
+            self._retire_dead_shards()
+            totals = list(self._retired)
+            for _, shard in self._shards:
+                for i, value in enumerate(shard):
+                    totals[i] += value
+        return totals
+
+class Metric:
+    """Base class for a named metric family with optional labels"""
+    type_name = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, **labelvalues):
+        """Return the child metric for the given label values"""
+        key = tuple(str(labelvalues[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def children(self):
+        """Return (label pairs, child) for every label combination seen so far"""
+        return [(tuple(zip(self.labelnames, key)), child)
+                for key, child in list(self._children.items())]
+
+    def reset(self):
+        """Drop all values, e.g. in a freshly forked worker"""
+        self._lock = threading.Lock()
+        self._children = {}
+
+    def samples(self):
+        """Return this family's samples as (sample name, label pairs, value)"""
+        if not self.labelnames:
+            # Report unlabelled metrics even before their first update
+            self.labels()
+        samples = []
+        for labels, child in self.children():
+            samples.extend(child.samples(self.name, labels))
+        return samples
+
+    # Unlabelled metrics behave like their single child
+    def __getattr__(self, attr):
+        if attr.startswith('_') or self.labelnames:
+            raise AttributeError(attr)
+        return getattr(self.labels(), attr)
+
+class CounterChild:
+    """A monotonically increasing count"""
+    def __init__(self):
+        self._values = ShardedValues(1)
+
+    def inc(self, amount=1):
+        self._values.shard()[0] += amount
+
+    def value(self):
+        return self._values.values()[0]
+
+    def samples(self, name, labels):
+        return [(name, labels, self.value())]
+
+class Counter(Metric):
+    type_name = 'counter'
+
+    def _new_child(self):
+        return CounterChild()
+
+    def local_total(self, sample_name):
+        """This process's count summed over every label set"""
+        return sum(child.value() for _, child in self.children())
+
+class GaugeChild:
+    """A value that can go up and down, e.g. requests in flight"""
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def set(self, value):
+        self._value = value
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+    def value(self):
+        return self._value
+
+    def samples(self, name, labels):
+        return [(name, labels, self._value)]
+
+class Gauge(Metric):
+    type_name = 'gauge'
+
+    def _new_child(self):
+        return GaugeChild()
+
+class HistogramChild:
+    """Observations counted into fixed buckets, plus their sum"""
+    def __init__(self, buckets):
+        self._buckets = buckets
+        # One slot per bucket, one for +Inf and one for the running sum
+        self._values = ShardedValues(len(buckets) + 2)
+
+    def observe(self, value):
+        shard = self._values.shard()
+        shard[bisect.bisect_left(self._buckets, value)] += 1
+        shard[-1] += value
+
+    def samples(self, name, labels):
+        values = self._values.values()
+        samples = []
+        cumulative = 0
+        for upper, count in zip(self._buckets + (float('inf'),), values):
+            cumulative += count
+            le = '+Inf' if upper == float('inf') else repr(upper)
+            samples.append((name + '_bucket', labels + (('le', le),), cumulative))
+        samples.append((name + '_count', labels, cumulative))
+        samples.append((name + '_sum', labels, values[-1]))
+        return samples
+
+    def count_and_sum(self):
+        values = self._values.values()
+        return sum(values[:-1]), values[-1]
+
+class Histogram(Metric):
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return HistogramChild(self.buckets)
+
+    def local_total(self, sample_name):
+        """This process's _count or _sum summed over every label set"""
+        position = 0 if sample_name.endswith('_count') else 1
+        return sum(child.count_and_sum()[position] for _, child in self.children())
+
+class MmapSamples:
+    """
+    Append-only key -> float64 store kept in an mmap'd file.
+    Each worker process owns one file and is its only writer; other workers
+    read it to merge totals. Layout: an 8-byte "bytes used" header followed
+    by entries of [4-byte key length][key, padded to 8 bytes][8-byte value].
+    """
+    _HEADER = struct.Struct('<Q')
+    _KEY_LENGTH = struct.Struct('<I')
+    _VALUE = struct.Struct('<d')
+
+    def __init__(self, path, capacity=64 * 1024):
+        self.path = path
+        self._positions = {}
+        self._file = open(path, 'w+b')
+        self._file.truncate(capacity)
+        self._map = mmap.mmap(self._file.fileno(), capacity)
+        self._used = self._HEADER.size
+        self._HEADER.pack_into(self._map, 0, self._used)
+
+    def write(self, key, value):
+        """Store value under key, appending a new entry the first time"""
+        position = self._positions.get(key)
+        if position is None:
+            position = self._append(key)
+        self._VALUE.pack_into(self._map, position, value)
+
+    def _append(self, key):
+        encoded = key.encode('utf-8')
+        padded = len(encoded) + (-(self._KEY_LENGTH.size + len(encoded)) % 8)
+        entry_size = self._KEY_LENGTH.size + padded + self._VALUE.size
+        if self._used + entry_size > len(self._map):
+            capacity = max(2 * len(self._map), self._used + entry_size)
+            self._file.truncate(capacity)
+            self._map.resize(capacity)
+        self._KEY_LENGTH.pack_into(self._map, self._used, len(encoded))
+        key_start = self._used + self._KEY_LENGTH.size
+        self._map[key_start:key_start + len(encoded)] = encoded
+        position = key_start + padded
+        self._VALUE.pack_into(self._map, position, 0.0)
+        # Publish the entry only once it is fully written
+        self._used += entry_size
+        self._HEADER.pack_into(self._map, 0, self._used)
+        self._positions[key] = position
+        return position
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    @classmethod
+    def read(cls, path):
+        """Yield (key, value) for every entry in another process's file"""
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) < cls._HEADER.size:
+            return
+        used = min(cls._HEADER.unpack_from(data, 0)[0], len(data))
+        offset = cls._HEADER.size
+        while offset + cls._KEY_LENGTH.size <= used:
+            length = cls._KEY_LENGTH.unpack_from(data, offset)[0]
+            key_start = offset + cls._KEY_LENGTH.size
+            padded = length + (-(cls._KEY_LENGTH.size + length) % 8)
+            position = key_start + padded
+            if position + cls._VALUE.size > used:
+                break
+            yield data[key_start:key_start + length].decode('utf-8'), cls._VALUE.unpack_from(data, position)[0]
+            offset = position + cls._VALUE.size
+
+class MetricsRegistry:
+    """
+    Holds the application's metric families.
+    In multi-process mode publish() copies this process's samples into its
+    mmap file and collect() merges in the files written by the other workers.
+    Counters and histograms are summed over every file, including those of
+    workers that have exited; gauges only over workers that are still alive.
+    collect() reads every file, so the pages that only need a few totals use
+    total(), which adds the other workers' totals as of the last sync().
+    """
+    def __init__(self, multiproc_dir=''):
+        self._metrics = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.multiproc_dir = multiproc_dir
+        self._store = None
+        self._store_pid = None
+        # (sample name) -> the other workers' summed counter and histogram totals
+        self._other_totals = {}
+        if multiproc_dir:
+            # A forked worker starts from zero; whatever the parent counted
+            # is already in the parent's own file
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+
+    def _reset_after_fork(self):
+        self._lock = threading.Lock()
+        self._other_totals = {}
+        for metric in self.metrics():
+            metric.reset()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Duplicate metric: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def metrics(self):
+        return list(self._metrics.values())
+
+    def _store_for_this_process(self):
+        # Files are per pid, so a forked worker opens its own rather than
+        # writing into its parent's
+        pid = os.getpid()
+        if self._store_pid != pid:
+            self._store = MmapSamples(os.path.join(self.multiproc_dir, f'metrics_{pid}.db'))
+            self._store_pid = pid
+        return self._store
+
+    def publish(self):
+        """Write this process's samples to its mmap file (multi-process mode only)"""
+        if not self.multiproc_dir:
+            return
+        with self._lock:
+            store = self._store_for_this_process()
+            for metric in self.metrics():
+                for sample_name, labels, value in metric.samples():
+                    store.write(json.dumps([metric.name, sample_name, labels]), value)
+
+    def sync(self):
+        """
+        Scheduled job: publish this process's samples and refresh the cached
+        totals of the other workers (multi-process mode only)
+        """
+        if not self.multiproc_dir:
+            return
+        self.publish()
+        totals = {}
+        for _, path in self._other_processes():
+            try:
+                entries = list(MmapSamples.read(path))
+            except OSError:
+                continue
+            for key, value in entries:
+                metric_name, sample_name, _ = json.loads(key)
+                metric = self._metrics.get(metric_name)
+                if metric is None or metric.type_name not in ('counter', 'histogram'):
+                    continue
+                totals[sample_name] = totals.get(sample_name, 0) + value
+        self._other_totals = totals
+
+    def total(self, metric, sample_name=None):
+        """
+        A counter, or a histogram's _count or _sum sample, summed over every
+        label set: this process's current value plus the other workers'
+        """
+        sample_name = sample_name or metric.name
+        return metric.local_total(sample_name) + self._other_totals.get(sample_name, 0)
+
+    def _other_processes(self):
+        """Yield (pid, path) for every other worker's metrics file"""
+        own = os.getpid()
+        for filename in os.listdir(self.multiproc_dir):
+            if filename.startswith('metrics_') and filename.endswith('.db'):
+                try:
+                    pid = int(filename[len('metrics_'):-len('.db')])
+                except ValueError:
+                    continue
+                if pid != own:
+                    yield pid, os.path.join(self.multiproc_dir, filename)
+
+    def collect(self):
+        """
+        Return {metric name: {(sample name, label pairs): value}} with the
+        values of every thread, and in multi-process mode every worker, merged.
+        """
+        merged = collections.OrderedDict()
+        for metric in self.metrics():
+            family = merged[metric.name] = collections.OrderedDict()
+            for sample_name, labels, value in metric.samples():
+                family[(sample_name, labels)] = value
+
+        if self.multiproc_dir:
+            for pid, path in self._other_processes():
+                alive = pid_alive(pid)
+                try:
+                    entries = list(MmapSamples.read(path))
+                except OSError:
+                    continue
+                for key, value in entries:
+                    metric_name, sample_name, labels = json.loads(key)
+                    metric = self._metrics.get(metric_name)
+                    if metric is None or (metric.type_name == 'gauge' and not alive):
+                        continue
+                    sample_key = (sample_name, tuple(tuple(pair) for pair in labels))
+                    family = merged[metric_name]
+                    family[sample_key] = family.get(sample_key, 0) + value
+        return merged
+
+def pid_alive(pid):
+    """Return True if a process with this pid exists"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+registry = MetricsRegistry(METRICS_MULTIPROC_DIR)
+# Reads no longer publish, so a worker's last counts go out as it exits
+atexit.register(registry.publish)
+mark_startup('metrics registry')
+REQUESTS = registry.counter('app_requests_total', 'Index page requests served')
+ERRORS = registry.counter('app_errors_total', 'Errors while handling requests')
+DATA_READS = registry.counter('app_data_reads_total', 'Successful reads from the mounted volumes')
+DATA_WRITES = registry.counter('app_data_writes_total', 'Successful writes to the data volume')
+
+# Logging pipeline - request threads only put records on a bounded queue; a
+# single listener thread writes them out in batches and flushes once per
+# batch. When the queue is full, LOG_QUEUE_POLICY decides whether to drop the
+# record ('drop') or make the request thread wait up to LOG_BLOCK_TIMEOUT
+# seconds for space ('block'). Dropped records are counted either way.
+LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', '10000'))
+LOG_QUEUE_POLICY = os.environ.get('LOG_QUEUE_POLICY', 'drop')
+LOG_BLOCK_TIMEOUT = float(os.environ.get('LOG_BLOCK_TIMEOUT', '0.5'))
+LOG_BATCH_SIZE = int(os.environ.get('LOG_BATCH_SIZE', '256'))
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s -%(message)s'
+FILE_OPERATIONS_LOGGER = 'k8s-master-app.file-operations'
+
+LOG_RECORDS_DROPPED = registry.counter('app_log_records_dropped_total', 'Log records dropped because the log queue was full')
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that applies the drop/block policy when the queue is full"""
+    def __init__(self, log_queue, policy=LOG_QUEUE_POLICY, block_timeout=LOG_BLOCK_TIMEOUT):
+        super().__init__(log_queue)
+        self.policy = policy
+        self.block_timeout = block_timeout
+
+    def enqueue(self, record):
+        try:
+            if self.policy == 'block':
+                self.queue.put(record, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+class BatchFlushMixin:
+    """Skip the flush after every record; the listener calls flush_batch()"""
+    def flush(self):
+        pass
+
+    def flush_batch(self):
+        super().flush()
+
+class BatchStreamHandler(BatchFlushMixin, logging.StreamHandler):
+    pass
+
+class BatchFileHandler(BatchFlushMixin, logging.FileHandler):
+    pass
+
+class BatchQueueListener(logging.handlers.QueueListener):
+    """QueueListener that drains up to LOG_BATCH_SIZE records before flushing"""
+    def _monitor(self):
+        log_queue = self.queue
+        has_task_done = hasattr(log_queue, 'task_done')
+        stopping = False
+        while not stopping:
+            batch = [self.dequeue(True)]
+            while len(batch) < LOG_BATCH_SIZE:
+                try:
+                    batch.append(self.dequeue(False))
+                except queue.Empty:
+                    break
+            for record in batch:
+                if record is self._sentinel:
+                    stopping = True
+                else:
+                    self.handle(record)
+                if has_task_done:
+                    log_queue.task_done()
+            for handler in self.handlers:
+                try:
+                    handler.flush_batch()
+                except Exception as e:
+                    sys.stderr.write(f"Error flushing log handler: {str(e)}\n")
+
+    def stop(self):
+        # Safe to call twice (e.g. explicitly and again at exit)
+        if self._thread is not None:
+            super().stop()
+
+    def enqueue_sentinel(self):
+        # The queue may be full; wait for the listener to make room
+        self.queue.put(self._sentinel)
+
+def setup_logging():
+    """
+    Route all logging through the queue. Records wait in the queue until
+    start_log_listener() starts the thread that writes them out.
+    """
+    # Log to LOG_PATH/app.log when LOG_PATH is a directory, otherwise treat it as the log file
+    log_dir = os.environ.get("LOG_PATH", "/logs")
+    if os.path.isdir(log_dir):
+        log_file = os.path.join(log_dir, "app.log")
+    else:
+        log_file = log_dir
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    console_handler = BatchStreamHandler(sys.stdout)
+    # delay=True opens app.log when the first record is written, on the listener thread
+    file_handler = BatchFileHandler(log_file, delay=True)
+    for handler in (console_handler, file_handler):
+        handler.setFormatter(formatter)
+        handler.addFilter(lambda record: record.name != FILE_OPERATIONS_LOGGER)
+
+    # file_operations.log keeps one open handle instead of reopening it per write
+    operations_handler = BatchFileHandler(os.path.join(LOG_PATH, 'file_operations.log'), delay=True)
+    operations_handler.setFormatter(logging.Formatter('%(message)s'))
+    operations_handler.addFilter(logging.Filter(FILE_OPERATIONS_LOGGER))
+
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    queue_handler = BoundedQueueHandler(log_queue)
+    # Only merge the message with its args here; the listener's handlers
+    # apply the real formats
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    logging.basicConfig(level=logging.INFO, handlers=[queue_handler])
+    file_operations_logger.addHandler(queue_handler)
+    file_operations_logger.propagate = False
+
+    listener = BatchQueueListener(log_queue, console_handler, file_handler, operations_handler,
+                                  respect_handler_level=True)
+    return queue_handler, listener
+
+def start_log_listener():
+    """Start the thread that writes queued log records in this process"""
+    global log_listener
+    if log_listener._thread is not None:
+        # Inherited from the parent process, whose listener thread does not
+        # exist here - give this process its own queue and listener
+        log_queue_handler.queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        log_listener = BatchQueueListener(log_queue_handler.queue, *log_listener.handlers,
+                                          respect_handler_level=True)
+    log_listener.start()
+
+def stop_log_listener():
+    """Write out whatever is still queued; runs when the process exits"""
+    log_listener.stop()
+
+file_operations_logger = logging.getLogger(FILE_OPERATIONS_LOGGER)
+log_queue_handler, log_listener = setup_logging()
+atexit.register(stop_log_listener)
+mark_startup('logging')
+
+def application_metrics():
+    """Return the application counters, merged across threads and workers"""
+    def total(metric):
+        return int(registry.total(metric))
+
+    return {
+        'requests': total(REQUESTS),
+        'errors': total(ERRORS),
+        'data_reads': total(DATA_READS),
+        'data_writes': total(DATA_WRITES),
+        'log_records_dropped': total(LOG_RECORDS_DROPPED),
+        'upload_bytes': total(UPLOAD_BYTES),
+        'uploads': int(registry.total(UPLOAD_DURATION, UPLOAD_DURATION.name + '_count')),
+        'upload_seconds': registry.total(UPLOAD_DURATION, UPLOAD_DURATION.name + '_sum'),
+        'compression_input_bytes': total(COMPRESSION_INPUT_BYTES),
+        'compression_output_bytes': total(COMPRESSION_OUTPUT_BYTES),
+        'view_cache_hits': total(VIEW_CACHE_HITS),
+        'view_cache_misses': total(VIEW_CACHE_MISSES),
+        'view_cache_evictions': total(VIEW_CACHE_EVICTIONS)
+    }
+
+# Per-route latency, recorded by the request hooks below
+HTTP_LATENCY = registry.histogram(
+    'http_request_duration_seconds',
+    'Time spent handling a request, by endpoint and status code',
+    ('endpoint', 'status')
+)
+
+@app.before_request
+def start_request_timer():
+    """Remember when the request started so after_request can time it"""
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_latency(response):
+    """Record the request's latency in the per-endpoint, per-status histogram"""
+    started = g.get('request_start')
+    if started is not None:
+        HTTP_LATENCY.labels(
+            endpoint=request.endpoint or 'unmatched',
+            status=response.status_code
+        ).observe(time.perf_counter() - started)
+    return response
+
+# Admission control - expensive endpoints get a limit on how many requests
+# may run at once and, optionally, a token bucket limiting their rate. A
+# request over a limit is turned away at once (503 when the route is busy,
+# 429 when it is over its rate, both with Retry-After) instead of queueing
+# behind the others. ADMISSION_MAX_INFLIGHT caps the limited requests running
+# in the process as a whole; server.py sets it one below the threads per
+# worker, so a thread is always left for the exempt endpoints - above all
+# /api/health, which the liveness probe must always be able to reach.
+# Long-lived endpoints (the log stream) hold their slot for the whole
+# connection, so ADMISSION_SEPARATE gives them their own limit outside that
+# cap; server.py adds that many threads per worker for them.
+#
+# Limits are "endpoint=N,..." and rates "endpoint=per_second:burst,..."
+# using the Flask endpoint names (index, view_file, files_batch, ...).
+ADMISSION_CONCURRENCY = os.environ.get(
+    'ADMISSION_CONCURRENCY', 'index=8,view_file=16,files_batch=4,files_batch_read=4,search=8')
+ADMISSION_SEPARATE = os.environ.get('ADMISSION_SEPARATE', 'stream_log=2')
+ADMISSION_RATES = os.environ.get('ADMISSION_RATES', '')
+ADMISSION_MAX_INFLIGHT = int(os.environ.get('ADMISSION_MAX_INFLIGHT', '0'))
+ADMISSION_EXEMPT = frozenset(
+    e.strip() for e in os.environ.get('ADMISSION_EXEMPT', 'health_check,prometheus_metrics').split(',') if e.strip())
+
+ADMISSION_REJECTED = registry.counter(
+    'app_admission_rejected_total', 'Requests turned away by admission control', ('endpoint', 'reason'))
+
+def parse_admission_spec(spec):
+    """'a=1,b=2:4' -> {'a': '1', 'b': '2:4'}"""
+    limits = {}
+    for item in spec.split(','):
+        if item.strip():
+            endpoint, _, value = item.partition('=')
+            limits[endpoint.strip()] = value.strip()
+    return limits
+
+class TokenBucket:
+    """Allows `rate` requests a second on average, with bursts of up to `burst`"""
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self):
+        """Take a token; returns 0 on success, else the seconds until one is available"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+class AdmissionController:
+    """
+    Per-endpoint concurrency limits and token buckets, plus a cap on the
+    total. Endpoints in `separate` have only their own limit and do not count
+    towards the total.
+    """
+    def __init__(self, concurrency, rates, max_inflight=0, exempt=(), separate=None):
+        self.limits = {endpoint: int(value) for endpoint, value in concurrency.items()}
+        separate = separate or {}
+        self.limits.update((endpoint, int(value)) for endpoint, value in separate.items())
+        self.separate = frozenset(separate)
+        self.buckets = {}
+        for endpoint, value in rates.items():
+            rate, _, burst = value.partition(':')
+            self.buckets[endpoint] = TokenBucket(float(rate), float(burst or rate))
+        self.max_inflight = max_inflight
+        self.exempt = frozenset(exempt)
+        self.inflight = collections.Counter()
+        self.total = 0
+        self._lock = threading.Lock()
+
+    def admit(self, endpoint):
+        """
+        Decide whether a request to endpoint may run. Returns None if it may
+        (release() must be called when it finishes), or (status, reason,
+        retry_after seconds) if it is turned away.
+        """
+        if endpoint in self.exempt:
+            return None
+        bucket = self.buckets.get(endpoint)
+        if bucket is not None:
+            wait = bucket.take()
+            if wait:
+                ADMISSION_REJECTED.labels(endpoint=endpoint, reason='rate').inc()
+                return 429, 'rate', wait
+        limit = self.limits.get(endpoint)
+        separate = endpoint in self.separate
+        with self._lock:
+            if limit is not None and self.inflight[endpoint] >= limit:
+                reason = 'concurrency'
+            elif not separate and self.max_inflight and self.total >= self.max_inflight:
+                reason = 'capacity'
+            else:
+                self.inflight[endpoint] += 1
+                if not separate:
+                    self.total += 1
+                return None
+        ADMISSION_REJECTED.labels(endpoint=endpoint, reason=reason).inc()
+        return 503, reason, 1.0
+
+    def release(self, endpoint):
+        if endpoint in self.exempt:
+            return
+        with self._lock:
+            self.inflight[endpoint] -= 1
+            if endpoint not in self.separate:
+                self.total -= 1
+
+    def status(self):
+        with self._lock:
+            return {
+                'max_inflight': self.max_inflight or None,
+                'inflight': self.total,
+                'endpoints': {endpoint: {'inflight': self.inflight[endpoint],
+                                         'limit': self.limits.get(endpoint),
+                                         'separate': endpoint in self.separate,
+                                         'rate': self.buckets[endpoint].rate if endpoint in self.buckets else None}
+                              for endpoint in sorted(set(self.limits) | set(self.buckets) | set(+self.inflight))}
+            }
+
+def rejection_document(endpoint, reason):
+    if reason == 'rate':
+        return {'error': f"Too many requests to {endpoint}; slow down"}
+    return {'error': f"Server busy ({reason} limit reached for {endpoint}); try again shortly"}
+
+admission = AdmissionController(parse_admission_spec(ADMISSION_CONCURRENCY), parse_admission_spec(ADMISSION_RATES),
+                                ADMISSION_MAX_INFLIGHT, ADMISSION_EXEMPT, parse_admission_spec(ADMISSION_SEPARATE))
+
+@app.before_request
+def admit_request():
+    """Turn the request away now if its endpoint is over a limit"""
+    endpoint = request.endpoint or 'unmatched'
+    rejected = admission.admit(endpoint)
+    if rejected is not None:
+        status, reason, retry_after = rejected
+        return json_response(rejection_document(endpoint, reason), status,
+                             {'Retry-After': str(math.ceil(retry_after))})
+    g.admitted = endpoint
+
+@app.after_request
+def release_streamed_admission(response):
+    """
+    A streamed body is still being produced after the view returns, so it
+    keeps its slot until the server closes it. File downloads from
+    send_file() are direct_passthrough: the server may send them without
+    ever calling close(), so like every other response they are released
+    by teardown_request instead.
+    """
+    if response.is_streamed and not response.direct_passthrough:
+        endpoint = g.pop('admitted', None)
+        if endpoint is not None:
+            response.call_on_close(functools.partial(admission.release, endpoint))
+    return response
+
+@app.teardown_request
+def release_admission(exc):
+    endpoint = g.pop('admitted', None)
+    if endpoint is not None:
+        admission.release(endpoint)
+
+# Prometheus text exposition format (version 0.0.4). Scrapes are frequent, so
+# the "# HELP/# TYPE" headers and each sample's "name{labels} " prefix are
+# rendered once and cached; a scrape only formats the numbers.
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+exposition_headers = {}
+exposition_prefixes = {}
+
+def escape_label_value(value):
+    """Escape a label value as required by the exposition format"""
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def exposition_header(metric):
+    header = exposition_headers.get(metric.name)
+    if header is None:
+        documentation = metric.documentation.replace('\\', '\\\\').replace('\n', '\\n')
+        header = f"# HELP {metric.name} {documentation}\n# TYPE {metric.name} {metric.type_name}\n"
+        exposition_headers[metric.name] = header
+    return header
+
+def exposition_prefix(sample_name, labels):
+    key = (sample_name, labels)
+    prefix = exposition_prefixes.get(key)
+    if prefix is None:
+        if labels:
+            rendered = ','.join(f'{name}="{escape_label_value(value)}"' for name, value in labels)
+            prefix = f"{sample_name}{{{rendered}}} "
+        else:
+            prefix = sample_name + ' '
+        exposition_prefixes[key] = prefix
+    return prefix
+
+def format_sample_value(value):
+    if isinstance(value, float):
+        if value.is_integer():
+            return str(int(value))
+        return repr(value)
+    return str(value)
+
+def render_prometheus():
+    """Render every metric in the registry as Prometheus exposition text"""
+    collected = registry.collect()
+    buffer = io.StringIO()
+    write = buffer.write
+    for metric in registry.metrics():
+        samples = collected.get(metric.name)
+        if not samples:
+            continue
+        write(exposition_header(metric))
+        for (sample_name, labels), value in samples.items():
+            write(exposition_prefix(sample_name, labels))
+            write(format_sample_value(value))
+            write('\n')
+    return buffer.getvalue()
+
+# JSON encoding - API responses are serialised with orjson when it is
+# installed and with the stdlib json module otherwise (JSON_ENCODER=stdlib
+# forces the fallback). Both produce compact UTF-8 bytes and turn datetime
+# values into ISO 8601 strings, so payloads carry datetimes instead of
+# formatting them while the document is built.
+JSON_ENCODER = os.environ.get('JSON_ENCODER', 'auto')
+
+def json_default(value):
+    """Encode the types the json modules don't handle themselves"""
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+stdlib_json_encoder = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False, default=json_default)
+
+def stdlib_json_dumps(value):
+    return stdlib_json_encoder.encode(value).encode('utf-8')
+
+@functools.lru_cache(maxsize=None)
+def json_backend():
+    """Return (name, dumps) for the encoder in use; orjson is imported on first use"""
+    if JSON_ENCODER in ('auto', 'orjson'):
+        try:
+            import orjson
+        except ImportError:
+            if JSON_ENCODER == 'orjson':
+                logger.warning("JSON_ENCODER=orjson but orjson is not installed; using the stdlib encoder")
+        else:
+            return 'orjson', functools.partial(orjson.dumps, default=json_default)
+    return 'json', stdlib_json_dumps
+
+def json_dumps(value):
+    """Serialise value to compact JSON bytes with the fastest available encoder"""
+    return json_backend()[1](value)
+
+def json_response(value, status=200, headers=None):
+    """A JSON response built with json_dumps() instead of jsonify()"""
+    return app.response_class(json_dumps(value), status=status, headers=headers, mimetype='application/json')
+
+# Response compression - compressible responses (HTML, CSS, JSON, NDJSON,
+# metrics text) are compressed with the best encoding the client accepts.
+# gzip is always available; br and zstd are used when the brotli or zstandard
+# package is installed. Bodies under COMPRESS_MIN_SIZE are sent as they are,
+# streamed bodies (such as /view-file pages) are compressed chunk by chunk,
+# and static assets are compressed once at the highest level and cached.
+COMPRESS_ENCODINGS = [e.strip() for e in os.environ.get('COMPRESS_ENCODINGS', 'zstd,br,gzip').split(',') if e.strip()]
+COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', '1024'))
+GZIP_LEVEL = int(os.environ.get('GZIP_LEVEL', '6'))
+BROTLI_QUALITY = int(os.environ.get('BROTLI_QUALITY', '4'))
+ZSTD_LEVEL = int(os.environ.get('ZSTD_LEVEL', '3'))
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'application/javascript',
+                      'application/xml', 'image/svg+xml')
+
+COMPRESSION_INPUT_BYTES = registry.counter(
+    'http_compression_input_bytes_total', 'Response bytes before compression', ('encoding',))
+COMPRESSION_OUTPUT_BYTES = registry.counter(
+    'http_compression_output_bytes_total', 'Response bytes after compression', ('encoding',))
+
+class GzipEncoder:
+    """
+    Incremental gzip stream. compress() buffers as zlib sees fit, chunk()
+    also flushes so the output so far can be sent, finish() ends the stream.
+    """
+    def __init__(self, static=False):
+        self._compressor = zlib.compressobj(9 if static else GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def chunk(self, data):
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+class BrotliEncoder:
+    """Incremental brotli stream (see GzipEncoder)"""
+    def __init__(self, static=False):
+        import brotli
+        self._compressor = brotli.Compressor(quality=11 if static else BROTLI_QUALITY)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def chunk(self, data):
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+class ZstdEncoder:
+    """Incremental zstd stream (see GzipEncoder)"""
+    def __init__(self, static=False):
+        import zstandard
+        self._flush_block = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        self._compressor = zstandard.ZstdCompressor(level=19 if static else ZSTD_LEVEL).compressobj()
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def chunk(self, data):
+        return self._compressor.compress(data) + self._compressor.flush(self._flush_block)
+
+    def finish(self):
+        return self._compressor.flush()
+
+ENCODERS = {'zstd': (ZstdEncoder, 'zstandard'), 'br': (BrotliEncoder, 'brotli'), 'gzip': (GzipEncoder, None)}
+
+@functools.lru_cache(maxsize=None)
+def available_encodings():
+    """COMPRESS_ENCODINGS whose codec is installed, in order of preference"""
+    return tuple(encoding for encoding in COMPRESS_ENCODINGS
+                 if encoding in ENCODERS and
+                 (ENCODERS[encoding][1] is None or importlib.util.find_spec(ENCODERS[encoding][1])))
+
+@functools.lru_cache(maxsize=256)
+def negotiate_encoding(accept_encoding):
+    """
+    Pick the encoding to use for an Accept-Encoding header value, or None.
+    The highest q-value wins; ties go to the server's preference order.
+    Browsers send a handful of distinct headers, so results are cached.
+    """
+    weights = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.partition(';')
+        name = name.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            weights[name] = q
+    best = None
+    best_q = 0.0
+    for encoding in available_encodings():
+        q = weights.get(encoding, weights.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+def is_compressible(content_type):
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    # Server-sent events go out a few bytes at a time, each flushed on its own
+    if content_type == 'text/event-stream':
+        return False
+    return content_type.startswith('text/') or content_type in COMPRESSIBLE_TYPES
+
+def record_compression(encoding, size_in, size_out):
+    COMPRESSION_INPUT_BYTES.labels(encoding=encoding).inc(size_in)
+    COMPRESSION_OUTPUT_BYTES.labels(encoding=encoding).inc(size_out)
+
+def compress_bytes(encoding, data, static=False):
+    encoder = ENCODERS[encoding][0](static)
+    return encoder.compress(data) + encoder.finish()
+
+def compress_stream(chunks, encoding):
+    """Compress an iterable of str/bytes chunks, flushing after each one"""
+    encoder = ENCODERS[encoding][0]()
+    size_in = size_out = 0
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            if not chunk:
+                continue
+            output = encoder.chunk(chunk)
+            size_in += len(chunk)
+            size_out += len(output)
+            yield output
+        output = encoder.finish()
+        size_out += len(output)
+        yield output
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+        record_compression(encoding, size_in, size_out)
+
+# name -> body of each static asset, registered where the asset is defined
+STATIC_ASSETS = {}
+
+@functools.lru_cache(maxsize=None)
+def precompressed(name, encoding):
+    """A static asset compressed at the encoding's highest level, built once"""
+    return compress_bytes(encoding, STATIC_ASSETS[name], static=True)
+
+def static_asset_body(name, accept_encoding):
+    """Return (body, encoding) for a static asset; encoding is None when sent as-is"""
+    encoding = negotiate_encoding(accept_encoding or '')
+    body = STATIC_ASSETS[name]
+    if encoding is None or len(body) < COMPRESS_MIN_SIZE:
+        return body, None
+    compressed = precompressed(name, encoding)
+    record_compression(encoding, len(body), len(compressed))
+    return compressed, encoding
+
+def static_asset_response(name, mimetype):
+    """A response with a static asset, precompressed when the client accepts it"""
+    body, encoding = static_asset_body(name, request.headers.get('Accept-Encoding'))
+    response = app.response_class(body, mimetype=mimetype)
+    response.vary.add('Accept-Encoding')
+    if encoding is not None:
+        response.headers['Content-Encoding'] = encoding
+    return response, encoding
+
+def warm_precompressed_assets():
+    for name in STATIC_ASSETS:
+        for encoding in available_encodings():
+            precompressed(name, encoding)
+
+@app.after_request
+def compress_response(response):
+    """Compress the body when the client accepts it and it is worth it"""
+    # direct_passthrough responses are file downloads that may use sendfile
+    if (response.direct_passthrough or 'Content-Encoding' in response.headers
+            or response.status_code < 200 or response.status_code in (204, 206, 304)
+            or not is_compressible(response.mimetype)):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate_encoding(request.headers.get('Accept-Encoding', ''))
+    if encoding is None or request.method == 'HEAD':
+        return response
+
+    if response.is_streamed:
+        response.response = compress_stream(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < COMPRESS_MIN_SIZE:
+            return response
+        compressed = compress_bytes(encoding, data)
+        if len(compressed) >= len(data):
+            return response
+        response.set_data(compressed)
+        record_compression(encoding, len(data), len(compressed))
+    response.headers['Content-Encoding'] = encoding
+    # The compressed bytes differ from the original, so a strong ETag no longer holds
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+# Dashboard stylesheet - served separately from /assets/dashboard.css so that
+# browsers cache it instead of receiving it inline with every page view
+DASHBOARD_CSS = """\
+body { 
+    font-family: Arial, sans-serif; 
+    line-height: 1.6; 
+    margin: 0; 
+    padding: 20px; 
+    background-color: #f5f5f5;
+    color: #333;
+}
+h1, h2, h3 { color: #2c3e50; }
+.container { 
+    max-width: 1000px; 
+    margin: 0 auto; 
+    background-color: white;
+    padding: 20px;
+    border-radius: 8px;
+    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+}
+.info-box { 
+    background-color: #f8f9fa; 
+    border-radius: 5px; 
+    padding: 15px; 
+    margin-bottom: 20px; 
+    border-left: 4px solid #3498db;
+}
+.success { color: #27ae60; }
+.error { color: #e74c3c; }
+.warning { color: #f39c12; }
+.info { color: #3498db; }
+.file-list { 
+    background-color: #f9f9f9; 
+    border-radius: 5px; 
+    padding: 10px; 
+    border: 1px solid #ddd;
+}
+.file-item {
+    display: flex;
+    justify-content: space-between;
+    padding: 5px 10px;
+    border-bottom: 1px solid #eee;
+}
+.file-item:last-child {
+    border-bottom: none;
+}
+.nav-links {
+    display: flex;
+    gap: 10px;
+    margin-top: 20px;
+}
+.nav-link {
+    display: inline-block;
+    padding: 8px 16px;
+    background-color: #3498db;
+    color: white;
+    text-decoration: none;
+    border-radius: 4px;
+    font-weight: bold;
+    transition: background-color 0.3s;
+}
+.nav-link:hover {
+    background-color: #2980b9;
+}
+.metrics {
+    display: flex;
+    gap: 10px;
+    flex-wrap: wrap;
+}
+.metric-card {
+    flex: 1;
+    min-width: 120px;
+    background-color: #fff;
+    padding: 15px;
+    border-radius: 8px;
+    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+    text-align: center;
+}
+.metric-value {
+    font-size: 24px;
+    font-weight: bold;
+    margin: 10px 0;
+    color: #3498db;
+}
+.metric-label {
+    font-size: 14px;
+    color: #7f8c8d;
+}
+.badge {
+    display: inline-block;
+    padding: 3px 8px;
+    border-radius: 12px;
+    font-size: 12px;
+    font-weight: bold;
+    color: white;
+    background-color: #95a5a6;
+}
+.badge-primary { background-color: #3498db; }
+.badge-success { background-color: #27ae60; }
+.badge-warning { background-color: #f39c12; }
+.badge-danger { background-color: #e74c3c; }
+"""
+DASHBOARD_CSS_ETAG = hashlib.sha1(DASHBOARD_CSS.encode('utf-8')).hexdigest()[:16]
+DASHBOARD_CSS_MAX_AGE = int(os.environ.get('DASHBOARD_CSS_MAX_AGE', '86400'))
+STATIC_ASSETS['dashboard.css'] = DASHBOARD_CSS.encode('utf-8')
+
+# Dashboard page template source
+DASHBOARD_TEMPLATE_SOURCE = """\
+<!DOCTYPE html>
+<html>
+<head>
+    <title>{{ app_name }} - Kubernetes Master App</title>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <link rel="stylesheet" href="/assets/dashboard.css?v={{ css_version }}">
+</head>
+<body>
+    <div class="container">
+        <h1>{{ app_name }} <span class="badge badge-primary">v{{ app_version }}</span></h1>
+        <p>A comprehensive Kubernetes demonstration application</p>
+
+        <div class="info-box">
+            <h2>Pod Information</h2>
+            <p><strong>Instance ID:</strong> {{ instance_id }}</p>
+            <p><strong>Hostname:</strong> {{ system_info.hostname }}</p>
+            <p><strong>Environment:</strong> <span class="badge badge-success">{{ environment }}</span></p>
+            <p><strong>Request count:</strong> {{ request_count }}</p>
+            <p><strong>Platform:</strong> {{ system_info.platform }}</p>
+            <p><strong>Uptime:</strong> {{ system_info.uptime }}</p>
+        </div>
+
+        <div class="info-box">
+            <h2>Resource Usage</h2>
+            <div class="metrics">
+                <div class="metric-card">
+                    <div class="metric-label">CPU Usage</div>
+                    <div class="metric-value">{{ resource_usage.cpu_percent }}%</div>
+                </div>
+                <div class="metric-card">
+                    <div class="metric-label">Memory</div>
+                    <div class="metric-value">{{ resource_usage.memory_percent }}%</div>
+                </div>
+                <div class="metric-card">
+                    <div class="metric-label">Disk</div>
+                    <div class="metric-value">{{ resource_usage.disk_usage }}</div>
+                </div>
+                <div class="metric-card">
+                    <div class="metric-label">Requests</div>
+                    <div class="metric-value">{{ metrics.requests }}</div>
+                </div>
+            </div>
+        </div>
+
+        <div class="info-box">
+            <h2>Mounted Volumes</h2>
+
+            <h3>Data Volume</h3>
+            <p><strong>Path:</strong> {{ volumes.data.path }}</p>
+            <p><strong>Status:</strong> 
+                {% if volumes.data.status == 'mounted' %}
+                    <span class="success">Successfully mounted</span>
+                {% elif volumes.data.status == 'empty' %}
+                    <span class="warning">Mounted but empty</span>
+                {% else %}
+                    <span class="error">Error: {{ volumes.data.error }}</span>
+                {% endif %}
+            </p>
+
+            {% if volumes.data.files %}
+            <div class="file-list">
+                <h4>Files ({{ volumes.data.count }}):</h4>
+                {% for file in volumes.data.files %}
+                <div class="file-item">
+                    <span>{{ file }}</span>
+                    <a href="/view-file?path={{ volumes.data.path }}/{{ file }}" class="nav-link">View</a>
+                </div>
+                {% endfor %}
+                {% if volumes.data.count > volumes.data.files|length %}
+                <div class="file-item">
+                    <span>Showing {{ volumes.data.files|length }} of {{ volumes.data.count }} files</span>
+                    <a href="/api/volumes/data?page=2" class="nav-link">More</a>
+                </div>
+                {% endif %}
+            </div>
+            {% endif %}
+
+            <h3>Config Volume</h3>
+            <p><strong>Path:</strong> {{ volumes.config.path }}</p>
+            <p><strong>Status:</strong> 
+                {% if volumes.config.status == 'mounted' %}
+                    <span class="success">Successfully mounted</span>
+                {% elif volumes.config.status == 'empty' %}
+                    <span class="warning">Mounted but empty</span>
+                {% else %}
+                    <span class="error">Error: {{ volumes.config.error }}</span>
+                {% endif %}
+            </p>
+
+            {% if volumes.config.files %}
+            <div class="file-list">
+                <h4>Files ({{ volumes.config.count }}):</h4>
+                {% for file in volumes.config.files %}
+                <div class="file-item">
+                    <span>{{ file }}</span>
+                    <a href="/view-file?path={{ volumes.config.path }}/{{ file }}" class="nav-link">View</a>
+                </div>
+                {% endfor %}
+                {% if volumes.config.count > volumes.config.files|length %}
+                <div class="file-item">
+                    <span>Showing {{ volumes.config.files|length }} of {{ volumes.config.count }} files</span>
+                    <a href="/api/volumes/config?page=2" class="nav-link">More</a>
+                </div>
+                {% endif %}
+            </div>
+            {% endif %}
+
+            <h3>Logs Volume</h3>
+            <p><strong>Path:</strong> {{ volumes.logs.path }}</p>
+            <p><strong>Status:</strong> 
+                {% if volumes.logs.status == 'mounted' %}
+                    <span class="success">Successfully mounted</span>
+                {% elif volumes.logs.status == 'empty' %}
+                    <span class="warning">Mounted but empty</span>
+                {% else %}
+                    <span class="error">Error: {{ volumes.logs.error }}</span>
+                {% endif %}
+            </p>
+
+            {% if volumes.logs.files %}
+            <div class="file-list">
+                <h4>Files ({{ volumes.logs.count }}):</h4>
+                {% for file in volumes.logs.files %}
+                <div class="file-item">
+                    <span>{{ file }}</span>
+                    <a href="/view-file?path={{ volumes.logs.path }}/{{ file }}" class="nav-link">View</a>
+                </div>
+                {% endfor %}
+                {% if volumes.logs.count > volumes.logs.files|length %}
+                <div class="file-item">
+                    <span>Showing {{ volumes.logs.files|length }} of {{ volumes.logs.count }} files</span>
+                    <a href="/api/volumes/logs?page=2" class="nav-link">More</a>
+                </div>
+                {% endif %}
+            </div>
+            {% endif %}
+        </div>
+
+        <div class="info-box">
+            <h2>Actions</h2>
+            <div class="nav-links">
+                <a href="/create-file" class="nav-link">Create a File</a>
+                <a href="/api/info" class="nav-link">API Info</a>
+                <a href="/api/health" class="nav-link">Health Check</a>
+                <a href="/api/metrics" class="nav-link">Metrics</a>
+            </div>
+        </div>
+
+        <div class="info-box">
+            <h2>Environment Variables</h2>
+            <p><strong>APP_NAME:</strong> {{ app_name }}</p>
+            <p><strong>APP_VERSION:</strong> {{ app_version }}</p>
+            <p><strong>ENVIRONMENT:</strong> {{ environment }}</p>
+            <p><strong>DATA_PATH:</strong> {{ data_path }}</p>
+            <p><strong>CONFIG_PATH:</strong> {{ config_path }}</p>
+            <p><strong>LOG_PATH:</strong> {{ log_path }}</p>
+            <p><strong>SECRET_KEY:</strong> {{ secret_key|truncate(10, True, '...') }}</p>
+        </div>
+    </div>
+</body>
+</html>
+"""
+
+@functools.lru_cache(maxsize=None)
+def dashboard_template():
+    """
+    Compile the dashboard once per process. render_template_string() would
+    parse and compile the source again on every request. Compiling is left
+    out of the import so it doesn't delay startup; a scheduled job
+    warms it as soon as the process starts serving.
+    """
+    return app.jinja_env.from_string(DASHBOARD_TEMPLATE_SOURCE)
+
+mark_startup('templates')
+
+# Job scheduler - background work (stats sampling, publishing metrics, log
+# rotation, refreshing directory listings) runs as jobs on a small pool of
+# SCHEDULER_THREADS threads instead of each task owning a thread. Jobs wait
+# in a heap ordered by due time; once due they move to a heap ordered by
+# priority, so when every worker is busy the most important due job runs
+# next. Workers sleep on a condition until the next job is due, so an idle
+# process is not woken up for nothing.
+SCHEDULER_THREADS = int(os.environ.get('SCHEDULER_THREADS', '2'))
+# Lower numbers run first when several jobs are due at once
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 10
+PRIORITY_LOW = 20
+
+JOB_QUEUE_DEPTH = registry.gauge(
+    'scheduler_queue_depth', 'Jobs waiting in the scheduler, by state (scheduled or ready to run)', ('state',))
+JOB_LAG = registry.histogram(
+    'scheduler_job_lag_seconds', 'Time from when a job was due until it started', ('job',),
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0))
+JOB_DURATION = registry.histogram('scheduler_job_duration_seconds', 'Time spent running a job', ('job',))
+JOB_FAILURES = registry.counter('scheduler_job_failures_total', 'Jobs that raised an exception', ('job',))
+
+class Job:
+    """A call run by a JobScheduler; repeats every `interval` seconds when set"""
+    def __init__(self, scheduler, func, args, name, interval, priority):
+        self.scheduler = scheduler
+        self.func = func
+        self.args = args
+        self.name = name or func.__name__
+        self.interval = interval
+        self.priority = priority
+        self.cancelled = False
+        self.runs = 0
+        self.failures = 0
+        self.last_duration = None
+
+    def cancel(self):
+        self.scheduler.cancel(self)
+
+class JobScheduler:
+    """Runs one-off, delayed and periodic jobs on a pool of worker threads"""
+    def __init__(self, threads=SCHEDULER_THREADS):
+        self.threads = threads
+        self._condition = threading.Condition()
+        # (due, sequence, job) and (priority, due, sequence, job)
+        self._scheduled = []
+        self._ready = []
+        self._sequence = itertools.count()
+        self._periodic = []
+        self._workers = []
+        self._stopped = False
+
+    def submit(self, func, *args, delay=0.0, name=None, priority=PRIORITY_NORMAL):
+        """Run func(*args) once, after `delay` seconds"""
+        return self._add(Job(self, func, args, name, None, priority), delay)
+
+    def every(self, interval, func, *args, delay=None, name=None, priority=PRIORITY_NORMAL):
+        """Run func(*args) every `interval` seconds, first after `delay` (default one interval)"""
+        return self._add(Job(self, func, args, name, interval, priority), interval if delay is None else delay)
+
+    def cancel(self, job):
+        """Stop a job from running again; a run already in progress finishes"""
+        with self._condition:
+            job.cancelled = True
+            self._scheduled = [entry for entry in self._scheduled if entry[-1] is not job]
+            heapq.heapify(self._scheduled)
+            self._ready = [entry for entry in self._ready if entry[-1] is not job]
+            heapq.heapify(self._ready)
+            if job in self._periodic:
+                self._periodic.remove(job)
+            self._record_depth()
+
+    def _add(self, job, delay):
+        with self._condition:
+            if job.interval is not None:
+                self._periodic.append(job)
+            self._push(job, time.monotonic() + delay)
+        return job
+
+    def _push(self, job, due):
+        # Called with the condition held
+        heapq.heappush(self._scheduled, (due, next(self._sequence), job))
+        self._record_depth()
+        self._condition.notify()
+
+    def _record_depth(self):
+        JOB_QUEUE_DEPTH.labels(state='scheduled').set(len(self._scheduled))
+        JOB_QUEUE_DEPTH.labels(state='ready').set(len(self._ready))
+
+    def _next_job(self):
+        """Wait for a due job and return (job, due), or None once stopped"""
+        with self._condition:
+            while not self._stopped:
+                now = time.monotonic()
+                while self._scheduled and self._scheduled[0][0] <= now:
+                    due, sequence, job = heapq.heappop(self._scheduled)
+                    heapq.heappush(self._ready, (job.priority, due, sequence, job))
+                if self._ready:
+                    _, due, _, job = heapq.heappop(self._ready)
+                    self._record_depth()
+                    return job, due
+                self._condition.wait(self._scheduled[0][0] - now if self._scheduled else None)
+            return None
+
+    def _work(self):
+        while True:
+            item = self._next_job()
+            if item is None:
+                return
+            self._run(*item)
+
+    def _run(self, job, due):
+        started = time.monotonic()
+        JOB_LAG.labels(job=job.name).observe(max(0.0, started - due))
+        try:
+            job.func(*job.args)
+        except Exception as e:
+            job.failures += 1
+            JOB_FAILURES.labels(job=job.name).inc()
+            logger.error(f"Job {job.name} failed: {str(e)}")
+        finished = time.monotonic()
+        job.runs += 1
+        job.last_duration = finished - started
+        JOB_DURATION.labels(job=job.name).observe(job.last_duration)
+        if job.interval is not None:
+            with self._condition:
+                if not job.cancelled and not self._stopped:
+                    # Keep to the original schedule, skipping runs that were missed
+                    missed = int((finished - due) // job.interval)
+                    self._push(job, due + (missed + 1) * job.interval)
+
+    def start(self):
+        for number in range(self.threads):
+            worker = threading.Thread(target=self._work, name=f"job-worker-{number}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+        logger.info(f"Job scheduler started with {self.threads} threads")
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+    def status(self):
+        """Queue depths and per-job counts for /api/metrics"""
+        with self._condition:
+            return {
+                'threads': self.threads,
+                'scheduled': len(self._scheduled),
+                'ready': len(self._ready),
+                'periodic_jobs': [{
+                    'name': job.name,
+                    'interval_seconds': job.interval,
+                    'runs': job.runs,
+                    'failures': job.failures,
+                    'last_duration_ms': None if job.last_duration is None else job.last_duration * 1000
+                } for job in self._periodic]
+            }
+
+# Started by start_background_services()
+job_scheduler = None
+
+# Log rotation - a scheduled job renames app.log and file_operations.log to a
+# segment named after the time it was rotated (app.log.20261018-190000) once
+# the file passes LOG_ROTATE_BYTES or has been written for LOG_ROTATE_INTERVAL
+# seconds. The handler reopens the file on its next record. Every worker
+# process writes to the same files, so each one also reopens its file when
+# another process has rotated it away, and segments are gzipped only after
+# LOG_COMPRESS_DELAY, by which time no process is still writing to them.
+# Compression runs on the scheduler, off the request path.
+#
+# LOG_SEGMENT_INDEX in the log directory lists each file's segments with the
+# times they cover, so a log can be read from a given time (see /view-log)
+# without opening every segment. Only one process at a time maintains the
+# segments; the others skip a run while it holds the lock.
+LOG_ROTATE_BYTES = int(os.environ.get('LOG_ROTATE_BYTES', str(10 * 1024 * 1024)))
+LOG_ROTATE_INTERVAL = float(os.environ.get('LOG_ROTATE_INTERVAL', '86400'))
+LOG_BACKUP_COUNT = int(os.environ.get('LOG_BACKUP_COUNT', '5'))
+LOG_ROTATE_CHECK_INTERVAL = float(os.environ.get('LOG_ROTATE_CHECK_INTERVAL', '30'))
+LOG_COMPRESS_DELAY = float(os.environ.get('LOG_COMPRESS_DELAY', str(2 * LOG_ROTATE_CHECK_INTERVAL)))
+LOG_SEGMENT_INDEX = '.log-segments.json'
+LOG_SEGMENT_LOCK = '.log-segments.lock'
+
+LOG_ROTATIONS = registry.counter('app_log_rotations_total', 'Log files rotated into segments', ('file',))
+LOG_SEGMENT_BYTES = registry.counter(
+    'app_log_segment_bytes_total', 'Bytes of rotated log segments before and after compression', ('stage',))
+
+@contextlib.contextmanager
+def segment_index_lock(directory):
+    """Yield True if this process may maintain the log segments in directory now"""
+    try:
+        import fcntl
+    except ImportError:
+        # No flock (not POSIX): there is only one process to consider
+        yield True
+        return
+    with open(os.path.join(directory, LOG_SEGMENT_LOCK), 'a') as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def read_segment_index(directory):
+    """{file name: {'active_since': time, 'segments': [...]}}, oldest segment first"""
+    try:
+        with open(os.path.join(directory, LOG_SEGMENT_INDEX), 'rb') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except ValueError as e:
+        logger.warning(f"Ignoring unreadable log segment index in {directory}: {str(e)}")
+        return {}
+
+def write_segment_index(directory, index):
+    path = os.path.join(directory, LOG_SEGMENT_INDEX)
+    with open(path + '.tmp', 'wb') as f:
+        f.write(json_dumps(index))
+    os.replace(path + '.tmp', path)
+
+def reopen_rotated_log(handler):
+    """Close the handler's file if another process rotated it; the next record opens the new one"""
+    handler.acquire()
+    try:
+        if handler.stream is None:
+            return
+        try:
+            inode = os.stat(handler.baseFilename).st_ino
+        except FileNotFoundError:
+            inode = None
+        if inode != os.fstat(handler.stream.fileno()).st_ino:
+            handler.stream.close()
+            handler.stream = None
+    finally:
+        handler.release()
+
+def rotate_log_file(handler, active_since, now):
+    """Rename the handler's file to a new segment if it is too big or too old; returns the segment path"""
+    path = handler.baseFilename
+    handler.acquire()
+    try:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        too_big = LOG_ROTATE_BYTES > 0 and st.st_size >= LOG_ROTATE_BYTES
+        too_old = LOG_ROTATE_INTERVAL > 0 and st.st_size > 0 and now - active_since >= LOG_ROTATE_INTERVAL
+        if not (too_big or too_old):
+            return None
+        if handler.stream is not None:
+            handler.stream.close()
+            handler.stream = None
+        segment = f"{path}.{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}"
+        suffix = itertools.count(1)
+        while os.path.exists(segment) or os.path.exists(segment + '.gz'):
+            segment = f"{path}.{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}-{next(suffix)}"
+        os.replace(path, segment)
+        return segment
+    finally:
+        handler.release()
+
+def compress_log_segment(directory, segment):
+    """Gzip a rotated segment in place of the original and update its index entry"""
+    plain = os.path.join(directory, segment['file'])
+    compressed = plain + '.gz'
+    temp = os.path.join(directory, f".{segment['file']}.gz.tmp")
+    try:
+        with open(plain, 'rb') as source, gzip.open(temp, 'wb', compresslevel=GZIP_LEVEL) as target:
+            shutil.copyfileobj(source, target, VIEW_CHUNK_SIZE)
+            size = source.tell()
+        os.replace(temp, compressed)
+        os.remove(plain)
+    except FileNotFoundError:
+        # Removed by hand; forget it
+        return False
+    compressed_size = os.path.getsize(compressed)
+    segment.update(file=os.path.basename(compressed), compressed=True, size=size, compressed_size=compressed_size)
+    LOG_SEGMENT_BYTES.labels(stage='original').inc(size)
+    LOG_SEGMENT_BYTES.labels(stage='compressed').inc(compressed_size)
+    return True
+
+def maintain_log_file(handler, now):
+    """Rotate one log file if it is due, then compress and expire its segments"""
+    directory, name = os.path.split(handler.baseFilename)
+    with segment_index_lock(directory) as locked:
+        reopen_rotated_log(handler)
+        if not locked:
+            return
+        index = read_segment_index(directory)
+        state = index.get(name)
+        if state is None:
+            state = index[name] = {'active_since': now, 'segments': []}
+            changed = True
+        else:
+            changed = False
+        segment = rotate_log_file(handler, state['active_since'], now)
+        if segment is not None:
+            state['segments'].append({'file': os.path.basename(segment), 'compressed': False,
+                                      'start': state['active_since'], 'end': now,
+                                      'size': os.path.getsize(segment)})
+            state['active_since'] = now
+            LOG_ROTATIONS.labels(file=name).inc()
+            logger.info(f"Rotated {handler.baseFilename} to {segment}")
+            changed = True
+        for entry in state['segments']:
+            if not entry['compressed'] and now - entry['end'] >= LOG_COMPRESS_DELAY:
+                try:
+                    compress_log_segment(directory, entry)
+                except Exception as e:
+                    logger.error(f"Error compressing log segment {entry['file']}: {str(e)}")
+                changed = True
+        # Segments deleted by hand drop out of the index
+        kept = [entry for entry in state['segments'] if os.path.exists(os.path.join(directory, entry['file']))]
+        while len(kept) > LOG_BACKUP_COUNT:
+            expired = kept.pop(0)
+            os.remove(os.path.join(directory, expired['file']))
+        if kept != state['segments']:
+            state['segments'] = kept
+            changed = True
+        if changed:
+            write_segment_index(directory, index)
+
+def rotate_logs():
+    """Scheduled job: rotate, compress and expire the application's log files"""
+    now = time.time()
+    for handler in log_listener.handlers:
+        if isinstance(handler, BatchFileHandler):
+            maintain_log_file(handler, now)
+
+# System stats are sampled by a scheduled job so request handlers never
+# call psutil themselves. Each sample is an immutable SystemStats tuple that
+# is swapped in with a single assignment, so readers just take a reference.
+STATS_INTERVAL = float(os.environ.get('STATS_INTERVAL', '2.0'))
+
+SystemStats = collections.namedtuple('SystemStats', [
+    'cpu_percent',
+    'memory_percent',
+    'memory_used',
+    'memory_total',
+    'disk_percent',
+    'disk_used',
+    'disk_total',
+    'sampled_at'
+])
+
+def sample_system_stats():
+    """Read CPU, memory and disk usage from psutil into a SystemStats snapshot"""
+    import psutil  # For resource usage statistics; imported on first sample
+    memory_info = psutil.virtual_memory()
+    disk_info = psutil.disk_usage('/')
+    return SystemStats(
+        cpu_percent=psutil.cpu_percent(),
+        memory_percent=memory_info.percent,
+        memory_used=memory_info.used,
+        memory_total=memory_info.total,
+        disk_percent=disk_info.percent,
+        disk_used=disk_info.used,
+        disk_total=disk_info.total,
+        sampled_at=time.time()
+    )
+
+# The first sample is taken by start_background_services() before the
+# process serves any request, so handlers always have a snapshot to read
+system_stats = None
+
+def sample_stats_job():
+    """Scheduled every STATS_INTERVAL seconds: swap in a fresh snapshot"""
+    global system_stats
+    system_stats = sample_system_stats()
+
+def warm_caches():
+    """Compile the dashboard and compress the static assets before the first page view"""
+    dashboard_template()
+    warm_precompressed_assets()
+
+# Volume listings are cached instead of calling os.listdir() on every page
+# view. The VolumeWatcher thread invalidates a listing when inotify reports a
+# change in its directory, or - where inotify is unavailable (non-Linux, NFS
+# mounts, directory missing at startup) - when the directory's mtime changes.
+VOLUME_POLL_INTERVAL = float(os.environ.get('VOLUME_POLL_INTERVAL', '5.0'))
+VOLUME_PAGE_SIZE = int(os.environ.get('VOLUME_PAGE_SIZE', '50'))
+VOLUME_MAX_PAGE_SIZE = 1000
+
+class DirectoryIndex:
+    """Cached, sorted listing of one directory, rebuilt only after invalidate()"""
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._generation = 1
+        self._listed_generation = 0
+        self._files = ()
+        self._error = None
+
+    def invalidate(self):
+        self._generation += 1
+
+    def _refresh(self):
+        with self._lock:
+            generation = self._generation
+            if self._listed_generation == generation:
+                return
+            try:
+                self._files = tuple(sorted(os.listdir(self.path)))
+                self._error = None
+            except Exception as e:
+                self._files = ()
+                self._error = str(e)
+            # Changes that arrive while listing bump the generation again
+            # and trigger another refresh on the next read
+            self._listed_generation = generation
+
+    def listing(self):
+        """Return (files, error) - files is a sorted tuple shared by all readers"""
+        if self._listed_generation != self._generation:
+            self._refresh()
+        return self._files, self._error
+
+    def page(self, page=1, per_page=VOLUME_PAGE_SIZE):
+        """Return a summary of the directory with one page of its files"""
+        files, error = self.listing()
+        if error is not None:
+            return {'path': self.path, 'error': error, 'status': 'error', 'count': 0}
+        start = (page - 1) * per_page
+        return {
+            'path': self.path,
+            'files': files[start:start + per_page],
+            'count': len(files),
+            'page': page,
+            'per_page': per_page,
+            'status': 'mounted' if files else 'empty'
+        }
+
+volume_indexes = collections.OrderedDict([
+    ('data', DirectoryIndex(DATA_PATH)),
+    ('config', DirectoryIndex(CONFIG_PATH)),
+    ('logs', DirectoryIndex(LOG_PATH))
+])
+
+class VolumeWatcher(threading.Thread):
+    """Invalidates DirectoryIndex objects using inotify, polling as a fallback"""
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_CLOEXEC = 0o2000000
+    WATCH_MASK = IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+    EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self, indexes, poll_interval=VOLUME_POLL_INTERVAL, on_change=None):
+        super().__init__(name='volume-watcher', daemon=True)
+        self.indexes = list(indexes)
+        self.poll_interval = poll_interval
+        # Called with the DirectoryIndex after it has been invalidated
+        self.on_change = on_change
+        self._stop = threading.Event()
+        self._fd = None
+        self._watches = {}
+        self._polled = {}
+        self._libc = self._load_libc()
+        if self._libc is not None:
+            try:
+                fd = self._libc.inotify_init1(self.IN_CLOEXEC)
+                if fd >= 0:
+                    self._fd = fd
+            except AttributeError:
+                pass
+        for index in self.indexes:
+            if not self._add_watch(index):
+                self._polled[index] = self._directory_state(index.path)
+
+    @staticmethod
+    def _load_libc():
+        if not sys.platform.startswith('linux'):
+            return None
+        import ctypes
+        import ctypes.util
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+            return libc
+        except (OSError, AttributeError):
+            return None
+
+    def _add_watch(self, index):
+        if self._fd is None:
+            return False
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(index.path), self.WATCH_MASK)
+        if wd < 0:
+            return False
+        self._watches[wd] = index
+        return True
+
+    @staticmethod
+    def _directory_state(path):
+        try:
+            st = os.stat(path)
+            return (st.st_ino, st.st_mtime_ns)
+        except OSError:
+            return None
+
+    @property
+    def mode(self):
+        if not self._watches:
+            return 'polling'
+        return 'inotify+polling' if self._polled else 'inotify'
+
+    def stop(self):
+        self._stop.set()
+
+    def _changed(self, index):
+        index.invalidate()
+        if self.on_change is not None:
+            self.on_change(index)
+
+    def run(self):
+        logger.info(f"Volume watcher started ({self.mode})")
+        timeout = self.poll_interval
+        while not self._stop.is_set():
+            if self._fd is not None and self._watches:
+                readable, _, _ = select.select([self._fd], [], [], timeout)
+                if readable:
+                    self._read_events()
+            else:
+                self._stop.wait(timeout)
+            self._poll()
+
+    def _read_events(self):
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except OSError as e:
+            logger.error(f"Error reading inotify events: {str(e)}")
+            return
+        offset = 0
+        while offset + self.EVENT_HEADER.size <= len(data):
+            wd, mask, _, name_length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size + name_length
+            if mask & self.IN_Q_OVERFLOW:
+                # The kernel dropped events (wd is -1), so any directory may
+                # have changed unseen
+                logger.warning(f"inotify event queue overflowed; invalidating all {len(self.indexes)} listings")
+                for index in self.indexes:
+                    self._changed(index)
+                continue
+            index = self._watches.get(wd)
+            if index is None:
+                continue
+            self._changed(index)
+            if mask & self.IN_IGNORED:
+                # The directory itself went away (e.g. unmounted); fall back
+                # to polling until it reappears
+                del self._watches[wd]
+                self._polled[index] = self._directory_state(index.path)
+
+    def _poll(self):
+        for index, previous in list(self._polled.items()):
+            state = self._directory_state(index.path)
+            if state == previous:
+                continue
+            self._changed(index)
+            self._polled[index] = state
+            # The directory exists again - try to switch it to inotify
+            if state is not None and self._add_watch(index):
+                del self._polled[index]
+
+# Started by start_background_services()
+volume_watcher = None
+
+# Listings invalidated by the watcher are rebuilt by a scheduled job shortly
+# afterwards, so the next page view does not pay for os.listdir(). Bursts of
+# changes to one directory are coalesced into a single refresh.
+LISTING_REFRESH_DELAY = float(os.environ.get('LISTING_REFRESH_DELAY', '0.2'))
+listing_refreshes = set()
+listing_refreshes_lock = threading.Lock()
+
+def refresh_listing(index):
+    with listing_refreshes_lock:
+        listing_refreshes.discard(index)
+    index.listing()
+
+def schedule_listing_refresh(index):
+    """Called by the VolumeWatcher when a directory changes"""
+    if job_scheduler is None:
+        return
+    with listing_refreshes_lock:
+        if index in listing_refreshes:
+            return
+        listing_refreshes.add(index)
+    job_scheduler.submit(refresh_listing, index, delay=LISTING_REFRESH_DELAY,
+                         name='refresh-listing', priority=PRIORITY_HIGH)
+
+def volume_changed(index):
+    """VolumeWatcher callback: refresh the listing and the search index"""
+    schedule_listing_refresh(index)
+    schedule_search_refresh(index)
+
+# Health checks run on their own thread every HEALTH_CHECK_INTERVAL seconds,
+# each with a HEALTH_CHECK_TIMEOUT, and the probe endpoint returns the last
+# result pre-serialised. A check stuck on a hung mount keeps failing as
+# 'timed out' without tying up the probe; if the checker thread itself stops
+# producing results for HEALTH_RESULT_TTL seconds the probe reports unhealthy.
+HEALTH_CHECK_INTERVAL = float(os.environ.get('HEALTH_CHECK_INTERVAL', '5.0'))
+HEALTH_CHECK_TIMEOUT = float(os.environ.get('HEALTH_CHECK_TIMEOUT', '2.0'))
+HEALTH_RESULT_TTL = float(os.environ.get('HEALTH_RESULT_TTL', '15.0'))
+
+HEALTH_STATUS = registry.gauge('app_health_check_status', 'Result of the last health check (1 = passing)', ('check',))
+
+class CheckRun:
+    """
+    One execution of a health check on its own daemon thread, so a check
+    blocked forever on a hung mount cannot hold up the probe or process exit
+    """
+    def __init__(self, check):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        threading.Thread(target=self._run, args=(check,), name='health-check', daemon=True).start()
+
+    def _run(self, check):
+        try:
+            self.result = check()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done.set()
+
+class HealthChecks:
+    """Registry of health checks with cached, pre-serialised results"""
+    def __init__(self, interval=HEALTH_CHECK_INTERVAL, timeout=HEALTH_CHECK_TIMEOUT, ttl=HEALTH_RESULT_TTL):
+        self.interval = interval
+        self.timeout = timeout
+        self.ttl = ttl
+        self._checks = collections.OrderedDict()
+        self._running = {}
+        self._stop = threading.Event()
+        self._thread = None
+        self._healthy = None
+        self._completed_at = 0.0
+        self._response = (b'{"status": "starting"}', 503)
+
+    def register(self, name, check, passing='accessible', failing='inaccessible'):
+        """Add a check - a callable returning True when healthy"""
+        self._checks[name] = (check, passing, failing)
+
+    def run_checks(self):
+        """Run every registered check once and rebuild the cached response"""
+        for name, (check, _, _) in self._checks.items():
+            # Don't pile up more threads behind a check that is still hung
+            if name not in self._running:
+                self._running[name] = CheckRun(check)
+        deadline = time.monotonic() + self.timeout
+        results = collections.OrderedDict()
+        is_healthy = True
+        for name, (_, passing, failing) in self._checks.items():
+            run = self._running[name]
+            if not run.done.wait(max(0, deadline - time.monotonic())):
+                ok = False
+                results[name] = 'timed out'
+            else:
+                del self._running[name]
+                if run.error is not None:
+                    ok = False
+                    results[name] = f"error: {str(run.error)}"
+                else:
+                    ok = bool(run.result)
+                    results[name] = passing if ok else failing
+            HEALTH_STATUS.labels(check=name).set(1 if ok else 0)
+            is_healthy = is_healthy and ok
+
+        if is_healthy != self._healthy:
+            # Log state changes rather than every probe
+            logger.info(f"Health check: {'PASS' if is_healthy else 'FAIL'} {dict(results)}")
+        self._healthy = is_healthy
+        self._completed_at = time.time()
+        body = json_dumps({
+            'status': 'healthy' if is_healthy else 'unhealthy',
+            'checks': results,
+            'timestamp': datetime.datetime.fromtimestamp(self._completed_at),
+            'hostname': host_facts()['hostname']
+        })
+        self._response = (body, 200 if is_healthy else 503)
+
+    def response(self):
+        """Return (JSON body, status code) for the probe endpoint"""
+        if time.time() - self._completed_at > self.ttl and self._healthy is not None:
+            body = json_dumps({
+                'status': 'unhealthy',
+                'checks': {'health_checker': 'stale results'},
+                'timestamp': datetime.datetime.fromtimestamp(self._completed_at),
+                'hostname': host_facts()['hostname']
+            })
+            return body, 503
+        return self._response
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_checks()
+            except Exception as e:
+                logger.error(f"Error running health checks: {str(e)}")
+
+    def start(self):
+        """Run the checks once now, then keep running them in the background"""
+        # Runs still pending in a parent process have no thread in this one
+        self._running = {}
+        self.run_checks()
+        self._thread = threading.Thread(target=self._run, name='health-checker', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+def volume_accessible(path, mode):
+    """Build a check that passes when path exists with the given access mode"""
+    return lambda: os.path.exists(path) and os.access(path, mode)
+
+# Check if we can access our mounted volumes. For a real application, you
+# might also register checks for database connections, cache availability, etc.
+health_checks = HealthChecks()
+health_checks.register('data_volume', volume_accessible(DATA_PATH, os.R_OK))
+health_checks.register('config_volume', volume_accessible(CONFIG_PATH, os.R_OK))
+health_checks.register('logs_volume', volume_accessible(LOG_PATH, os.W_OK), 'writable', 'not writable')
+
+# Request profiling - off unless PROFILING=1. Then 1 in PROFILE_SAMPLE_RATE
+# requests, and any request sent with an "X-Profile: 1" header, are profiled
+# by a sampling profiler: while such a request runs, a StackSampler thread
+# records its thread's stack every PROFILE_INTERVAL seconds. Nothing is traced
+# per call, so profiled requests run at close to normal speed and the rest
+# pay only for a counter increment. Stacks are aggregated per endpoint and
+# written in collapsed format ("outer;inner;leaf count", as read by
+# flamegraph.pl and speedscope) to LOG_PATH/profiles/<endpoint>.<pid>.folded.
+# Only the Flask view and its hooks are covered: the body of a streamed
+# response is produced after the request has finished, and in ASGI mode
+# requests share the event loop thread so they cannot be told apart.
+PROFILING = os.environ.get('PROFILING', '0') == '1'
+PROFILE_SAMPLE_RATE = int(os.environ.get('PROFILE_SAMPLE_RATE', '100'))
+PROFILE_INTERVAL = float(os.environ.get('PROFILE_INTERVAL', '0.001'))
+PROFILE_HEADER = 'X-Profile'
+PROFILE_DIR = os.path.join(LOG_PATH, 'profiles')
+
+class StackSampler(threading.Thread):
+    """
+    Samples the stacks of the threads registered with it and counts them as
+    collapsed stacks per endpoint. Idles while nothing is registered.
+    """
+    def __init__(self, interval):
+        super().__init__(name='stack-sampler', daemon=True)
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._targets = {}
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        # code object -> "function (directory/file:line)"
+        self._labels = {}
+        self.stacks = collections.defaultdict(collections.Counter)
+        self.dirty = False
+
+    def add(self, thread_id, endpoint):
+        with self._lock:
+            self._targets[thread_id] = endpoint
+        self._wake.set()
+
+    def remove(self, thread_id):
+        with self._lock:
+            self._targets.pop(thread_id, None)
+
+    def label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            # The directory tells flask/app.py apart from this app.py
+            filename = os.path.join(*os.path.normpath(code.co_filename).split(os.sep)[-2:])
+            label = f"{code.co_name} ({filename}:{code.co_firstlineno})"
+            # ';' separates frames in collapsed stacks
+            label = self._labels[code] = label.replace(';', ':')
+        return label
+
+    def collapse(self, frame):
+        labels = []
+        while frame is not None:
+            labels.append(self.label(frame.f_code))
+            frame = frame.f_back
+        return ';'.join(reversed(labels))
+
+    def run(self):
+        while not self._stop.is_set():
+            with self._lock:
+                targets = list(self._targets.items())
+            if not targets:
+                self._wake.wait(1.0)
+                self._wake.clear()
+                continue
+            frames = sys._current_frames()
+            with self._lock:
+                for thread_id, endpoint in targets:
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        self.stacks[endpoint][self.collapse(frame)] += 1
+                self.dirty = True
+            del frames
+            time.sleep(self.interval)
+
+    def snapshot(self):
+        """Return {endpoint: {stack: samples}} and clear the dirty flag"""
+        with self._lock:
+            self.dirty = False
+            return {endpoint: dict(stacks) for endpoint, stacks in self.stacks.items()}
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+# Started by start_background_services() when PROFILING is on
+stack_sampler = None
+profile_counter = itertools.count(1)
+
+@app.before_request
+def start_profiling():
+    """Register this request's thread with the sampler if it is picked for profiling"""
+    if not PROFILING or stack_sampler is None:
+        return
+    forced = request.headers.get(PROFILE_HEADER) == '1'
+    if forced or (PROFILE_SAMPLE_RATE > 0 and next(profile_counter) % PROFILE_SAMPLE_RATE == 0):
+        g.profiled = True
+        stack_sampler.add(threading.get_ident(), request.endpoint or 'unmatched')
+
+@app.teardown_request
+def stop_profiling(exc):
+    if g.get('profiled'):
+        stack_sampler.remove(threading.get_ident())
+
+def profile_filename(endpoint, pid):
+    safe = ''.join(c if c.isalnum() or c in '_-.' else '_' for c in endpoint)
+    return os.path.join(PROFILE_DIR, f"{safe}.{pid}.folded")
+
+def write_profiles():
+    """Write this process's collapsed stacks to PROFILE_DIR, one file per endpoint"""
+    if stack_sampler is None or not stack_sampler.dirty:
+        return
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    for endpoint, stacks in stack_sampler.snapshot().items():
+        path = profile_filename(endpoint, os.getpid())
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w') as f:
+            for stack, samples in sorted(stacks.items()):
+                f.write(f"{stack} {samples}\n")
+        os.replace(temp_path, path)
+
+def read_profiles():
+    """Merge the collapsed stacks of every process: {endpoint: Counter(stack: samples)}"""
+    profiles = collections.defaultdict(collections.Counter)
+    try:
+        filenames = os.listdir(PROFILE_DIR)
+    except FileNotFoundError:
+        return profiles
+    for filename in filenames:
+        if not filename.endswith('.folded'):
+            continue
+        endpoint = filename.rsplit('.', 2)[0]
+        with open(os.path.join(PROFILE_DIR, filename)) as f:
+            for line in f:
+                stack, _, samples = line.rstrip('\n').rpartition(' ')
+                if stack and samples.isdigit():
+                    profiles[endpoint][stack] += int(samples)
+    return profiles
+
+def profile_summary(stacks, top=20):
+    """Hottest stacks and the functions most often on top of the stack"""
+    leaves = collections.Counter()
+    for stack, samples in stacks.items():
+        leaves[stack.rpartition(';')[2]] += samples
+    total = sum(stacks.values())
+    return {
+        'samples': total,
+        'sampled_ms': total * PROFILE_INTERVAL * 1000,
+        'top_stacks': [{'stack': stack, 'samples': samples} for stack, samples in stacks.most_common(top)],
+        'top_functions': [{'function': leaf, 'samples': samples} for leaf, samples in leaves.most_common(top)]
+    }
+
+@app.route('/api/debug/profile')
+def debug_profile():
+    """
+    Aggregated profiles from every worker. ?endpoint= limits the result to
+    one endpoint; ?format=collapsed returns collapsed stacks as text for
+    flamegraph tools, with the endpoint as the root frame.
+    """
+    if not PROFILING:
+        return json_response({'error': 'Profiling is disabled; set PROFILING=1'}, 404)
+    write_profiles()
+    profiles = read_profiles()
+    endpoint = request.args.get('endpoint')
+    if endpoint is not None:
+        profiles = {endpoint: profiles[endpoint]} if endpoint in profiles else {}
+    if request.args.get('format') == 'collapsed':
+        lines = [f"{name};{stack} {samples}\n"
+                 for name, stacks in sorted(profiles.items()) for stack, samples in sorted(stacks.items())]
+        return app.response_class(''.join(lines), mimetype='text/plain')
+    return json_response({
+        'sample_rate': PROFILE_SAMPLE_RATE,
+        'interval_seconds': PROFILE_INTERVAL,
+        'directory': PROFILE_DIR,
+        'endpoints': {name: profile_summary(stacks) for name, stacks in sorted(profiles.items())}
+    })
+
+# Background services - the log listener, job scheduler, volume watcher and
+# health checker - are threads, and threads do not survive fork(). They are
+# therefore started per process rather than at import: by the production
+# launcher after it forks each worker (server.py), by the ASGI lifespan
+# startup, or otherwise on the first request a process handles.
+background_lock = threading.Lock()
+background_pid = None
+
+def start_background_services():
+    """Start this process's background threads (once per process)"""
+    global background_pid, job_scheduler, volume_watcher, system_stats, stack_sampler
+    with background_lock:
+        if background_pid == os.getpid():
+            return
+        started = time.perf_counter()
+        background_pid = os.getpid()
+        start_log_listener()
+        system_stats = sample_system_stats()
+        job_scheduler = JobScheduler(SCHEDULER_THREADS)
+        job_scheduler.start()
+        job_scheduler.submit(warm_caches, name='warm-caches', priority=PRIORITY_LOW)
+        job_scheduler.every(STATS_INTERVAL, sample_stats_job, name='sample-stats')
+        # Let the other workers see this process's counters, and pick up theirs
+        job_scheduler.every(STATS_INTERVAL, registry.sync, name='sync-metrics')
+        job_scheduler.every(HISTORY_INTERVAL, record_metrics_history, name='metrics-history')
+        job_scheduler.every(LOG_ROTATE_CHECK_INTERVAL, rotate_logs, name='rotate-logs', priority=PRIORITY_LOW)
+        # Log files grow without the watcher noticing, so the search index is
+        # also brought up to date on a timer
+        job_scheduler.every(SEARCH_REFRESH_INTERVAL, refresh_search_index, delay=0,
+                            name='search-refresh', priority=PRIORITY_LOW)
+        job_scheduler.every(SEARCH_MERGE_INTERVAL, search_index.merge, name='search-merge', priority=PRIORITY_LOW)
+        # Listings cached before a fork may have missed changes since
+        for directory in volume_indexes.values():
+            directory.invalidate()
+            schedule_listing_refresh(directory)
+        volume_watcher = VolumeWatcher(volume_indexes.values(), on_change=volume_changed)
+        volume_watcher.start()
+        health_checks.start()
+        if PROFILING:
+            stack_sampler = StackSampler(PROFILE_INTERVAL)
+            stack_sampler.start()
+            job_scheduler.every(STATS_INTERVAL, write_profiles, name='write-profiles', priority=PRIORITY_LOW)
+    logger.info(f"Background services started in process {background_pid} "
+                f"in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+@app.before_request
+def ensure_background_services():
+    """Start the background services if this process has not yet"""
+    if background_pid != os.getpid():
+        start_background_services()
+
+def render_dashboard():
+    """Render the dashboard page from cached stats and volume listings"""
+    # Read the latest snapshot from the stats job
+    stats = system_stats
+    
+    # Get system information
+    facts = host_facts()
+    system_info = {
+        'hostname': facts['hostname'],
+        'platform': facts['platform'],
+        'python_version': facts['python_version'],
+        'cpu_count': facts['cpu_count'],
+        'memory': f"{stats.memory_total / (1024 * 1024):.1f} MB",
+        'uptime': f"{time.time() - start_time:.1f} seconds"
+    }
+    
+    # Get resource usage
+    resource_usage = {
+        'cpu_percent': stats.cpu_percent,
+        'memory_percent': stats.memory_percent,
+        'disk_usage': f"{stats.disk_percent}%"
+    }
+    
+    # Get information about mounted volumes from the cached listings,
+    # rendering only the first page of each
+    volumes = {}
+    for name, directory in volume_indexes.items():
+        volumes[name] = directory.page()
+        if volumes[name]['status'] == 'error':
+            ERRORS.inc()
+        elif name == 'data':
+            DATA_READS.inc()
+    
+    # Render the precompiled dashboard template with our data
+    app_metrics = application_metrics()
+    return dashboard_template().render(
+        app_name=APP_NAME,
+        app_version=APP_VERSION,
+        environment=ENVIRONMENT,
+        instance_id=INSTANCE_ID,
+        system_info=system_info,
+        resource_usage=resource_usage,
+        volumes=volumes,
+        request_count=app_metrics['requests'],
+        metrics=app_metrics,
+        data_path=DATA_PATH,
+        config_path=CONFIG_PATH,
+        log_path=LOG_PATH,
+        secret_key=SECRET_KEY,
+        css_version=DASHBOARD_CSS_ETAG
+    )
+
+@app.route('/')
+def index():
+    """Main page showing application status and mounted volume information"""
+    REQUESTS.inc()
+    
+    # Log the request
+    logger.info(f"Request to index page from {request.remote_addr}")
+    
+    return render_dashboard()
+
+@app.route('/assets/dashboard.css')
+def dashboard_css():
+    """Serve the dashboard stylesheet with a content ETag so browsers can cache it"""
+    response, encoding = static_asset_response('dashboard.css', 'text/css')
+    # Each encoding is a different representation, so it gets its own ETag
+    response.set_etag(f"{DASHBOARD_CSS_ETAG}-{encoding}" if encoding else DASHBOARD_CSS_ETAG)
+    response.cache_control.public = True
+    response.cache_control.max_age = DASHBOARD_CSS_MAX_AGE
+    return response.make_conditional(request)
+
+@app.route('/api/volumes/<name>')
+def list_volume(name):
+    """Paginated listing of a mounted volume from the cached directory index"""
+    directory = volume_indexes.get(name)
+    if directory is None:
+        return json_response({'error': f"Unknown volume: {name}"}, 404)
+    try:
+        page = max(1, int(request.args.get('page', 1)))
+        per_page = min(VOLUME_MAX_PAGE_SIZE, max(1, int(request.args.get('per_page', VOLUME_PAGE_SIZE))))
+    except ValueError:
+        return json_response({'error': 'page and per_page must be integers'}, 400)
+    listing = directory.page(page, per_page)
+    if 'files' in listing:
+        listing['files'] = list(listing['files'])
+    return json_response(listing, 500 if listing['status'] == 'error' else 200)
+
+# Files are streamed to the client in chunks rather than read into memory
+VIEW_CHUNK_SIZE = int(os.environ.get('VIEW_CHUNK_SIZE', str(64 * 1024)))
+
+def tail_offset(f, size, lines):
+    """
+    Return the byte offset where the last `lines` lines of f start, reading
+    backwards from the end one chunk at a time instead of reading the file.
+    """
+    if lines <= 0 or size == 0:
+        return size
+    f.seek(size - 1)
+    # A trailing newline ends the last line rather than starting a new one
+    wanted = lines + (1 if f.read(1) == b'\n' else 0)
+    position = size
+    while position > 0:
+        length = min(VIEW_CHUNK_SIZE, position)
+        position -= length
+        f.seek(position)
+        data = f.read(length)
+        end = len(data)
+        while True:
+            newline = data.rfind(b'\n', 0, end)
+            if newline < 0:
+                break
+            wanted -= 1
+            if wanted == 0:
+                return position + newline + 1
+            end = newline
+    return 0
+
+def stream_file_page(f, file_path, start, end, size, next_url):
+    """Yield an HTML page showing bytes start..end of f, escaping each chunk"""
+    name = html_escape(os.path.basename(file_path))
+    try:
+        yield f"""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <title>File: {name}</title>
+            <style>
+                body {{ font-family: Arial, sans-serif; line-height: 1.6; padding: 20px; }}
+                pre {{ background-color: #f8f9fa; padding: 15px; border-radius: 5px; overflow-x: auto; }}
+                .nav-link {{
+                    display: inline-block;
+                    padding: 8px 16px;
+                    background-color: #3498db;
+                    color: white;
+                    text-decoration: none;
+                    border-radius: 4px;
+                    font-weight: bold;
+                }}
+            </style>
+        </head>
+        <body>
+            <h1>File: {name}</h1>
+            <p>Path: {html_escape(file_path)}</p>
+            <p>Showing bytes {start}-{end} of {size}</p>
+            <pre>"""
+        # Decode incrementally so multi-byte characters split across chunk
+        # boundaries are not mangled
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            chunk = f.read(min(VIEW_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield html_escape(decoder.decode(chunk), quote=False)
+        yield html_escape(decoder.decode(b'', final=True), quote=False)
+        next_link = f'<a href="{html_escape(next_url)}" class="nav-link">Next</a>\n' if next_url else ''
+        yield f"""</pre>
+            {next_link}<a href="/" class="nav-link">Back to Home</a>
+        </body>
+        </html>
+        """
+    finally:
+        f.close()
+
+def resolve_allowed_path(file_path):
+    """
+    Security check to prevent directory traversal attacks: resolve symlinks
+    and '..' in file_path and return the real path if it lies inside one of
+    the mounted volumes, otherwise None. Open the returned path, not the one
+    the client sent.
+    """
+    real_path = os.path.realpath(file_path)
+    for root in (DATA_PATH, CONFIG_PATH, LOG_PATH):
+        real_root = os.path.realpath(root)
+        if real_path == real_root or real_path.startswith(real_root.rstrip(os.sep) + os.sep):
+            return real_path
+    return None
+
+def parse_file_window(args):
+    """Read offset, limit and tail from query args; raises ValueError"""
+    offset = max(0, int(args.get('offset', 0)))
+    limit = args.get('limit')
+    limit = max(0, int(limit)) if limit else None
+    tail = args.get('tail')
+    tail = max(0, int(tail)) if tail else None
+    return offset, limit, tail
+
+def open_file_window(file_path, offset, limit, tail):
+    """
+    Open file_path and work out which bytes to show.
+    Returns (file, start, end, size); the caller must close the file.
+    """
+    f = open(file_path, 'rb')
+    try:
+        size = os.fstat(f.fileno()).st_size
+        if tail is not None:
+            start = tail_offset(f, size, tail)
+        else:
+            start = min(offset, size)
+    except Exception:
+        f.close()
+        raise
+    end = size if limit is None else min(size, start + limit)
+    return f, start, end, size
+
+def next_window_url(file_path, end, size, limit, tail):
+    """Link to the next window when only part of the file is shown"""
+    if limit is not None and tail is None and end < size:
+        return f"/view-file?{urlencode({'path': file_path, 'offset': end, 'limit': limit})}"
+    return None
+
+# Conditional GET - /view-file and /api/info responses carry validators so
+# that clients polling them get a 304 instead of a new body when nothing has
+# changed. A file's ETag is built from its stat (device, inode, size, mtime)
+# plus the requested window, so answering a 304 costs one stat() and never
+# opens the file. Rendered pages of up to VIEW_CACHE_MAX_PAGE bytes are also
+# kept in an LRU cache keyed on the same validator, so repeat views of the same
+# version - config files are viewed constantly - never re-read the file.
+VIEW_CACHE_MAX_PAGE = int(os.environ.get('VIEW_CACHE_MAX_PAGE', str(256 * 1024)))
+# Total size of the cached pages in each process; least recently viewed go first
+VIEW_CACHE_BYTES = int(os.environ.get('VIEW_CACHE_BYTES', str(32 * 1024 * 1024)))
+
+VIEW_CACHE_HITS = registry.counter('app_view_cache_hits_total', 'File page views served from the view cache')
+VIEW_CACHE_MISSES = registry.counter('app_view_cache_misses_total', 'File page views that read the file')
+VIEW_CACHE_EVICTIONS = registry.counter(
+    'app_view_cache_evictions_total', 'Pages dropped from the view cache to stay within VIEW_CACHE_BYTES')
+VIEW_CACHE_SIZE = registry.gauge('app_view_cache_bytes', 'Bytes of pages held in the view cache')
+
+class ContentCache:
+    """
+    LRU cache of rendered pages bounded by their total size. Each entry
+    records the file version (ETag) it was rendered from; asking for another
+    version drops it, so a changed file is never served from the cache.
+    """
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.size = 0
+
+    def get(self, key, version):
+        """Return the body cached for key if it was rendered from this version"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] != version:
+                self._discard(key)
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None:
+            VIEW_CACHE_MISSES.inc()
+            return None
+        VIEW_CACHE_HITS.inc()
+        return entry[1]
+
+    def put(self, key, version, body):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (version, body)
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+                VIEW_CACHE_EVICTIONS.inc()
+            VIEW_CACHE_SIZE.set(self.size)
+
+    def _discard(self, key):
+        # Called with the lock held
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[1])
+            VIEW_CACHE_SIZE.set(self.size)
+
+    def status(self):
+        return {'entries': len(self._entries), 'bytes': self.size, 'max_bytes': self.max_bytes}
+
+view_cache = ContentCache(VIEW_CACHE_BYTES)
+
+def file_etag(st, *window):
+    """ETag for the current version of a file, and of a window onto it"""
+    etag = f"{st.st_dev:x}-{st.st_ino:x}-{st.st_size:x}-{st.st_mtime_ns:x}"
+    if window:
+        # The page markup can change between releases, so the version is part of it
+        etag += '-' + hashlib.sha1(repr((APP_VERSION,) + window).encode('utf-8')).hexdigest()[:12]
+    return etag
+
+def client_has_current(if_none_match, if_modified_since, etag, last_modified=None):
+    """
+    True if the request's If-None-Match/If-Modified-Since headers show the
+    client already has this version; last_modified is a Unix timestamp
+    """
+    environ = {'REQUEST_METHOD': 'GET'}
+    if if_none_match:
+        environ['HTTP_IF_NONE_MATCH'] = if_none_match
+    if if_modified_since:
+        environ['HTTP_IF_MODIFIED_SINCE'] = if_modified_since
+    if last_modified is not None:
+        last_modified = datetime.datetime.fromtimestamp(last_modified, datetime.timezone.utc)
+    return not is_resource_modified(environ, etag=etag, last_modified=last_modified)
+
+def not_modified_response(etag, last_modified=None, weak=False):
+    response = app.response_class(status=304)
+    response.set_etag(etag, weak)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    return response
+
+def validator_headers(etag, last_modified=None, weak=False):
+    """The headers not_modified_response() and view_file() set, for the ASGI app"""
+    headers = [('etag', quote_etag(etag, weak)), ('cache-control', 'no-cache')]
+    if last_modified is not None:
+        headers.append(('last-modified', http_date(last_modified)))
+    return headers
+
+def render_file_page(f, file_path, start, end, size, next_url):
+    """Render a whole page to bytes (used for pages small enough to cache)"""
+    return ''.join(stream_file_page(f, file_path, start, end, size, next_url)).encode('utf-8')
+
+@app.route('/view-file')
+def view_file():
+    """
+    View the contents of a file from a mounted volume.
+
+    The file is streamed in chunks. Optional query parameters:
+      offset=&limit=  show `limit` bytes starting at byte `offset`
+      tail=N          show the last N lines
+      raw=1           send the file itself (supports HTTP Range requests)
+    """
+    # Get the file path from the query parameters
+    file_path = resolve_allowed_path(request.args.get('path', ''))
+    
+    if file_path is None:
+        ERRORS.inc()
+        return "Access denied: Invalid path", 403
+    
+    try:
+        offset, limit, tail = parse_file_window(request.args)
+    except ValueError:
+        ERRORS.inc()
+        return "offset, limit and tail must be integers", 400
+    
+    try:
+        st = os.stat(file_path)
+    except Exception as e:
+        ERRORS.inc()
+        logger.error(f"Error viewing file {file_path}: {str(e)}")
+        return f"Error reading file: {str(e)}", 500
+    
+    # Raw downloads go through send_file, which handles Range and
+    # conditional requests and hands the file to wsgi.file_wrapper
+    # (sendfile) when the server provides it
+    if request.args.get('raw'):
+        etag = file_etag(st)
+        if client_has_current(request.headers.get('If-None-Match'), request.headers.get('If-Modified-Since'),
+                              etag, st.st_mtime):
+            return not_modified_response(etag, st.st_mtime)
+        try:
+            response = send_file(file_path, conditional=True, etag=etag, last_modified=st.st_mtime)
+        except Exception as e:
+            ERRORS.inc()
+            logger.error(f"Error viewing file {file_path}: {str(e)}")
+            return f"Error reading file: {str(e)}", 500
+        DATA_READS.inc()
+        logger.info(f"File downloaded: {file_path}")
+        return response
+    
+    # The client already has this version of the page: answer from the stat alone
+    etag = file_etag(st, offset, limit, tail)
+    if client_has_current(request.headers.get('If-None-Match'), request.headers.get('If-Modified-Since'),
+                          etag, st.st_mtime):
+        return not_modified_response(etag, st.st_mtime)
+    
+    cache_key = (file_path, offset, limit, tail)
+    body = view_cache.get(cache_key, etag)
+    if body is None:
+        # Open the file before streaming starts so errors still get a 500
+        try:
+            f, start, end, size = open_file_window(file_path, offset, limit, tail)
+        except Exception as e:
+            ERRORS.inc()
+            logger.error(f"Error viewing file {file_path}: {str(e)}")
+            return f"Error reading file: {str(e)}", 500
+        next_url = next_window_url(file_path, end, size, limit, tail)
+        logger.info(f"File viewed: {file_path} (bytes {start}-{end} of {size})")
+        if end - start <= VIEW_CACHE_MAX_PAGE:
+            body = render_file_page(f, file_path, start, end, size, next_url)
+            view_cache.put(cache_key, etag, body)
+        else:
+            body = stream_file_page(f, file_path, start, end, size, next_url)
+    
+    # Record the successful read
+    DATA_READS.inc()
+    
+    response = Response(body, mimetype='text/html')
+    response.set_etag(etag)
+    response.last_modified = st.st_mtime
+    response.cache_control.no_cache = True
+    return response
+
+# Form for creating a file
+CREATE_FILE_FORM = """\
+<!DOCTYPE html>
+<html>
+<head>
+    <title>Create File</title>
+    <style>
+        body { font-family: Arial, sans-serif; line-height: 1.6; padding: 20px; }
+        .form-group { margin-bottom: 15px; }
+        label { display: block; margin-bottom: 5px; }
+        input[type="text"], textarea {
+            width: 100%;
+            padding: 8px;
+            border: 1px solid #ddd;
+            border-radius: 4px;
+        }
+        textarea { height: 200px; }
+        button {
+            padding: 8px 16px;
+            background-color: #3498db;
+            color: white;
+            border: none;
+            border-radius: 4px;
+            cursor: pointer;
+            font-weight: bold;
+        }
+        .nav-link {
+            display: inline-block;
+            padding: 8px 16px;
+            background-color: #95a5a6;
+            color: white;
+            text-decoration: none;
+            border-radius: 4px;
+            font-weight: bold;
+        }
+    </style>
+</head>
+<body>
+    <h1>Create a New File</h1>
+    <p>This file will be saved to the mounted data volume.</p>
+
+    <form method="post">
+        <div class="form-group">
+            <label for="filename">Filename:</label>
+            <input type="text" id="filename" name="filename" required placeholder="example.txt">
+        </div>
+
+        <div class="form-group">
+            <label for="content">Content:</label>
+            <textarea id="content" name="content" required placeholder="Enter file content here..."></textarea>
+        </div>
+
+        <div class="form-group">
+            <button type="submit">Create File</button>
+            <a href="/" class="nav-link">Cancel</a>
+        </div>
+    </form>
+
+    <h2>Upload a File</h2>
+    <p>Large files can also be sent as a raw body:
+       <code>curl -T big.bin "http://host/create-file?filename=big.bin"</code></p>
+
+    <form method="post" enctype="multipart/form-data">
+        <div class="form-group">
+            <label for="upload">File:</label>
+            <input type="file" id="upload" name="file" required>
+        </div>
+
+        <div class="form-group">
+            <label for="upload-filename">Save as (optional):</label>
+            <input type="text" id="upload-filename" name="filename" placeholder="defaults to the uploaded file's name">
+        </div>
+
+        <div class="form-group">
+            <button type="submit">Upload File</button>
+            <a href="/" class="nav-link">Cancel</a>
+        </div>
+    </form>
+</body>
+</html>
+"""
+STATIC_ASSETS['create-file.html'] = CREATE_FILE_FORM.encode('utf-8')
+
+# Uploads - files are written a chunk at a time to a temporary file in
+# DATA_PATH and renamed over the target only once complete, so readers see
+# either the old file or the whole new one, never a torn write. The temporary
+# file lives on the same filesystem as the target, which keeps the rename
+# atomic. Request bodies larger than MAX_UPLOAD_SIZE are rejected with 413.
+MAX_UPLOAD_SIZE = int(os.environ.get('MAX_UPLOAD_SIZE', str(256 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = int(os.environ.get('UPLOAD_CHUNK_SIZE', str(1024 * 1024)))
+# fsync the file, and the directory after the rename, before reporting success
+UPLOAD_FSYNC = os.environ.get('UPLOAD_FSYNC', '0') == '1'
+UPLOAD_TEMP_PREFIX = '.upload-'
+app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_SIZE
+
+# Temporary files are created 0600; give finished files the mode open() would
+_umask = os.umask(0)
+os.umask(_umask)
+UPLOAD_FILE_MODE = 0o666 & ~_umask
+
+UPLOAD_BYTES = registry.counter('app_upload_bytes_total', 'Bytes written to the data volume by uploads')
+UPLOAD_DURATION = registry.histogram(
+    'app_upload_duration_seconds',
+    'Time spent receiving and storing one upload',
+    buckets=(0.001, 0.005, 0.025, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+)
+
+class UploadTooLarge(Exception):
+    """The upload went past MAX_UPLOAD_SIZE"""
+
+def validate_filename(filename):
+    """Raise ValueError unless filename names a file directly inside DATA_PATH"""
+    if not filename:
+        ERRORS.inc()
+        raise ValueError("A filename is required.")
+    # For security, don't allow directory traversal
+    if '..' in filename or '/' in filename:
+        ERRORS.inc()
+        raise ValueError("Invalid filename. Directory traversal not allowed.")
+
+def open_upload_temp():
+    """Create a temporary file in DATA_PATH for an upload in progress"""
+    return tempfile.NamedTemporaryFile(dir=DATA_PATH, prefix=UPLOAD_TEMP_PREFIX, delete=False)
+
+def discard_upload(temp):
+    """Close and remove a temporary upload file that was not renamed into place"""
+    temp.close()
+    try:
+        os.unlink(temp.name)
+    except FileNotFoundError:
+        pass
+
+def fsync_directory(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def commit_upload(temp, filename, started, quiet=False):
+    """
+    Rename a completely written temporary file into place as
+    DATA_PATH/filename and record the write. Returns (file_path, size).
+    The temporary file is removed if anything fails. quiet skips the
+    per-file application log line (batch writes log one summary instead).
+    """
+    file_path = os.path.join(DATA_PATH, filename)
+    try:
+        temp.flush()
+        os.fchmod(temp.fileno(), UPLOAD_FILE_MODE)
+        size = os.fstat(temp.fileno()).st_size
+        if UPLOAD_FSYNC:
+            os.fsync(temp.fileno())
+        temp.close()
+        os.replace(temp.name, file_path)
+        if UPLOAD_FSYNC:
+            fsync_directory(DATA_PATH)
+    except Exception as e:
+        discard_upload(temp)
+        ERRORS.inc()
+        logger.error(f"Error creating file {file_path}: {str(e)}")
+        raise
+    elapsed = time.perf_counter() - started
+
+    # Record the successful write
+    DATA_WRITES.inc()
+    UPLOAD_BYTES.inc(size)
+    UPLOAD_DURATION.observe(elapsed)
+    volume_indexes['data'].invalidate()
+    index_created_file(filename)
+    if not quiet:
+        logger.info(f"File created: {file_path} ({size} bytes in {elapsed * 1000:.1f} ms)")
+
+    # Also write to the log volume to demonstrate multiple volume mounting
+    file_operations_logger.info(f"File created: {filename} at {datetime.datetime.now().isoformat()}")
+    return file_path, size
+
+def write_upload_chunks(filename, chunks, started=None, quiet=False):
+    """
+    Write an iterable of byte chunks to DATA_PATH/filename through a temporary
+    file. Raises ValueError for an unsafe filename and UploadTooLarge once
+    more than MAX_UPLOAD_SIZE bytes arrive. Returns (file_path, size).
+    """
+    validate_filename(filename)
+    started = started or time.perf_counter()
+    temp = None
+    try:
+        temp = open_upload_temp()
+        size = 0
+        for chunk in chunks:
+            size += len(chunk)
+            if size > MAX_UPLOAD_SIZE:
+                raise UploadTooLarge(f"Upload larger than {MAX_UPLOAD_SIZE} bytes")
+            temp.write(chunk)
+    except BaseException:
+        if temp is not None:
+            discard_upload(temp)
+        raise
+    return commit_upload(temp, filename, started, quiet)
+
+def read_chunks(stream, chunk_size=UPLOAD_CHUNK_SIZE):
+    """Yield a file-like stream in chunks until it is exhausted"""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+def create_data_file(filename, content):
+    """
+    Write content to a new file in the data volume and record it in the
+    log volume. Raises ValueError for an unsafe filename.
+    """
+    file_path, _ = write_upload_chunks(filename, [content.encode('utf-8')])
+    return file_path
+
+class UploadRequest(Request):
+    """
+    Request that spools multipart file parts sent to /create-file straight
+    into temporary files in DATA_PATH, so they can be renamed into place
+    without being copied again.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Removed at teardown unless they were renamed into place
+        self.upload_temps = []
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if self.endpoint != 'create_file':
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+        temp = open_upload_temp()
+        self.upload_temps.append(temp)
+        return temp
+
+app.request_class = UploadRequest
+
+@app.teardown_request
+def remove_unfinished_uploads(exc):
+    """Clean up temporary files left by a failed or partly used upload"""
+    for temp in request.upload_temps:
+        discard_upload(temp)
+
+def receive_multipart_upload():
+    """Store the 'file' part of a multipart /create-file request"""
+    upload = request.files.get('file')
+    if upload is None:
+        ERRORS.inc()
+        raise ValueError("No file was uploaded.")
+    filename = request.form.get('filename') or os.path.basename(upload.filename or '')
+    validate_filename(filename)
+    return commit_upload(upload.stream, filename, g.request_start)
+
+@app.route('/create-file', methods=['GET', 'POST', 'PUT'])
+def create_file():
+    """
+    Create a new file in the mounted data volume, from the HTML form, a
+    multipart file upload, or a raw request body (PUT or POST with
+    ?filename=)
+    """
+    if request.method == 'GET':
+        # Show form for creating a file
+        return static_asset_response('create-file.html', 'text/html')[0]
+
+    try:
+        if request.mimetype == 'multipart/form-data':
+            receive_multipart_upload()
+        elif request.mimetype == 'application/x-www-form-urlencoded':
+            create_data_file(request.form.get('filename', ''), request.form.get('content', ''))
+        else:
+            file_path, size = write_upload_chunks(request.args.get('filename', ''),
+                                                  read_chunks(request.stream), g.request_start)
+            return json_response({'path': file_path, 'size': size}, 201)
+    except ValueError as e:
+        return str(e), 400
+    except UploadTooLarge as e:
+        ERRORS.inc()
+        return str(e), 413
+    except HTTPException:
+        # 413 from MAX_CONTENT_LENGTH, or a client that went away mid-body
+        ERRORS.inc()
+        raise
+    except Exception as e:
+        ERRORS.inc()
+        logger.error(f"Error creating file {request.args.get('filename') or request.form.get('filename', '')}: {str(e)}")
+        return f"Error creating file: {str(e)}", 500
+    return redirect('/')
+
+# Bulk file API - /api/files/batch writes many files from one tar or NDJSON
+# request body and reads many files back in one streamed response, with the
+# disk I/O done on a pool of BATCH_IO_THREADS threads. NDJSON lines look like
+#   {"filename": "a.txt", "content": "...", "encoding": "utf-8"}
+# where encoding may also be "base64" for binary content.
+BATCH_IO_THREADS = int(os.environ.get('BATCH_IO_THREADS', '8'))
+BATCH_MAX_FILES = int(os.environ.get('BATCH_MAX_FILES', '1000'))
+# Files up to this size are buffered and written on the pool; larger tar
+# members are streamed to disk by the request thread
+BATCH_INLINE_SIZE = int(os.environ.get('BATCH_INLINE_SIZE', str(1024 * 1024)))
+# Largest file returned by a batch read; bigger ones need /view-file?raw=1
+BATCH_MAX_READ_SIZE = int(os.environ.get('BATCH_MAX_READ_SIZE', str(16 * 1024 * 1024)))
+BATCH_FORMATS = {'tar': 'application/x-tar', 'ndjson': 'application/x-ndjson'}
+# Request body types accepted for batch writes ('r|*' also reads compressed tar)
+BATCH_BODY_FORMATS = {
+    'application/x-tar': 'tar',
+    'application/x-gtar': 'tar',
+    'application/gzip': 'tar',
+    'application/x-ndjson': 'ndjson',
+    'application/jsonl': 'ndjson'
+}
+BATCH_ERRORS_MEMBER = '.batch-errors.json'
+
+batch_io_pool = concurrent.futures.ThreadPoolExecutor(max_workers=BATCH_IO_THREADS,
+                                                      thread_name_prefix='batch-io')
+
+def batch_response_format(requested, accept):
+    """Pick 'tar' or 'ndjson' from ?format= or the Accept header"""
+    if requested:
+        if requested not in BATCH_FORMATS:
+            raise ValueError(f"Unknown format: {requested}. Use tar or ndjson.")
+        return requested
+    return 'tar' if BATCH_FORMATS['tar'] in (accept or '') else 'ndjson'
+
+def batch_entries(stream, fmt):
+    """
+    Yield (filename, content) for each file in a batch body. content is bytes,
+    a file object for tar members over BATCH_INLINE_SIZE (which must be read
+    before the next entry), or a ValueError describing a bad entry.
+    """
+    if fmt == 'tar':
+        with tarfile.open(fileobj=stream, mode='r|*') as archive:
+            for member in archive:
+                name = os.path.normpath(member.name)
+                if member.isdir():
+                    continue
+                if not member.isfile():
+                    yield name, ValueError("Not a regular file.")
+                elif member.size <= BATCH_INLINE_SIZE:
+                    yield name, archive.extractfile(member).read()
+                else:
+                    yield name, archive.extractfile(member)
+        return
+
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+            filename = entry.get('filename')
+            content = entry.get('content')
+            if not isinstance(filename, str) or not filename:
+                raise ValueError("filename must be a non-empty string")
+            if not isinstance(content, str):
+                raise ValueError("content must be a string")
+            if entry.get('encoding') == 'base64':
+                content = base64.b64decode(content, validate=True)
+            else:
+                content = content.encode('utf-8')
+            yield filename, content
+        except (ValueError, AttributeError, TypeError) as e:
+            yield f"line {line_number}", ValueError(f"Invalid NDJSON entry: {str(e)}")
+
+def write_batch(stream, fmt):
+    """
+    Write every file in a tar or NDJSON batch body to the data volume.
+    Returns {'written': [...], 'errors': [...]} with one entry per file.
+    """
+    started = time.perf_counter()
+    written = []
+    errors = []
+    pending = collections.deque()
+
+    def finish(filename, write):
+        try:
+            _, size = write()
+            written.append({'filename': filename, 'size': size})
+        except (ValueError, UploadTooLarge, OSError) as e:
+            errors.append({'filename': filename, 'error': str(e)})
+
+    try:
+        for count, (filename, content) in enumerate(batch_entries(stream, fmt), 1):
+            if count > BATCH_MAX_FILES:
+                ERRORS.inc()
+                errors.append({'filename': filename, 'error': f"More than {BATCH_MAX_FILES} files in one batch"})
+                break
+            if isinstance(content, ValueError):
+                ERRORS.inc()
+                errors.append({'filename': filename, 'error': str(content)})
+            elif isinstance(content, bytes):
+                future = batch_io_pool.submit(write_upload_chunks, filename, [content], None, True)
+                pending.append((filename, future.result))
+                # Bound the bytes buffered for writes still in flight
+                if len(pending) >= BATCH_IO_THREADS * 2:
+                    finish(*pending.popleft())
+            else:
+                finish(filename, functools.partial(write_upload_chunks, filename, read_chunks(content), None, True))
+    except tarfile.TarError as e:
+        ERRORS.inc()
+        errors.append({'filename': None, 'error': f"Invalid tar stream: {str(e)}"})
+    finally:
+        while pending:
+            finish(*pending.popleft())
+
+    logger.info(f"Batch write: {len(written)} files, {sum(f['size'] for f in written)} bytes, "
+                f"{len(errors)} errors in {(time.perf_counter() - started) * 1000:.1f} ms")
+    return {'written': written, 'errors': errors}
+
+def batch_write_status(result):
+    """200 when every file was written, 400 when none were, 207 in between"""
+    if not result['errors']:
+        return 200
+    return 207 if result['written'] else 400
+
+def read_batch_file(path):
+    """Read one file for a batch response; returns (path, data, error)"""
+    real_path = resolve_allowed_path(path)
+    if real_path is None:
+        ERRORS.inc()
+        return path, None, "Access denied: Invalid path"
+    try:
+        with open(real_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size > BATCH_MAX_READ_SIZE:
+                ERRORS.inc()
+                return path, None, f"File larger than {BATCH_MAX_READ_SIZE} bytes; use /view-file?raw=1"
+            data = f.read()
+    except Exception as e:
+        ERRORS.inc()
+        return path, None, str(e)
+    DATA_READS.inc()
+    return path, data, None
+
+def read_batch_files(paths):
+    """Yield read_batch_file() results in order, reading ahead on the pool"""
+    pending = collections.deque()
+    for path in paths:
+        pending.append(batch_io_pool.submit(read_batch_file, path))
+        if len(pending) >= BATCH_IO_THREADS:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+class ChunkSink:
+    """Write-only file object that collects what tarfile writes to it"""
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+def read_batch(paths, fmt):
+    """
+    Yield a tar or NDJSON response body holding each of paths. Files that
+    cannot be read are reported inline (NDJSON) or in a final
+    .batch-errors.json member (tar).
+    """
+    if fmt == 'ndjson':
+        for path, data, error in read_batch_files(paths):
+            if error is not None:
+                entry = {'path': path, 'error': error}
+            else:
+                try:
+                    entry = {'path': path, 'size': len(data), 'encoding': 'utf-8', 'content': data.decode('utf-8')}
+                except UnicodeDecodeError:
+                    entry = {'path': path, 'size': len(data), 'encoding': 'base64',
+                             'content': base64.b64encode(data).decode('ascii')}
+            yield json_dumps(entry) + b'\n'
+        return
+
+    sink = ChunkSink()
+    errors = []
+    with tarfile.open(fileobj=sink, mode='w|') as archive:
+        for path, data, error in read_batch_files(paths):
+            if error is not None:
+                errors.append({'path': path, 'error': error})
+                continue
+            # /data/a.txt is stored as data/a.txt
+            member = tarfile.TarInfo(path.lstrip('/'))
+            member.size = len(data)
+            member.mtime = time.time()
+            archive.addfile(member, io.BytesIO(data))
+            yield sink.drain()
+        if errors:
+            report = json_dumps(errors)
+            member = tarfile.TarInfo(BATCH_ERRORS_MEMBER)
+            member.size = len(report)
+            member.mtime = time.time()
+            archive.addfile(member, io.BytesIO(report))
+    yield sink.drain()
+
+def batch_read_response(paths):
+    """Stream the files named by paths in the requested batch format"""
+    if len(paths) > BATCH_MAX_FILES:
+        ERRORS.inc()
+        return json_response({'error': f"More than {BATCH_MAX_FILES} files in one batch"}, 400)
+    try:
+        fmt = batch_response_format(request.args.get('format'), request.headers.get('Accept'))
+    except ValueError as e:
+        return json_response({'error': str(e)}, 400)
+    logger.info(f"Batch read of {len(paths)} files as {fmt}")
+    headers = {'Content-Disposition': 'attachment; filename="files.tar"'} if fmt == 'tar' else {}
+    return Response(read_batch(paths, fmt), mimetype=BATCH_FORMATS[fmt], headers=headers)
+
+@app.route('/api/files/batch', methods=['GET', 'POST'])
+def files_batch():
+    """
+    GET: stream the files named by repeated ?path= parameters as NDJSON, or
+    as a tar archive with ?format=tar or Accept: application/x-tar.
+    POST: write every file in a tar or NDJSON request body to the data volume.
+    """
+    if request.method == 'GET':
+        return batch_read_response(request.args.getlist('path'))
+
+    fmt = BATCH_BODY_FORMATS.get(request.mimetype)
+    if fmt is None:
+        ERRORS.inc()
+        return json_response({'error': f"Send the files as {' or '.join(BATCH_FORMATS.values())}"}, 415)
+    try:
+        result = write_batch(request.stream, fmt)
+    except HTTPException:
+        ERRORS.inc()
+        raise
+    return json_response(result, batch_write_status(result))
+
+@app.route('/api/files/batch/read', methods=['POST'])
+def files_batch_read():
+    """Like GET /api/files/batch, for path lists too long for a URL: {"paths": [...]}"""
+    document = request.get_json(silent=True) or {}
+    paths = document.get('paths')
+    if not isinstance(paths, list) or not all(isinstance(path, str) for path in paths):
+        ERRORS.inc()
+        return json_response({'error': 'Expected a JSON body like {"paths": ["/data/a.txt"]}'}, 400)
+    return batch_read_response(paths)
+
+# Full-text search - an inverted index (term -> files containing it) over the
+# files in DATA_PATH and LOG_PATH, served at /api/search?q=. Most of the index
+# lives in SEARCH_INDEX_FILE, which is memory-mapped: a term is found by binary
+# search over fixed-size dictionary entries, so a lookup touches a few pages
+# rather than loading the index, and the file survives restarts. Changes since
+# the file was written are kept in memory - new postings plus the documents
+# that are no longer current - and merged into a new file by a scheduled job,
+# or as soon as the delta holds SEARCH_DELTA_POSTINGS postings.
+#
+# A file is re-read when its size, mtime or inode changes; one that only grew
+# (a log) has just the new bytes read. Only the process holding the index's
+# lock reads files and writes the index; other gunicorn workers answer
+# searches from the file and map the new one after each merge.
+SEARCH_VOLUMES = collections.OrderedDict([('data', DATA_PATH), ('logs', LOG_PATH)])
+SEARCH_INDEX_DIR = os.environ.get('SEARCH_INDEX_DIR', os.path.join(LOG_PATH, '.search'))
+SEARCH_INDEX_FILE = os.path.join(SEARCH_INDEX_DIR, 'search.idx')
+# Only the first SEARCH_MAX_FILE_SIZE bytes of a file are indexed
+SEARCH_MAX_FILE_SIZE = int(os.environ.get('SEARCH_MAX_FILE_SIZE', str(16 * 1024 * 1024)))
+SEARCH_DELTA_POSTINGS = int(os.environ.get('SEARCH_DELTA_POSTINGS', '200000'))
+SEARCH_REFRESH_INTERVAL = float(os.environ.get('SEARCH_REFRESH_INTERVAL', '30'))
+SEARCH_REFRESH_DELAY = float(os.environ.get('SEARCH_REFRESH_DELAY', '1.0'))
+SEARCH_MERGE_INTERVAL = float(os.environ.get('SEARCH_MERGE_INTERVAL', '60'))
+SEARCH_PAGE_SIZE = 50
+SEARCH_MAX_PAGE_SIZE = 500
+
+# Terms are runs of ASCII letters, digits and underscores, lower-cased; longer
+# runs are cut to SEARCH_TERM_BYTES and single characters are not indexed
+SEARCH_TERM_BYTES = 32
+SEARCH_TOKEN = re.compile(rb'[A-Za-z0-9_]{2,}')
+SEARCH_PARTIAL_TOKEN = re.compile(rb'[A-Za-z0-9_]*\Z')
+
+# File layout: header, postings (doc ids, one array per term), dictionary of
+# (term, postings offset, count) sorted by term, then the documents as JSON
+SEARCH_MAGIC = b'K8SIDX01'
+SEARCH_HEADER = struct.Struct('=8sIIQQQ')
+SEARCH_ENTRY = struct.Struct(f'={SEARCH_TERM_BYTES}sQI')
+
+SEARCH_QUERIES = registry.counter('app_search_queries_total', 'Searches answered by /api/search')
+SEARCH_FILES_INDEXED = registry.counter('app_search_files_indexed_total', 'Files read to update the search index')
+SEARCH_MERGES = registry.counter('app_search_merges_total', 'Times the search index file was rewritten')
+
+def search_terms(data):
+    """The set of terms in a chunk of bytes"""
+    return {token[:SEARCH_TERM_BYTES].lower() for token in SEARCH_TOKEN.findall(data)}
+
+def file_terms(path, start=0):
+    """Terms in path from byte offset start on, or None for a binary file"""
+    terms = set()
+    remaining = SEARCH_MAX_FILE_SIZE - start
+    carry = b''
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while remaining > 0:
+            chunk = f.read(min(VIEW_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            if b'\0' in chunk:
+                return None
+            remaining -= len(chunk)
+            chunk = carry + chunk
+            # A term cut off at the end of the chunk continues in the next one
+            cut = SEARCH_PARTIAL_TOKEN.search(chunk).start()
+            carry = chunk[cut:]
+            terms.update(search_terms(chunk[:cut]))
+    terms.update(search_terms(carry))
+    return terms
+
+class SearchIndex:
+    """Inverted index over SEARCH_VOLUMES: a memory-mapped file plus an in-memory delta"""
+    def __init__(self, path):
+        self.path = path
+        # _lock guards what searches read; _write_lock serialises updates and merges
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._map = None
+        self._mapped_id = None
+        self._term_count = 0
+        self._dictionary_offset = 0
+        # doc id -> [volume, name, size, mtime_ns, inode], None once superseded
+        self.docs = []
+        self.files = {}
+        self._delta = {}
+        self._delta_postings = 0
+        self.dirty = False
+        self.writer = False
+        self._writer_lock_file = None
+
+    def _open(self):
+        """Map the index file if it was replaced since it was last mapped"""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        if (st.st_dev, st.st_ino) == self._mapped_id:
+            return
+        with open(self.path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, doc_count, term_count, dictionary_offset, docs_offset, docs_length = SEARCH_HEADER.unpack_from(mapped)
+        if magic != SEARCH_MAGIC:
+            mapped.close()
+            raise ValueError(f"{self.path} is not a search index")
+        docs = json.loads(mapped[docs_offset:docs_offset + docs_length])
+        if self._map is not None:
+            self._map.close()
+        self._map = mapped
+        self._mapped_id = (st.st_dev, st.st_ino)
+        self._term_count = term_count
+        self._dictionary_offset = dictionary_offset
+        self.docs = docs
+        self.files = {(doc[0], doc[1]): doc_id for doc_id, doc in enumerate(docs)}
+
+    def _entry(self, number):
+        term, offset, count = SEARCH_ENTRY.unpack_from(self._map, self._dictionary_offset + number * SEARCH_ENTRY.size)
+        return term.rstrip(b'\0'), offset, count
+
+    def _postings(self, offset, count):
+        postings = array.array('I')
+        postings.frombytes(self._map[offset:offset + count * postings.itemsize])
+        return postings
+
+    def _file_postings(self, term):
+        """Doc ids for term in the mapped file, found by binary search"""
+        low, high = 0, self._term_count
+        while low < high:
+            middle = (low + high) // 2
+            found, offset, count = self._entry(middle)
+            if found < term:
+                low = middle + 1
+            elif found > term:
+                high = middle
+            else:
+                return self._postings(offset, count)
+        return ()
+
+    def search(self, terms):
+        """Return the current documents that contain every term"""
+        with self._lock:
+            self._open()
+            matches = None
+            # Longer terms tend to be rarer, which keeps the intersection small
+            for term in sorted(terms, key=len, reverse=True):
+                ids = set(self._file_postings(term))
+                ids.update(self._delta.get(term, ()))
+                matches = ids if matches is None else matches & ids
+                if not matches:
+                    return []
+            return [self.docs[doc_id] for doc_id in matches if self.docs[doc_id] is not None]
+
+    def acquire_writer(self):
+        """Become the process that maintains the index, unless another one already is"""
+        if self.writer:
+            return True
+        os.makedirs(SEARCH_INDEX_DIR, exist_ok=True)
+        try:
+            import fcntl
+        except ImportError:
+            # No flock (not POSIX): there is only one process to consider
+            fcntl = None
+        lock_file = open(os.path.join(SEARCH_INDEX_DIR, 'writer.lock'), 'a')
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                return False
+        # Held open for the life of the process; the lock goes with it
+        self._writer_lock_file = lock_file
+        with self._lock:
+            self._open()
+        self.writer = True
+        logger.info(f"Process {os.getpid()} maintains the search index ({len(self.files)} files indexed)")
+        return True
+
+    def update_file(self, volume, name):
+        """Bring one file's postings up to date; returns True if anything changed"""
+        path = os.path.join(SEARCH_VOLUMES[volume], name)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            st = None
+        with self._write_lock:
+            doc_id = self.files.get((volume, name))
+            doc = self.docs[doc_id] if doc_id is not None else None
+            if st is None or not stat.S_ISREG(st.st_mode):
+                if doc_id is None:
+                    return False
+                with self._lock:
+                    self.docs[doc_id] = None
+                    del self.files[(volume, name)]
+                    self.dirty = True
+                return True
+            if doc is not None and doc[2:] == [st.st_size, st.st_mtime_ns, st.st_ino]:
+                return False
+            appended = doc is not None and doc[4] == st.st_ino and st.st_size > doc[2]
+            try:
+                terms = file_terms(path, doc[2] if appended else 0) or ()
+            except OSError as e:
+                logger.warning(f"Could not index {path}: {str(e)}")
+                return False
+            SEARCH_FILES_INDEXED.inc()
+            with self._lock:
+                if not appended:
+                    # A rewritten file is a new document; the old one stops matching
+                    if doc_id is not None:
+                        self.docs[doc_id] = None
+                    doc_id = len(self.docs)
+                    self.docs.append(None)
+                    self.files[(volume, name)] = doc_id
+                self.docs[doc_id] = [volume, name, st.st_size, st.st_mtime_ns, st.st_ino]
+                for term in terms:
+                    self._delta.setdefault(term, set()).add(doc_id)
+                self._delta_postings += len(terms)
+                self.dirty = True
+            return True
+
+    def scan(self, volume):
+        """Update every file in one volume, including ones that were removed"""
+        files, _ = volume_indexes[volume].listing()
+        names = {name for name in files if not name.startswith('.')}
+        names.update(name for indexed, name in list(self.files) if indexed == volume)
+        changed = 0
+        for name in sorted(names):
+            changed += self.update_file(volume, name)
+            if self._delta_postings >= SEARCH_DELTA_POSTINGS:
+                self.merge()
+        return changed
+
+    def _merged_terms(self):
+        """(term, doc ids in the file, doc ids in the delta) for every term, in order"""
+        delta_terms = sorted(self._delta)
+        position = 0
+        for number in range(self._term_count):
+            term, offset, count = self._entry(number)
+            while position < len(delta_terms) and delta_terms[position] < term:
+                yield delta_terms[position], (), self._delta[delta_terms[position]]
+                position += 1
+            delta = ()
+            if position < len(delta_terms) and delta_terms[position] == term:
+                delta = self._delta[term]
+                position += 1
+            yield term, self._postings(offset, count), delta
+        for term in delta_terms[position:]:
+            yield term, (), self._delta[term]
 
-# Read configuration from environment variables (from ConfigMaps)
-APP_NAME = os.environ.get('APP_NAME', 'k8s-master-app')
-APP_VERSION = os.environ.get('APP_VERSION', '1.0.0')
-ENVIRONMENT = os.environ.get('ENVIRONMENT', 'development')
-DATA_PATH = os.environ.get('DATA_PATH', '/data')
-CONFIG_PATH = os.environ.get('CONFIG_PATH', '/config')
-LOG_PATH = os.environ.get('LOG_PATH', '/logs')
+    def merge(self):
+        """Write the mapped file and the delta out as a new index file"""
+        with self._write_lock:
+            if not self.dirty:
+                return False
+            started = time.perf_counter()
+            # Current documents are renumbered from 0 in the new file
+            renumber = {}
+            docs = []
+            for doc_id, doc in enumerate(self.docs):
+                if doc is not None:
+                    renumber[doc_id] = len(docs)
+                    docs.append(doc)
+            temp = tempfile.NamedTemporaryFile(dir=SEARCH_INDEX_DIR, prefix='.merge-', delete=False)
+            try:
+                with temp, tempfile.TemporaryFile() as dictionary:
+                    temp.write(bytes(SEARCH_HEADER.size))
+                    offset = SEARCH_HEADER.size
+                    term_count = 0
+                    for term, postings, delta in self._merged_terms():
+                        ids = sorted({renumber[doc_id] for doc_id in itertools.chain(postings, delta)
+                                      if doc_id in renumber})
+                        if not ids:
+                            continue
+                        postings = array.array('I', ids)
+                        temp.write(postings.tobytes())
+                        dictionary.write(SEARCH_ENTRY.pack(term, offset, len(ids)))
+                        offset += len(ids) * postings.itemsize
+                        term_count += 1
+                    dictionary.seek(0)
+                    shutil.copyfileobj(dictionary, temp)
+                    docs_offset = offset + term_count * SEARCH_ENTRY.size
+                    body = json_dumps(docs)
+                    temp.write(body)
+                    temp.seek(0)
+                    temp.write(SEARCH_HEADER.pack(SEARCH_MAGIC, len(docs), term_count, offset, docs_offset, len(body)))
+            except BaseException:
+                os.unlink(temp.name)
+                raise
+            # Swap the file and drop the delta in one step: a search between
+            # the two would map the new numbering and read old delta ids
+            with self._lock:
+                os.replace(temp.name, self.path)
+                self._delta = {}
+                self._delta_postings = 0
+                self.dirty = False
+                self._open()
+            SEARCH_MERGES.inc()
+            logger.info(f"Search index written: {len(docs)} files, {term_count} terms "
+                        f"in {(time.perf_counter() - started) * 1000:.1f} ms")
+            return True
 
-# Read secrets from environment variables (from Secrets)
-# In a real app, these would be more sensitive values like API keys
-SECRET_KEY = os.environ.get('SECRET_KEY', 'default-dev-key')
-DB_PASSWORD = os.environ.get('DB_PASSWORD', 'default-password')
+    def status(self):
+        """Index size and state for /api/metrics"""
+        return {
+            'writer': self.writer,
+            'files': len(self.files),
+            'terms': self._term_count,
+            'delta_postings': self._delta_postings,
+            'file_bytes': len(self._map) if self._map is not None else 0
+        }
 
-# Generate a unique instance ID to demonstrate statelessness
-INSTANCE_ID = str(uuid.uuid4())[:8]
+search_index = SearchIndex(SEARCH_INDEX_FILE)
+search_refreshes = set()
+search_refreshes_lock = threading.Lock()
 
-# Track request count and application metrics
-request_count = 0
-start_time = time.time()
-metrics = {
-    'requests': 0,
-    'errors': 0,
-    'data_reads': 0,
-    'data_writes': 0
-}
+def refresh_search_index():
+    """Scheduled job: take over maintaining the index if needed, then update every volume"""
+    if not search_index.acquire_writer():
+        return
+    for volume in SEARCH_VOLUMES:
+        search_index.scan(volume)
 
-# Simulate application load for resource usage demonstration
-def background_worker():
-    """
-    Simulate background work to demonstrate resource usage.
-    In a real app, this might be processing tasks, etc.
-    """
-    logger.info("Background worker started")
-    counter = 0
-    while True:
-        # Simple CPU work - calculate prime numbers
-        counter += 1
-        if counter % 1000 == 0:
-            # Log occasionally to show activity
-            logger.debug(f"Background worker tick: {counter}")
-        time.sleep(0.1)  # Don't use too much CPU
+def refresh_search_volume(volume):
+    with search_refreshes_lock:
+        search_refreshes.discard(volume)
+    search_index.scan(volume)
 
-# Start the background worker
-worker_thread = threading.Thread(target=background_worker, daemon=True)
-worker_thread.start()
+def schedule_search_refresh(index):
+    """Called by the VolumeWatcher when a directory changes"""
+    if job_scheduler is None or not search_index.writer:
+        return
+    volume = next((name for name, path in SEARCH_VOLUMES.items() if volume_indexes[name] is index), None)
+    if volume is None:
+        return
+    with search_refreshes_lock:
+        if volume in search_refreshes:
+            return
+        search_refreshes.add(volume)
+    job_scheduler.submit(refresh_search_volume, volume, delay=SEARCH_REFRESH_DELAY,
+                         name='search-refresh', priority=PRIORITY_LOW)
 
-@app.route('/')
-def index():
-    """Main page showing application status and mounted volume information"""
-    global request_count, metrics
-    request_count += 1
-    metrics['requests'] += 1
-    
-    # Log the request
-    logger.info(f"Request to index page from {request.remote_addr}")
-    
-    # Get system information
-    system_info = {
-        'hostname': socket.gethostname(),
-        'platform': platform.platform(),
-        'python_version': platform.python_version(),
-        'cpu_count': psutil.cpu_count(),
-        'memory': f"{psutil.virtual_memory().total / (1024 * 1024):.1f} MB",
-        'uptime': f"{time.time() - start_time:.1f} seconds"
-    }
-    
-    # Get resource usage
-    resource_usage = {
-        'cpu_percent': psutil.cpu_percent(),
-        'memory_percent': psutil.virtual_memory().percent,
-        'disk_usage': f"{psutil.disk_usage('/').percent}%"
-    }
-    
-    # Get information about mounted volumes
-    volumes = {}
-    
-    # Check data volume
+def index_created_file(filename):
+    """Index a file just written to the data volume without waiting for a scan"""
+    if job_scheduler is not None and search_index.writer:
+        job_scheduler.submit(search_index.update_file, 'data', filename,
+                             name='search-index-file', priority=PRIORITY_LOW)
+
+def search_payload(query, limit):
+    """Build the /api/search document; returns (document, status)"""
+    terms = search_terms(query.encode('utf-8'))
+    if not terms:
+        return {'error': 'q must contain a word of at least two letters or digits'}, 400
+    SEARCH_QUERIES.inc()
+    started = time.perf_counter()
+    docs = sorted(search_index.search(terms), key=lambda doc: (doc[0], doc[1]))
+    results = []
+    for volume, name, size, mtime_ns, _ in docs[:limit]:
+        path = os.path.join(SEARCH_VOLUMES[volume], name)
+        results.append({
+            'volume': volume,
+            'path': path,
+            'size': size,
+            'modified': datetime.datetime.fromtimestamp(mtime_ns / 1e9),
+            'url': f"/view-file?path={quote(path)}"
+        })
+    return {
+        'query': query,
+        'terms': sorted(term.decode('ascii') for term in terms),
+        'total': len(docs),
+        'results': results,
+        'took_ms': (time.perf_counter() - started) * 1000
+    }, 200
+
+@app.route('/api/search')
+def search():
+    """Files in the data and log volumes that contain every word of ?q="""
     try:
-        data_files = os.listdir(DATA_PATH)
-        volumes['data'] = {
-            'path': DATA_PATH,
-            'files': data_files,
-            'status': 'mounted' if data_files else 'empty'
-        }
-        metrics['data_reads'] += 1
-    except Exception as e:
-        volumes['data'] = {
-            'path': DATA_PATH,
-            'error': str(e),
-            'status': 'error'
-        }
-        metrics['errors'] += 1
-    
-    # Check config volume
+        limit = min(SEARCH_MAX_PAGE_SIZE, max(1, int(request.args.get('limit', SEARCH_PAGE_SIZE))))
+    except ValueError:
+        return json_response({'error': 'limit must be an integer'}, 400)
+    document, status = search_payload(request.args.get('q', ''), limit)
+    return json_response(document, status)
+
+# Live log tailing - /api/logs/stream?file=app.log follows a file in LOG_PATH
+# and pushes each new line to the client as a server-sent event. However many
+# clients follow a file, it is read once: a single LogFollower per file polls
+# it on the job scheduler and hands every batch of new lines to each
+# subscriber's queue. ?lines=N first sends the last N lines, found by reading
+# backwards from the end. A subscriber that falls LOG_STREAM_QUEUE_SIZE
+# batches behind loses lines and is told how many.
+LOG_STREAM_POLL_INTERVAL = float(os.environ.get('LOG_STREAM_POLL_INTERVAL', '0.5'))
+LOG_STREAM_HEARTBEAT = float(os.environ.get('LOG_STREAM_HEARTBEAT', '15'))
+LOG_STREAM_QUEUE_SIZE = int(os.environ.get('LOG_STREAM_QUEUE_SIZE', '256'))
+LOG_STREAM_MAX_LINES = int(os.environ.get('LOG_STREAM_MAX_LINES', '1000'))
+# Read at most this much per poll; the rest is picked up on the next one
+LOG_STREAM_MAX_READ = int(os.environ.get('LOG_STREAM_MAX_READ', str(1024 * 1024)))
+
+LOG_STREAM_SUBSCRIBERS = registry.gauge('app_log_stream_subscribers', 'Clients following a log file')
+LOG_STREAM_LINES = registry.counter('app_log_stream_lines_total', 'Lines read from followed log files')
+LOG_STREAM_DROPPED = registry.counter('app_log_stream_dropped_lines_total', 'Lines not sent to a subscriber that fell behind')
+
+class LogFollower:
+    """Reads the lines appended to one file and hands them to every subscriber"""
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, 'rb')
+        self._file.seek(0, os.SEEK_END)
+        self.position = self._file.tell()
+        self._partial = b''
+        self.subscribers = []
+        self.job = None
+
+    def _read(self):
+        data = self._file.read(LOG_STREAM_MAX_READ)
+        if not data:
+            return []
+        self.position += len(data)
+        lines = (self._partial + data).split(b'\n')
+        self._partial = lines.pop()
+        if len(self._partial) >= LOG_STREAM_MAX_READ:
+            # Don't buffer an endless line; send what there is
+            lines.append(self._partial)
+            self._partial = b''
+        return lines
+
+    def _reopen(self):
+        self._file.close()
+        self._file = open(self.path, 'rb')
+        self.position = 0
+        self._partial = b''
+
+    def poll(self):
+        """Scheduled job: read new lines and deliver them"""
+        with self._lock:
+            if self._file.closed:
+                # The last subscriber left while this run was waiting
+                return
+            lines = self._read()
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                st = None
+            if st is not None and st.st_ino != os.fstat(self._file.fileno()).st_ino:
+                # Rotated: finish the old file, then follow the new one from its start
+                lines += self._read()
+                self._reopen()
+                lines += self._read()
+            elif st is not None and st.st_size < self.position:
+                # Truncated in place
+                self._file.seek(0)
+                self.position = 0
+                self._partial = b''
+                lines += self._read()
+            subscribers = list(self.subscribers)
+        if lines:
+            LOG_STREAM_LINES.inc(len(lines))
+            for subscriber in subscribers:
+                subscriber.deliver(lines)
+
+    def backlog(self, lines):
+        """The last `lines` complete lines before the point live lines start from"""
+        with self._lock:
+            end = self.position - len(self._partial)
+        with open(self.path, 'rb') as f:
+            start = tail_offset(f, end, lines)
+            f.seek(start)
+            return f.read(end - start).splitlines()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+class LogSubscription:
+    """One client's queue of line batches from a LogFollower"""
+    def __init__(self):
+        self.queue = queue.Queue(LOG_STREAM_QUEUE_SIZE)
+        self.dropped = 0
+
+    def deliver(self, lines):
+        try:
+            self.queue.put_nowait(lines)
+        except queue.Full:
+            self.dropped += len(lines)
+            LOG_STREAM_DROPPED.inc(len(lines))
+
+    def take_dropped(self):
+        dropped, self.dropped = self.dropped, 0
+        return dropped
+
+log_followers = {}
+log_followers_lock = threading.Lock()
+
+def log_file_path(name):
+    """Resolve ?file= to a file directly in LOG_PATH; raises ValueError otherwise"""
+    if os.path.dirname(name) not in ('', LOG_PATH.rstrip('/')):
+        raise ValueError('file must be a file in the log volume')
+    name = os.path.basename(name)
+    path = os.path.join(LOG_PATH, name)
+    if not name or name.startswith('.') or not os.path.isfile(path):
+        raise ValueError(f"No such log file: {name}")
+    return path
+
+def subscribe_log(path, subscription):
+    """Add a subscriber to path's follower, starting one if this is the first"""
+    with log_followers_lock:
+        follower = log_followers.get(path)
+        if follower is None:
+            follower = log_followers[path] = LogFollower(path)
+            follower.job = job_scheduler.every(LOG_STREAM_POLL_INTERVAL, follower.poll,
+                                               name='log-follow', priority=PRIORITY_HIGH)
+        with follower._lock:
+            follower.subscribers.append(subscription)
+    LOG_STREAM_SUBSCRIBERS.inc()
+    return follower
+
+def unsubscribe_log(follower, subscription):
+    """Remove a subscriber; the last one out stops the follower"""
+    with log_followers_lock:
+        with follower._lock:
+            follower.subscribers.remove(subscription)
+            last = not follower.subscribers
+        if last:
+            follower.job.cancel()
+            del log_followers[follower.path]
+            follower.close()
+    LOG_STREAM_SUBSCRIBERS.dec()
+
+def sse_lines(lines):
+    """Encode lines as server-sent events, one event per line"""
+    return b''.join(b'data: ' + line.rstrip(b'\r') + b'\n\n' for line in lines)
+
+def sse_dropped(count):
+    return f"event: dropped\ndata: {count}\n\n".encode('ascii')
+
+def parse_log_stream_args(args):
+    """Return (path, backlog lines) for /api/logs/stream; raises ValueError"""
     try:
-        config_files = os.listdir(CONFIG_PATH)
-        volumes['config'] = {
-            'path': CONFIG_PATH,
-            'files': config_files,
-            'status': 'mounted' if config_files else 'empty'
-        }
-    except Exception as e:
-        volumes['config'] = {
-            'path': CONFIG_PATH,
-            'error': str(e),
-            'status': 'error'
-        }
-        metrics['errors'] += 1
-    
-    # Check logs volume
+        lines = min(LOG_STREAM_MAX_LINES, max(0, int(args.get('lines', 0))))
+    except ValueError:
+        raise ValueError('lines must be an integer')
+    return log_file_path(args.get('file', '')), lines
+
+def follow_log(path, lines):
+    """Yield a follower's lines as server-sent events until the client goes away"""
+    subscription = LogSubscription()
+    follower = subscribe_log(path, subscription)
     try:
-        logs_files = os.listdir(LOG_PATH)
-        volumes['logs'] = {
-            'path': LOG_PATH,
-            'files': logs_files,
-            'status': 'mounted' if logs_files else 'empty'
-        }
-    except Exception as e:
-        volumes['logs'] = {
-            'path': LOG_PATH,
-            'error': str(e),
-            'status': 'error'
-        }
-        metrics['errors'] += 1
-    
-    # Build HTML content using a template
-    html_content = """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>{{ app_name }} - Kubernetes Master App</title>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <style>
-            body { 
-                font-family: Arial, sans-serif; 
-                line-height: 1.6; 
-                margin: 0; 
-                padding: 20px; 
-                background-color: #f5f5f5;
-                color: #333;
-            }
-            h1, h2, h3 { color: #2c3e50; }
-            .container { 
-                max-width: 1000px; 
-                margin: 0 auto; 
-                background-color: white;
-                padding: 20px;
-                border-radius: 8px;
-                box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-            }
-            .info-box { 
-                background-color: #f8f9fa; 
-                border-radius: 5px; 
-                padding: 15px; 
-                margin-bottom: 20px; 
-                border-left: 4px solid #3498db;
-            }
-            .success { color: #27ae60; }
-            .error { color: #e74c3c; }
-            .warning { color: #f39c12; }
-            .info { color: #3498db; }
-            .file-list { 
-                background-color: #f9f9f9; 
-                border-radius: 5px; 
-                padding: 10px; 
-                border: 1px solid #ddd;
-            }
-            .file-item {
-                display: flex;
-                justify-content: space-between;
-                padding: 5px 10px;
-                border-bottom: 1px solid #eee;
-            }
-            .file-item:last-child {
-                border-bottom: none;
-            }
-            .nav-links {
-                display: flex;
-                gap: 10px;
-                margin-top: 20px;
-            }
-            .nav-link {
-                display: inline-block;
-                padding: 8px 16px;
-                background-color: #3498db;
-                color: white;
-                text-decoration: none;
-                border-radius: 4px;
-                font-weight: bold;
-                transition: background-color 0.3s;
-            }
-            .nav-link:hover {
-                background-color: #2980b9;
-            }
-            .metrics {
-                display: flex;
-                gap: 10px;
-                flex-wrap: wrap;
-            }
-            .metric-card {
-                flex: 1;
-                min-width: 120px;
-                background-color: #fff;
-                padding: 15px;
-                border-radius: 8px;
-                box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                text-align: center;
-            }
-            .metric-value {
-                font-size: 24px;
-                font-weight: bold;
-                margin: 10px 0;
-                color: #3498db;
-            }
-            .metric-label {
-                font-size: 14px;
-                color: #7f8c8d;
-            }
-            .badge {
-                display: inline-block;
-                padding: 3px 8px;
-                border-radius: 12px;
-                font-size: 12px;
-                font-weight: bold;
-                color: white;
-                background-color: #95a5a6;
-            }
-            .badge-primary { background-color: #3498db; }
-            .badge-success { background-color: #27ae60; }
-            .badge-warning { background-color: #f39c12; }
-            .badge-danger { background-color: #e74c3c; }
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <h1>{{ app_name }} <span class="badge badge-primary">v{{ app_version }}</span></h1>
-            <p>A comprehensive Kubernetes demonstration application</p>
-            
-            <div class="info-box">
-                <h2>Pod Information</h2>
-                <p><strong>Instance ID:</strong> {{ instance_id }}</p>
-                <p><strong>Hostname:</strong> {{ system_info.hostname }}</p>
-                <p><strong>Environment:</strong> <span class="badge badge-success">{{ environment }}</span></p>
-                <p><strong>Request count:</strong> {{ request_count }}</p>
-                <p><strong>Platform:</strong> {{ system_info.platform }}</p>
-                <p><strong>Uptime:</strong> {{ system_info.uptime }}</p>
-            </div>
-            
-            <div class="info-box">
-                <h2>Resource Usage</h2>
-                <div class="metrics">
-                    <div class="metric-card">
-                        <div class="metric-label">CPU Usage</div>
-                        <div class="metric-value">{{ resource_usage.cpu_percent }}%</div>
-                    </div>
-                    <div class="metric-card">
-                        <div class="metric-label">Memory</div>
-                        <div class="metric-value">{{ resource_usage.memory_percent }}%</div>
-                    </div>
-                    <div class="metric-card">
-                        <div class="metric-label">Disk</div>
-                        <div class="metric-value">{{ resource_usage.disk_usage }}</div>
-                    </div>
-                    <div class="metric-card">
-                        <div class="metric-label">Requests</div>
-                        <div class="metric-value">{{ metrics.requests }}</div>
-                    </div>
-                </div>
-            </div>
-            
-            <div class="info-box">
-                <h2>Mounted Volumes</h2>
-                
-                <h3>Data Volume</h3>
-                <p><strong>Path:</strong> {{ volumes.data.path }}</p>
-                <p><strong>Status:</strong> 
-                    {% if volumes.data.status == 'mounted' %}
-                        <span class="success">Successfully mounted</span>
-                    {% elif volumes.data.status == 'empty' %}
-                        <span class="warning">Mounted but empty</span>
-                    {% else %}
-                        <span class="error">Error: {{ volumes.data.error }}</span>
-                    {% endif %}
-                </p>
-                
-                {% if volumes.data.files %}
-                <div class="file-list">
-                    <h4>Files:</h4>
-                    {% for file in volumes.data.files %}
-                    <div class="file-item">
-                        <span>{{ file }}</span>
-                        <a href="/view-file?path={{ volumes.data.path }}/{{ file }}" class="nav-link">View</a>
-                    </div>
-                    {% endfor %}
-                </div>
-                {% endif %}
-                
-                <h3>Config Volume</h3>
-                <p><strong>Path:</strong> {{ volumes.config.path }}</p>
-                <p><strong>Status:</strong> 
-                    {% if volumes.config.status == 'mounted' %}
-                        <span class="success">Successfully mounted</span>
-                    {% elif volumes.config.status == 'empty' %}
-                        <span class="warning">Mounted but empty</span>
-                    {% else %}
-                        <span class="error">Error: {{ volumes.config.error }}</span>
-                    {% endif %}
-                </p>
-                
-                {% if volumes.config.files %}
-                <div class="file-list">
-                    <h4>Files:</h4>
-                    {% for file in volumes.config.files %}
-                    <div class="file-item">
-                        <span>{{ file }}</span>
-                        <a href="/view-file?path={{ volumes.config.path }}/{{ file }}" class="nav-link">View</a>
-                    </div>
-                    {% endfor %}
-                </div>
-                {% endif %}
-                
-                <h3>Logs Volume</h3>
-                <p><strong>Path:</strong> {{ volumes.logs.path }}</p>
-                <p><strong>Status:</strong> 
-                    {% if volumes.logs.status == 'mounted' %}
-                        <span class="success">Successfully mounted</span>
-                    {% elif volumes.logs.status == 'empty' %}
-                        <span class="warning">Mounted but empty</span>
-                    {% else %}
-                        <span class="error">Error: {{ volumes.logs.error }}</span>
-                    {% endif %}
-                </p>
-                
-                {% if volumes.logs.files %}
-                <div class="file-list">
-                    <h4>Files:</h4>
-                    {% for file in volumes.logs.files %}
-                    <div class="file-item">
-                        <span>{{ file }}</span>
-                        <a href="/view-file?path={{ volumes.logs.path }}/{{ file }}" class="nav-link">View</a>
-                    </div>
-                    {% endfor %}
-                </div>
-                {% endif %}
-            </div>
-            
-            <div class="info-box">
-                <h2>Actions</h2>
-                <div class="nav-links">
-                    <a href="/create-file" class="nav-link">Create a File</a>
-                    <a href="/api/info" class="nav-link">API Info</a>
-                    <a href="/api/health" class="nav-link">Health Check</a>
-                    <a href="/api/metrics" class="nav-link">Metrics</a>
-                </div>
-            </div>
-            
-            <div class="info-box">
-                <h2>Environment Variables</h2>
-                <p><strong>APP_NAME:</strong> {{ app_name }}</p>
-                <p><strong>APP_VERSION:</strong> {{ app_version }}</p>
-                <p><strong>ENVIRONMENT:</strong> {{ environment }}</p>
-                <p><strong>DATA_PATH:</strong> {{ data_path }}</p>
-                <p><strong>CONFIG_PATH:</strong> {{ config_path }}</p>
-                <p><strong>LOG_PATH:</strong> {{ log_path }}</p>
-                <p><strong>SECRET_KEY:</strong> {{ secret_key|truncate(10, True, '...') }}</p>
-            </div>
-        </div>
-    </body>
-    </html>
+        # Tells the client the stream is open, before any line arrives
+        yield b': following ' + os.path.basename(path).encode('utf-8') + b'\n\n'
+        if lines:
+            yield sse_lines(follower.backlog(lines))
+        while True:
+            try:
+                batch = subscription.queue.get(timeout=LOG_STREAM_HEARTBEAT)
+            except queue.Empty:
+                # Keeps proxies from closing an idle connection
+                yield b': keepalive\n\n'
+                continue
+            dropped = subscription.take_dropped()
+            if dropped:
+                yield sse_dropped(dropped)
+            yield sse_lines(batch)
+    finally:
+        unsubscribe_log(follower, subscription)
+
+SSE_HEADERS = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+
+@app.route('/api/logs/stream')
+def stream_log():
+    """Follow a log file as server-sent events: ?file=app.log&lines=100"""
+    try:
+        path, lines = parse_log_stream_args(request.args)
+    except ValueError as e:
+        return json_response({'error': str(e)}, 400)
+    logger.info(f"Following log file: {path}")
+    return app.response_class(follow_log(path, lines), mimetype='text/event-stream', headers=SSE_HEADERS)
+
+# Reading a log from a point in time - /view-log?file=app.log&at=<ISO time>
+# finds the segment that covers the time in the segment index (the active
+# file if none does) and shows the log from the first line written at or after
+# it. In the active file and uncompressed segments the line is found by binary
+# search on the timestamps at the start of each line; gzipped segments can't
+# seek backwards cheaply, so they are scanned forwards instead.
+VIEW_LOG_BYTES = int(os.environ.get('VIEW_LOG_BYTES', str(256 * 1024)))
+LOG_LINE_TIME = re.compile(rb'(\d{4})-(\d\d)-(\d\d) (\d\d):(\d\d):(\d\d),(\d{3})')
+
+def log_line_time(line):
+    """Unix time of a line that starts with LOG_FORMAT's asctime, else None"""
+    match = LOG_LINE_TIME.match(line)
+    if match is None:
+        return None
+    fields = [int(field) for field in match.groups()]
+    return datetime.datetime(*fields[:6], fields[6] * 1000).timestamp()
+
+def parse_log_time(value):
+    """An ISO 8601 time (local unless it has an offset) or Unix time -> Unix time; raises ValueError"""
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.datetime.fromisoformat(value.strip().replace('Z', '+00:00')).timestamp()
+
+def timed_line_after(f, position):
+    """(offset, time) of the first timestamped line starting at or after position, or (None, None)"""
+    if position > 0:
+        # Finish the line position is in, unless it is at a line start
+        f.seek(position - 1)
+        f.readline()
+    else:
+        f.seek(0)
+    while True:
+        offset = f.tell()
+        line = f.readline()
+        if not line:
+            return None, None
+        when = log_line_time(line)
+        if when is not None:
+            return offset, when
+
+def log_offset_at(f, size, at, seekable=True):
+    """Byte offset of the first line logged at or after `at`"""
+    if not seekable:
+        offset, when = timed_line_after(f, 0)
+        while when is not None and when < at:
+            offset, when = timed_line_after(f, f.tell())
+        return size if offset is None else offset
+    low, high = 0, size
+    while low < high:
+        middle = (low + high) // 2
+        offset, when = timed_line_after(f, middle)
+        if offset is None or when >= at:
+            high = middle
+        else:
+            low = offset + 1
+    offset, _ = timed_line_after(f, low)
+    return size if offset is None else offset
+
+def log_segments(path):
+    """The segment index entries for a log file, oldest first"""
+    directory, name = os.path.split(path)
+    return read_segment_index(directory).get(name, {'active_since': None, 'segments': []})
+
+def open_log_at(path, at, limit=VIEW_LOG_BYTES):
     """
-    
-    # Render the template with our data
-    return render_template_string(
-        html_content,
-        app_name=APP_NAME,
-        app_version=APP_VERSION,
-        environment=ENVIRONMENT,
-        instance_id=INSTANCE_ID,
-        system_info=system_info,
-        resource_usage=resource_usage,
-        volumes=volumes,
-        request_count=request_count,
-        metrics=metrics,
-        data_path=DATA_PATH,
-        config_path=CONFIG_PATH,
-        log_path=LOG_PATH,
-        secret_key=SECRET_KEY
-    )
+    Open the segment of the log at path that covers time `at`. Returns
+    (file, segment path, start, end, size) with start at the first line
+    logged at or after `at`; the caller must close the file.
+    """
+    directory = os.path.dirname(path)
+    # A segment holds the lines logged before its end time; the active file the rest
+    candidates = [(os.path.join(directory, entry['file']), entry['compressed'], entry['size'])
+                  for entry in log_segments(path)['segments'] if entry['end'] >= at]
+    candidates.append((path, False, None))
+    for number, (segment_path, compressed, size) in enumerate(candidates):
+        if compressed:
+            f = gzip.open(segment_path, 'rb')
+        else:
+            f = open(segment_path, 'rb')
+            size = os.fstat(f.fileno()).st_size
+        try:
+            start = log_offset_at(f, size, at, seekable=not compressed)
+        except Exception:
+            f.close()
+            raise
+        # Nothing at or after `at` in this segment: it starts in the next one
+        if start < size or number == len(candidates) - 1:
+            return f, segment_path, start, min(size, start + limit), size
+        f.close()
 
-@app.route('/view-file')
-def view_file():
-    """View the contents of a file from a mounted volume"""
-    global metrics
-    
-    # Get the file path from the query parameters
-    file_path = request.args.get('path', '')
-    
-    # Security check to prevent directory traversal attacks
-    # Only allow access to our mounted volumes
-    allowed_paths = [DATA_PATH, CONFIG_PATH, LOG_PATH]
-    valid_path = False
-    
-    for path in allowed_paths:
-        if file_path.startswith(path):
-            valid_path = True
-            break
-    
-    if not valid_path:
-        metrics['errors'] += 1
-        return "Access denied: Invalid path", 403
-    
-    # Try to read the file
+def log_segments_payload(path):
+    state = log_segments(path)
+    as_time = datetime.datetime.fromtimestamp
+    return {
+        'file': os.path.basename(path),
+        'active_since': as_time(state['active_since']) if state['active_since'] else None,
+        'segments': [dict(entry, start=as_time(entry['start']), end=as_time(entry['end']))
+                     for entry in state['segments']]
+    }
+
+@app.route('/api/logs/segments')
+def log_segments_view():
+    """Rotated segments of a log file and the times they cover: ?file=app.log"""
     try:
-        with open(file_path, 'r') as f:
-            content = f.read()
-        
-        # Record the successful read
-        metrics['data_reads'] += 1
-        logger.info(f"File viewed: {file_path}")
-        
-        # Simple HTML to display the file content
-        html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>File: {os.path.basename(file_path)}</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; padding: 20px; }}
-                pre {{ background-color: #f8f9fa; padding: 15px; border-radius: 5px; overflow-x: auto; }}
-                .nav-link {{
-                    display: inline-block;
-                    padding: 8px 16px;
-                    background-color: #3498db;
-                    color: white;
-                    text-decoration: none;
-                    border-radius: 4px;
-                    font-weight: bold;
-                }}
-            </style>
-        </head>
-        <body>
-            <h1>File: {os.path.basename(file_path)}</h1>
-            <p>Path: {file_path}</p>
-            <pre>{content}</pre>
-            <a href="/" class="nav-link">Back to Home</a>
-        </body>
-        </html>
-        """
-        return html
+        path = log_file_path(request.args.get('file', ''))
+    except ValueError as e:
+        return json_response({'error': str(e)}, 400)
+    return json_response(log_segments_payload(path))
+
+@app.route('/view-log')
+def view_log():
+    """Show a log from a point in time: ?file=app.log&at=2026-10-18T19:00:00"""
+    try:
+        path = log_file_path(request.args.get('file', ''))
+        at = parse_log_time(request.args.get('at', ''))
+    except ValueError as e:
+        ERRORS.inc()
+        return str(e) or "at must be an ISO 8601 time", 400
+    try:
+        f, segment_path, start, end, size = open_log_at(path, at)
     except Exception as e:
-        metrics['errors'] += 1
-        logger.error(f"Error viewing file {file_path}: {str(e)}")
+        ERRORS.inc()
+        logger.error(f"Error viewing log {path}: {str(e)}")
         return f"Error reading file: {str(e)}", 500
+    DATA_READS.inc()
+    logger.info(f"Log viewed: {segment_path} from {datetime.datetime.fromtimestamp(at).isoformat()}")
+    return Response(stream_file_page(f, segment_path, start, end, size, None), mimetype='text/html')
 
-@app.route('/create-file', methods=['GET', 'POST'])
-def create_file():
-    """Create a new file in the mounted data volume"""
-    global metrics
-    
-    if request.method == 'POST':
-        filename = request.form.get('filename', '')
-        content = request.form.get('content', '')
-        
-        # Only allow creating files in the data directory
-        file_path = os.path.join(DATA_PATH, filename)
-        
-        # For security, don't allow directory traversal
-        if '..' in filename or '/' in filename:
-            metrics['errors'] += 1
-            return "Invalid filename. Directory traversal not allowed.", 400
-        
-        try:
-            with open(file_path, 'w') as f:
-                f.write(content)
-            
-            # Record the successful write
-            metrics['data_writes'] += 1
-            logger.info(f"File created: {file_path}")
-            
-            # Also write to the log volume to demonstrate multiple volume mounting
-            log_message = f"File created: {filename} at {datetime.datetime.now().isoformat()}\n"
-            with open(os.path.join(LOG_PATH, 'file_operations.log'), 'a') as log:
-                log.write(log_message)
-            
-            return redirect('/')
-        except Exception as e:
-            metrics['errors'] += 1
-            logger.error(f"Error creating file {file_path}: {str(e)}")
-            return f"Error creating file: {str(e)}", 500
-    else:
-        # Show form for creating a file
-        html = """
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Create File</title>
-            <style>
-                body { font-family: Arial, sans-serif; line-height: 1.6; padding: 20px; }
-                .form-group { margin-bottom: 15px; }
-                label { display: block; margin-bottom: 5px; }
-                input[type="text"], textarea {
-                    width: 100%;
-                    padding: 8px;
-                    border: 1px solid #ddd;
-                    border-radius: 4px;
-                }
-                textarea { height: 200px; }
-                button {
-                    padding: 8px 16px;
-                    background-color: #3498db;
-                    color: white;
-                    border: none;
-                    border-radius: 4px;
-                    cursor: pointer;
-                    font-weight: bold;
-                }
-                .nav-link {
-                    display: inline-block;
-                    padding: 8px 16px;
-                    background-color: #95a5a6;
-                    color: white;
-                    text-decoration: none;
-                    border-radius: 4px;
-                    font-weight: bold;
-                }
-            </style>
-        </head>
-        <body>
-            <h1>Create a New File</h1>
-            <p>This file will be saved to the mounted data volume.</p>
-            
-            <form method="post">
-                <div class="form-group">
-                    <label for="filename">Filename:</label>
-                    <input type="text" id="filename" name="filename" required placeholder="example.txt">
-                </div>
-                
-                <div class="form-group">
-                    <label for="content">Content:</label>
-                    <textarea id="content" name="content" required placeholder="Enter file content here..."></textarea>
-                </div>
-                
-                <div class="form-group">
-                    <button type="submit">Create File</button>
-                    <a href="/" class="nav-link">Cancel</a>
-                </div>
-            </form>
-        </body>
-        </html>
-        """
-        return html
+# /api/info is rebuilt at most every INFO_CACHE_TTL seconds; in between the
+# same body is served. Its ETag is weak: a hash of the body without the
+# fields that change on every rebuild (INFO_VOLATILE_FIELDS), so a poller
+# gets a 304 until something that describes the instance changes, such as a
+# volume being mounted or unmounted.
+INFO_CACHE_TTL = float(os.environ.get('INFO_CACHE_TTL', '1.0'))
+INFO_VOLATILE_FIELDS = frozenset(('request_count', 'uptime_seconds', 'timestamp'))
+INFO_VOLUMES = (('data', DATA_PATH), ('config', CONFIG_PATH), ('logs', LOG_PATH))
+info_cache = {}
 
-@app.route('/api/info')
-def api_info():
-    """API endpoint returning application information"""
-    return jsonify({
+def volume_states():
+    """Whether each volume is mounted and readable, in INFO_VOLUMES order"""
+    return tuple(os.access(path, os.R_OK) for _, path in INFO_VOLUMES)
+
+@functools.lru_cache(maxsize=8)
+def volumes_document(states):
+    """The 'volumes' block of /api/info, built once per combination of mount states"""
+    return {
+        name: {'path': path, 'mounted': mounted}
+        for (name, path), mounted in zip(INFO_VOLUMES, states)
+    }
+
+def api_info_payload(states=None):
+    """Build the /api/info document"""
+    if states is None:
+        states = volume_states()
+    return {
         'app_name': APP_NAME,
         'version': APP_VERSION,
         'environment': ENVIRONMENT,
         'instance_id': INSTANCE_ID,
-        'hostname': socket.gethostname(),
-        'request_count': request_count,
+        'hostname': host_facts()['hostname'],
+        'request_count': int(registry.total(REQUESTS)),
         'uptime_seconds': time.time() - start_time,
-        'volumes': {
-            'data': {
-                'path': DATA_PATH,
-                'mounted': os.path.exists(DATA_PATH) and os.access(DATA_PATH, os.R_OK)
-            },
-            'config': {
-                'path': CONFIG_PATH,
-                'mounted': os.path.exists(CONFIG_PATH) and os.access(CONFIG_PATH, os.R_OK)
-            },
-            'logs': {
-                'path': LOG_PATH,
-                'mounted': os.path.exists(LOG_PATH) and os.access(LOG_PATH, os.R_OK)
-            }
-        },
-        'timestamp': datetime.datetime.now().isoformat()
-    })
+        'volumes': volumes_document(states),
+        'timestamp': datetime.datetime.now()
+    }
+
+def api_info_document():
+    """The current /api/info body and its ETag, rebuilt once INFO_CACHE_TTL has passed"""
+    states = volume_states()
+    cached = info_cache.get('document')
+    now = time.monotonic()
+    if cached is None or now - cached[0] >= INFO_CACHE_TTL or cached[1] != states:
+        payload = api_info_payload(states)
+        stable = {key: value for key, value in payload.items() if key not in INFO_VOLATILE_FIELDS}
+        cached = (now, states, json_dumps(payload), hashlib.sha1(json_dumps(stable)).hexdigest()[:16])
+        info_cache['document'] = cached
+    return cached[2], cached[3]
+
+@app.route('/api/info')
+def api_info():
+    """API endpoint returning application information"""
+    body, etag = api_info_document()
+    if client_has_current(request.headers.get('If-None-Match'), None, etag):
+        return not_modified_response(etag, weak=True)
+    response = app.response_class(body, mimetype='application/json')
+    response.set_etag(etag, weak=True)
+    response.cache_control.no_cache = True
+    return response
 
 @app.route('/api/health')
 def health_check():
     """Health check endpoint for Kubernetes liveness and readiness probes"""
-    # Check if we can access our mounted volumes
-    data_ok = os.path.exists(DATA_PATH) and os.access(DATA_PATH, os.R_OK)
-    config_ok = os.path.exists(CONFIG_PATH) and os.access(CONFIG_PATH, os.R_OK)
-    logs_ok = os.path.exists(LOG_PATH) and os.access(LOG_PATH, os.W_OK)
-    
-    # For a real application, you might check database connections, 
-    # cache availability, etc.
-    
-    # Overall health status
-    is_healthy = data_ok and config_ok and logs_ok
-    
-    # Log health check results
-    logger.info(f"Health check: {'PASS' if is_healthy else 'FAIL'}")
-    
-    response = {
-        'status': 'healthy' if is_healthy else 'unhealthy',
-        'checks': {
-            'data_volume': 'accessible' if data_ok else 'inaccessible',
-            'config_volume': 'accessible' if config_ok else 'inaccessible',
-            'logs_volume': 'writable' if logs_ok else 'not writable'
-        },
-        'timestamp': datetime.datetime.now().isoformat(),
-        'hostname': socket.gethostname()
-    }
-    
-    # Set the HTTP status code based on health
-    status_code = 200 if is_healthy else 503
-    
-    return jsonify(response), status_code
+    # The checks run in the background; this just returns their latest result
+    body, status_code = health_checks.response()
+    return app.response_class(body, status=status_code, mimetype='application/json')
 
-@app.route('/api/metrics')
-def get_metrics():
-    """API endpoint for application metrics - useful for monitoring systems"""
-    # Get basic resource usage stats
-    cpu_percent = psutil.cpu_percent()
-    memory_info = psutil.virtual_memory()
-    disk_info = psutil.disk_usage('/')
+@functools.lru_cache(maxsize=None)
+def instance_document():
+    """The 'instance' block of /api/metrics; it never changes, so it is built once"""
+    return {'id': INSTANCE_ID, 'hostname': host_facts()['hostname']}
+
+def metrics_payload():
+    """Build the /api/metrics document"""
+    # Get basic resource usage stats from the stats job's snapshot
+    stats = system_stats
     
     # Collect all metrics
+    app_metrics = application_metrics()
     all_metrics = {
         'system': {
-            'cpu_percent': cpu_percent,
-            'memory_used_percent': memory_info.percent,
-            'memory_used_mb': memory_info.used / (1024 * 1024),
-            'memory_total_mb': memory_info.total / (1024 * 1024),
-            'disk_used_percent': disk_info.percent,
-            'disk_used_gb': disk_info.used / (1024**3),
-            'disk_total_gb': disk_info.total / (1024**3)
+            'cpu_percent': stats.cpu_percent,
+            'memory_used_percent': stats.memory_percent,
+            'memory_used_mb': stats.memory_used / (1024 * 1024),
+            'memory_total_mb': stats.memory_total / (1024 * 1024),
+            'disk_used_percent': stats.disk_percent,
+            'disk_used_gb': stats.disk_used / (1024**3),
+            'disk_total_gb': stats.disk_total / (1024**3),
+            'sampled_at': datetime.datetime.fromtimestamp(stats.sampled_at)
         },
         'application': {
             'uptime_seconds': time.time() - start_time,
-            'total_requests': metrics['requests'],
-            'data_reads': metrics['data_reads'],
-            'data_writes': metrics['data_writes'],
-            'errors': metrics['errors']
+            'total_requests': app_metrics['requests'],
+            'data_reads': app_metrics['data_reads'],
+            'data_writes': app_metrics['data_writes'],
+            'errors': app_metrics['errors'],
+            'log_records_dropped': app_metrics['log_records_dropped'],
+            'uploads': app_metrics['uploads'],
+            'upload_bytes': app_metrics['upload_bytes'],
+            # Average rate while receiving uploads, not over the uptime
+            'upload_mb_per_second': (app_metrics['upload_bytes'] / (1024 * 1024) / app_metrics['upload_seconds']
+                                     if app_metrics['upload_seconds'] else 0.0)
         },
-        'instance': {
-            'id': INSTANCE_ID,
-            'hostname': socket.gethostname()
+        'compression': {
+            'encodings': available_encodings(),
+            'input_bytes': app_metrics['compression_input_bytes'],
+            'output_bytes': app_metrics['compression_output_bytes'],
+            'bytes_saved': app_metrics['compression_input_bytes'] - app_metrics['compression_output_bytes']
         },
-        'timestamp': datetime.datetime.now().isoformat()
+        'view_cache': dict(
+            view_cache.status(),
+            hits=app_metrics['view_cache_hits'],
+            misses=app_metrics['view_cache_misses'],
+            evictions=app_metrics['view_cache_evictions'],
+            hit_ratio=(app_metrics['view_cache_hits'] / (app_metrics['view_cache_hits'] + app_metrics['view_cache_misses'])
+                       if app_metrics['view_cache_hits'] + app_metrics['view_cache_misses'] else 0.0)
+        ),
+        'admission': admission.status(),
+        'scheduler': job_scheduler.status() if job_scheduler is not None else None,
+        'search': search_index.status(),
+        'instance': instance_document(),
+        'timestamp': datetime.datetime.now()
     }
     
     # Log metrics collection for demonstration
-    logger.debug(f"Metrics collected: CPU: {cpu_percent}%, Memory: {memory_info.percent}%")
+    logger.debug(f"Metrics collected: CPU: {stats.cpu_percent}%, Memory: {stats.memory_percent}%")
     
-    return jsonify(all_metrics)
+    return all_metrics
+
+@app.route('/api/metrics')
+def get_metrics():
+    """API endpoint for application metrics - useful for monitoring systems"""
+    return json_response(metrics_payload())
+
+# Metrics history - every HISTORY_INTERVAL seconds a scheduled job records
+# CPU, memory and disk usage (from the latest stats snapshot) and the pod's
+# request and error rates into fixed-size ring buffers, so trends can be seen
+# without an external time-series database. Samples are also averaged into
+# 1-minute and 5-minute levels that cover longer periods; memory use is fixed
+# when the process starts (about 350 KB with the default sizes).
+HISTORY_INTERVAL = float(os.environ.get('HISTORY_INTERVAL', '1.0'))
+# Points kept at each (step in seconds, capacity): an hour of samples, a day
+# of minutes and a week of 5-minute averages
+HISTORY_LEVELS = ((HISTORY_INTERVAL, int(os.environ.get('HISTORY_POINTS', '3600'))),
+                  (60.0, int(os.environ.get('HISTORY_1M_POINTS', '1440'))),
+                  (300.0, int(os.environ.get('HISTORY_5M_POINTS', '2016'))))
+HISTORY_MAX_POINTS = 5000
+HISTORY_FIELDS = ('cpu_percent', 'memory_percent', 'disk_percent', 'requests_per_second', 'errors_per_second')
+DURATION_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+class RingBuffer:
+    """
+    Fixed number of rows of float columns, stored column by column in
+    preallocated arrays; once full, each new row overwrites the oldest
+    """
+    def __init__(self, capacity, width):
+        self.capacity = capacity
+        # Column 0 holds the timestamps
+        self.columns = [array.array('d', bytes(8 * capacity)) for _ in range(width + 1)]
+        self.count = 0
+        self._next = 0
+
+    def append(self, timestamp, values):
+        row = self._next
+        self.columns[0][row] = timestamp
+        for column, value in zip(self.columns[1:], values):
+            column[row] = value
+        self._next = (row + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def _row(self, position):
+        """Array index of the position-th oldest row"""
+        return (self._next - self.count + position) % self.capacity
+
+    def since(self, start):
+        """Columns of the rows with timestamp >= start, oldest first, as lists"""
+        timestamps = self.columns[0]
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if timestamps[self._row(middle)] < start:
+                low = middle + 1
+            else:
+                high = middle
+        if low == self.count:
+            return [[] for _ in self.columns]
+        first, last = self._row(low), self._row(self.count - 1) + 1
+        if first < last:
+            return [column[first:last].tolist() for column in self.columns]
+        # The rows wrap around the end of the arrays
+        return [column[first:].tolist() + column[:last].tolist() for column in self.columns]
+
+class HistoryLevel:
+    """One resolution: a ring buffer plus the average being built for the current step"""
+    def __init__(self, step, capacity, width):
+        self.step = step
+        self.buffer = RingBuffer(capacity, width)
+        self.bucket = None
+        self.totals = [0.0] * width
+        self.samples = 0
+
+    def add(self, timestamp, values):
+        bucket = timestamp // self.step * self.step
+        if bucket != self.bucket and self.samples:
+            self.buffer.append(self.bucket, self.average())
+            self.totals = [0.0] * len(self.totals)
+            self.samples = 0
+        self.bucket = bucket
+        self.totals = [total + value for total, value in zip(self.totals, values)]
+        self.samples += 1
+
+    def average(self):
+        return [total / self.samples for total in self.totals]
+
+class MetricsHistory:
+    """Samples at HISTORY_INTERVAL, downsampled into the coarser HISTORY_LEVELS"""
+    def __init__(self, levels, fields):
+        self.fields = fields
+        self.levels = [HistoryLevel(step, capacity, len(fields)) for step, capacity in levels]
+        self._lock = threading.Lock()
+
+    def record(self, timestamp, values):
+        with self._lock:
+            self.levels[0].buffer.append(timestamp, values)
+            for level in self.levels[1:]:
+                level.add(timestamp, values)
+
+    def level_for(self, range_seconds, step):
+        """The coarsest level no coarser than step, or without a step the finest that covers the range"""
+        if step is not None:
+            return ([level for level in self.levels if level.step <= step] or self.levels[:1])[-1]
+        for level in self.levels:
+            if level.step * level.buffer.capacity >= range_seconds:
+                return level
+        return self.levels[-1]
+
+    def query(self, range_seconds, step=None):
+        """Return (step, columns) for the last range_seconds; columns[0] are the timestamps"""
+        level = self.level_for(range_seconds, step)
+        with self._lock:
+            columns = level.buffer.since(time.time() - range_seconds)
+            if level.samples:
+                # Include the step still being averaged
+                for column, value in zip(columns, [level.bucket] + level.average()):
+                    column.append(value)
+        if step is None or step <= level.step:
+            return level.step, columns
+        return step, downsample(columns, step)
+
+def downsample(columns, step):
+    """Average rows into buckets of step seconds"""
+    result = [[] for _ in columns]
+    rows = []
+    bucket = None
+    for row in zip(*columns):
+        row_bucket = row[0] // step * step
+        if row_bucket != bucket and rows:
+            result[0].append(bucket)
+            for position in range(1, len(columns)):
+                result[position].append(sum(r[position] for r in rows) / len(rows))
+            rows = []
+        bucket = row_bucket
+        rows.append(row)
+    if rows:
+        result[0].append(bucket)
+        for position in range(1, len(columns)):
+            result[position].append(sum(r[position] for r in rows) / len(rows))
+    return result
+
+def parse_duration(value):
+    """'90', '90s', '15m', '1h', '7d' -> seconds; raises ValueError"""
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)([smhd]?)', value.strip().lower())
+    if match is None or float(match.group(1)) <= 0:
+        raise ValueError(f"Invalid duration: {value!r}")
+    return float(match.group(1)) * DURATION_UNITS[match.group(2) or 's']
+
+metrics_history = MetricsHistory(HISTORY_LEVELS, HISTORY_FIELDS)
+history_totals = None
+
+def record_metrics_history():
+    """Scheduled every HISTORY_INTERVAL seconds: add one sample to the history"""
+    global history_totals
+    requests = registry.total(HTTP_LATENCY, HTTP_LATENCY.name + '_count')
+    errors = registry.total(ERRORS)
+    now = time.time()
+    previous, history_totals = history_totals, (now, requests, errors)
+    if previous is None:
+        # Rates need two samples
+        return
+    elapsed = now - previous[0]
+    stats = system_stats
+    metrics_history.record(now, (
+        stats.cpu_percent,
+        stats.memory_percent,
+        stats.disk_percent,
+        max(0.0, requests - previous[1]) / elapsed,
+        max(0.0, errors - previous[2]) / elapsed
+    ))
+
+def history_payload(range_arg, step_arg):
+    """Build the /api/metrics/history document; raises ValueError for bad arguments"""
+    range_seconds = parse_duration(range_arg or '15m')
+    step = parse_duration(step_arg) if step_arg else None
+    if range_seconds / (step or metrics_history.level_for(range_seconds, None).step) > HISTORY_MAX_POINTS:
+        raise ValueError(f"range/step would return more than {HISTORY_MAX_POINTS} points; use a larger step")
+    step, columns = metrics_history.query(range_seconds, step)
+    return {
+        'range_seconds': range_seconds,
+        'step_seconds': step,
+        'timestamps': columns[0],
+        'series': dict(zip(HISTORY_FIELDS, columns[1:]))
+    }
+
+@app.route('/api/metrics/history')
+def metrics_history_view():
+    """Recent metrics as time series: ?range=1h&step=1m (steps of 1s, 1m or 5m are stored)"""
+    try:
+        document = history_payload(request.args.get('range'), request.args.get('step'))
+    except ValueError as e:
+        return json_response({'error': str(e)}, 400)
+    return json_response(document)
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Metrics in Prometheus text format, including per-route latency histograms"""
+    return app.response_class(render_prometheus(), mimetype=None,
+                              content_type=PROMETHEUS_CONTENT_TYPE)
+
+mark_startup('routes')
+if STARTUP_REPORT:
+    total = sum(ms for _, ms in startup_report())
+    sys.stderr.write("Startup report (module body, excluding imports):\n")
+    for stage, ms in startup_report():
+        sys.stderr.write(f"  {stage:<20} {ms:8.2f} ms\n")
+    sys.stderr.write(f"  {'total':<20} {total:8.2f} ms\n")
 
-# For local testing - this won't run in Kubernetes
+# For local testing - this won't run in Kubernetes. In production use the
+# preforking launcher instead: python server.py
 if __name__ == '__main__':
     print(f"Starting {APP_NAME} v{APP_VERSION} in {ENVIRONMENT} mode")
     app.run(host='0.0.0.0', port=5000, debug=True)
@@ -0,0 +1,682 @@
+#!/usr/bin/env python3
+"""
+Kubernetes Master Application - ASGI mode
+=========================================
+
+Serves the same routes as app.py from an asyncio event loop instead of one
+thread per request. Blocking work (reading and writing files on the mounted
+volumes, refreshing directory listings) is handed to a thread pool, so a slow
+client or a slow file read only costs a coroutine rather than a worker thread
+and one process can hold thousands of concurrent connections.
+
+All state (metrics, cached listings, health checks, logging) is shared with
+app.py, which this module imports.
+
+Run it with any ASGI server, for example:
+    uvicorn asgi_app:application --host 0.0.0.0 --port 5000
+"""
+import asyncio
+import concurrent.futures
+import datetime
+import io
+import json
+import math
+import os
+import re
+import time
+from urllib.parse import parse_qsl
+
+import app as k8s_app
+from app import ERRORS, DATA_READS, REQUESTS, HTTP_LATENCY, logger
+
+# Threads used for blocking file I/O
+FILE_IO_THREADS = int(os.environ.get('FILE_IO_THREADS', '32'))
+# Largest /create-file form body accepted, in bytes
+MAX_FORM_SIZE = int(os.environ.get('MAX_FORM_SIZE', str(16 * 1024 * 1024)))
+
+file_io_pool = concurrent.futures.ThreadPoolExecutor(max_workers=FILE_IO_THREADS,
+                                                     thread_name_prefix='file-io')
+
+async def run_blocking(func, *args):
+    """Run a blocking function on the file I/O pool"""
+    return await asyncio.get_running_loop().run_in_executor(file_io_pool, func, *args)
+
+class Request:
+    """The parts of an ASGI HTTP scope the handlers need"""
+    def __init__(self, scope, receive):
+        self.method = scope['method']
+        self.path = scope['path']
+        query = parse_qsl(scope.get('query_string', b'').decode('latin-1'))
+        self.args = dict(query)
+        # Every value of repeated parameters, e.g. ?path=a&path=b
+        self.multi_args = {}
+        for name, value in query:
+            self.multi_args.setdefault(name, []).append(value)
+        self.headers = {name.decode('latin-1').lower(): value.decode('latin-1')
+                        for name, value in scope.get('headers', [])}
+        client = scope.get('client')
+        self.remote_addr = client[0] if client else None
+        self._receive = receive
+
+    async def stream(self):
+        """Yield the request body as it arrives"""
+        while True:
+            message = await self._receive()
+            if message['type'] == 'http.disconnect':
+                # Never treat a cut-off body as a complete one
+                raise ConnectionResetError("Client disconnected before the body was complete")
+            chunk = message.get('body', b'')
+            if chunk:
+                yield chunk
+            if not message.get('more_body', False):
+                return
+
+    async def body(self, limit=MAX_FORM_SIZE):
+        """Read the whole request body; raises ValueError past `limit` bytes"""
+        chunks = []
+        size = 0
+        async for chunk in self.stream():
+            size += len(chunk)
+            if size > limit:
+                raise ValueError(f"Request body larger than {limit} bytes")
+            chunks.append(chunk)
+        return b''.join(chunks)
+
+class BodyReader(io.RawIOBase):
+    """
+    Blocking file object over an ASGI request body, for code that runs on
+    the I/O pool and expects a stream (such as app.write_batch)
+    """
+    def __init__(self, request, loop):
+        self._chunks = request.stream().__aiter__()
+        self._loop = loop
+        self._buffer = b''
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._buffer:
+            try:
+                self._buffer = asyncio.run_coroutine_threadsafe(self._chunks.__anext__(), self._loop).result()
+            except StopAsyncIteration:
+                return 0
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+async def start_response(send, status, content_type, headers=()):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', content_type.encode('latin-1'))] +
+                   [(name.encode('latin-1'), str(value).encode('latin-1')) for name, value in headers]
+    })
+
+async def send_response(send, status, body, content_type='text/html; charset=utf-8', headers=()):
+    """Send a complete response and return its status code"""
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    await start_response(send, status, content_type,
+                         [('content-length', len(body))] + list(headers))
+    await send({'type': 'http.response.body', 'body': body})
+    return status
+
+def compressing_send(request, send):
+    """
+    Wrap send so compressible responses go out compressed, like
+    app.compress_response does for Flask. The response start is held back
+    until the first body message so that small complete bodies can be sent
+    uncompressed with their original headers.
+    """
+    encoding = k8s_app.negotiate_encoding(request.headers.get('accept-encoding', ''))
+    if encoding is None or request.method == 'HEAD':
+        return send
+    state = {'start': None, 'encoder': None, 'passthrough': False, 'size_in': 0, 'size_out': 0}
+
+    async def send_compressed(message):
+        if message['type'] == 'http.response.start':
+            headers = message.get('headers', [])
+            names = {name.lower() for name, _ in headers}
+            content_type = dict(headers).get(b'content-type', b'').decode('latin-1')
+            status = message['status']
+            if (b'content-encoding' in names or status < 200 or status in (204, 206, 304)
+                    or not k8s_app.is_compressible(content_type)):
+                state['passthrough'] = True
+                return await send(message)
+            state['start'] = message
+            return
+        if state['passthrough'] or message['type'] != 'http.response.body':
+            return await send(message)
+
+        body = message.get('body', b'')
+        more_body = message.get('more_body', False)
+        start = state['start']
+        if start is not None:
+            state['start'] = None
+            headers = [(name, value) for name, value in start['headers'] if name.lower() != b'content-length']
+            headers.append((b'vary', b'Accept-Encoding'))
+            if not more_body:
+                compressed = k8s_app.compress_bytes(encoding, body) if len(body) >= k8s_app.COMPRESS_MIN_SIZE else body
+                if len(compressed) >= len(body):
+                    state['passthrough'] = True
+                    await send(dict(start, headers=start['headers'] + [(b'vary', b'Accept-Encoding')]))
+                    return await send(message)
+                k8s_app.record_compression(encoding, len(body), len(compressed))
+                headers += [(b'content-encoding', encoding.encode('latin-1')),
+                            (b'content-length', str(len(compressed)).encode('latin-1'))]
+                await send(dict(start, headers=headers))
+                return await send({'type': 'http.response.body', 'body': compressed})
+            headers.append((b'content-encoding', encoding.encode('latin-1')))
+            await send(dict(start, headers=headers))
+            state['encoder'] = k8s_app.ENCODERS[encoding][0]()
+
+        encoder = state['encoder']
+        output = encoder.chunk(body) if body else b''
+        if not more_body:
+            output += encoder.finish()
+        state['size_in'] += len(body)
+        state['size_out'] += len(output)
+        if not more_body:
+            k8s_app.record_compression(encoding, state['size_in'], state['size_out'])
+        if output or not more_body:
+            await send({'type': 'http.response.body', 'body': output, 'more_body': more_body})
+
+    return send_compressed
+
+async def send_not_modified(send, headers):
+    await send({
+        'type': 'http.response.start',
+        'status': 304,
+        'headers': [(name.encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+    })
+    await send({'type': 'http.response.body', 'body': b''})
+    return 304
+
+async def send_json(send, document, status=200):
+    return await send_response(send, status, k8s_app.json_dumps(document), 'application/json')
+
+async def index(request, send):
+    """Main page showing application status and mounted volume information"""
+    REQUESTS.inc()
+    logger.info(f"Request to index page from {request.remote_addr}")
+    # Rendering may refresh a directory listing, so keep it off the loop
+    return await send_response(send, 200, await run_blocking(k8s_app.render_dashboard))
+
+async def static_asset(request, send, name, content_type, headers=()):
+    """Send a static asset, precompressed when the client accepts it"""
+    body, encoding = k8s_app.static_asset_body(name, request.headers.get('accept-encoding'))
+    headers = list(headers) + [('vary', 'Accept-Encoding')]
+    if encoding is not None:
+        headers.append(('content-encoding', encoding))
+    return await send_response(send, 200, body, content_type, headers)
+
+async def dashboard_css(request, send):
+    """Serve the dashboard stylesheet with a content ETag"""
+    encoding = k8s_app.negotiate_encoding(request.headers.get('accept-encoding', ''))
+    etag = f'"{k8s_app.DASHBOARD_CSS_ETAG}-{encoding}"' if encoding else f'"{k8s_app.DASHBOARD_CSS_ETAG}"'
+    headers = [('etag', etag), ('cache-control', f"public, max-age={k8s_app.DASHBOARD_CSS_MAX_AGE}")]
+    if etag in request.headers.get('if-none-match', ''):
+        await start_response(send, 304, 'text/css; charset=utf-8', headers + [('vary', 'Accept-Encoding')])
+        await send({'type': 'http.response.body', 'body': b''})
+        return 304
+    return await static_asset(request, send, 'dashboard.css', 'text/css; charset=utf-8', headers)
+
+async def list_volume(request, send, name):
+    """Paginated listing of a mounted volume"""
+    directory = k8s_app.volume_indexes.get(name)
+    if directory is None:
+        return await send_json(send, {'error': f"Unknown volume: {name}"}, 404)
+    try:
+        page = max(1, int(request.args.get('page', 1)))
+        per_page = min(k8s_app.VOLUME_MAX_PAGE_SIZE,
+                       max(1, int(request.args.get('per_page', k8s_app.VOLUME_PAGE_SIZE))))
+    except ValueError:
+        return await send_json(send, {'error': 'page and per_page must be integers'}, 400)
+    listing = await run_blocking(directory.page, page, per_page)
+    if 'files' in listing:
+        listing['files'] = list(listing['files'])
+    return await send_json(send, listing, 500 if listing['status'] == 'error' else 200)
+
+def parse_range(header, size):
+    """Parse a single 'bytes=start-end' Range header into (start, end), end exclusive"""
+    match = re.fullmatch(r'bytes=(\d*)-(\d*)', header.strip())
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    if match.group(1) == '':
+        start = max(0, size - int(match.group(2)))
+        end = size
+    else:
+        start = int(match.group(1))
+        end = min(size, int(match.group(2)) + 1) if match.group(2) else size
+    if start >= end:
+        return None
+    return start, end
+
+async def stream_raw(send, f, start, end, size, partial, headers=()):
+    """Send bytes start..end of f in chunks read on the I/O pool"""
+    headers = [('content-length', end - start), ('accept-ranges', 'bytes')] + list(headers)
+    if partial:
+        headers.append(('content-range', f"bytes {start}-{end - 1}/{size}"))
+    await start_response(send, 206 if partial else 200, 'application/octet-stream', headers)
+    await run_blocking(f.seek, start)
+    remaining = end - start
+    while remaining > 0:
+        chunk = await run_blocking(f.read, min(k8s_app.VIEW_CHUNK_SIZE, remaining))
+        if not chunk:
+            break
+        remaining -= len(chunk)
+        await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+    await send({'type': 'http.response.body', 'body': b''})
+    return 206 if partial else 200
+
+async def view_file(request, send):
+    """View the contents of a file from a mounted volume (see app.view_file)"""
+    file_path = await run_blocking(k8s_app.resolve_allowed_path, request.args.get('path', ''))
+    if file_path is None:
+        ERRORS.inc()
+        return await send_response(send, 403, "Access denied: Invalid path")
+    try:
+        offset, limit, tail = k8s_app.parse_file_window(request.args)
+    except ValueError:
+        ERRORS.inc()
+        return await send_response(send, 400, "offset, limit and tail must be integers")
+
+    try:
+        st = await run_blocking(os.stat, file_path)
+    except Exception as e:
+        ERRORS.inc()
+        logger.error(f"Error viewing file {file_path}: {str(e)}")
+        return await send_response(send, 500, f"Error reading file: {str(e)}")
+    raw = bool(request.args.get('raw'))
+    etag = k8s_app.file_etag(st) if raw else k8s_app.file_etag(st, offset, limit, tail)
+    validators = k8s_app.validator_headers(etag, st.st_mtime)
+    if k8s_app.client_has_current(request.headers.get('if-none-match'), request.headers.get('if-modified-since'),
+                                  etag, st.st_mtime):
+        return await send_not_modified(send, validators)
+
+    cache_key = (file_path, offset, limit, tail)
+    body = None if raw else k8s_app.view_cache.get(cache_key, etag)
+    if body is not None:
+        DATA_READS.inc()
+        return await send_response(send, 200, body, headers=validators)
+
+    try:
+        f, start, end, size = await run_blocking(k8s_app.open_file_window, file_path, offset, limit, tail)
+    except Exception as e:
+        ERRORS.inc()
+        logger.error(f"Error viewing file {file_path}: {str(e)}")
+        return await send_response(send, 500, f"Error reading file: {str(e)}")
+    DATA_READS.inc()
+
+    if raw:
+        logger.info(f"File downloaded: {file_path}")
+        window = parse_range(request.headers['range'], size) if 'range' in request.headers else None
+        try:
+            if window is None:
+                return await stream_raw(send, f, 0, size, size, partial=False, headers=validators)
+            return await stream_raw(send, f, window[0], window[1], size, partial=True, headers=validators)
+        finally:
+            await run_blocking(f.close)
+
+    logger.info(f"File viewed: {file_path} (bytes {start}-{end} of {size})")
+    next_url = k8s_app.next_window_url(file_path, end, size, limit, tail)
+    if end - start <= k8s_app.VIEW_CACHE_MAX_PAGE:
+        body = await run_blocking(k8s_app.render_file_page, f, file_path, start, end, size, next_url)
+        k8s_app.view_cache.put(cache_key, etag, body)
+        return await send_response(send, 200, body, headers=validators)
+    page = k8s_app.stream_file_page(f, file_path, start, end, size, next_url)
+    try:
+        await start_response(send, 200, 'text/html; charset=utf-8', validators)
+        while True:
+            # Each step of the generator reads one chunk, so run it on the pool
+            chunk = await run_blocking(next, page, None)
+            if chunk is None:
+                break
+            await send({'type': 'http.response.body', 'body': chunk.encode('utf-8'), 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        # Closes the file too
+        await run_blocking(page.close)
+    return 200
+
+async def receive_upload(request, filename):
+    """
+    Stream a raw request body into DATA_PATH/filename (see
+    app.write_upload_chunks); chunks are written on the I/O pool as they
+    arrive. Returns (file_path, size).
+    """
+    k8s_app.validate_filename(filename)
+    if int(request.headers.get('content-length') or 0) > k8s_app.MAX_UPLOAD_SIZE:
+        raise k8s_app.UploadTooLarge(f"Upload larger than {k8s_app.MAX_UPLOAD_SIZE} bytes")
+    started = time.perf_counter()
+    temp = None
+    try:
+        temp = await run_blocking(k8s_app.open_upload_temp)
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > k8s_app.MAX_UPLOAD_SIZE:
+                raise k8s_app.UploadTooLarge(f"Upload larger than {k8s_app.MAX_UPLOAD_SIZE} bytes")
+            await run_blocking(temp.write, chunk)
+    except BaseException:
+        if temp is not None:
+            await run_blocking(k8s_app.discard_upload, temp)
+        raise
+    return await run_blocking(k8s_app.commit_upload, temp, filename, started)
+
+async def create_file(request, send):
+    """
+    Create a new file in the mounted data volume, from the HTML form or a raw
+    request body (PUT or POST with ?filename=). Multipart uploads are only
+    supported by the WSGI app.
+    """
+    if request.method not in ('POST', 'PUT'):
+        return await static_asset(request, send, 'create-file.html', 'text/html; charset=utf-8')
+    content_type = request.headers.get('content-type', '').split(';')[0].strip().lower()
+    if content_type == 'multipart/form-data':
+        ERRORS.inc()
+        return await send_response(send, 415, "Send the file as a raw request body: PUT /create-file?filename=...")
+    if content_type != 'application/x-www-form-urlencoded':
+        try:
+            file_path, size = await receive_upload(request, request.args.get('filename', ''))
+        except ValueError as e:
+            return await send_response(send, 400, str(e))
+        except k8s_app.UploadTooLarge as e:
+            ERRORS.inc()
+            return await send_response(send, 413, str(e))
+        except Exception as e:
+            ERRORS.inc()
+            logger.error(f"Error creating file {request.args.get('filename', '')}: {str(e)}")
+            return await send_response(send, 500, f"Error creating file: {str(e)}")
+        return await send_json(send, {'path': file_path, 'size': size}, 201)
+
+    try:
+        form = dict(parse_qsl((await request.body()).decode('utf-8')))
+    except ValueError as e:
+        ERRORS.inc()
+        return await send_response(send, 413, str(e))
+    try:
+        await run_blocking(k8s_app.create_data_file, form.get('filename', ''), form.get('content', ''))
+    except ValueError as e:
+        return await send_response(send, 400, str(e))
+    except Exception as e:
+        ERRORS.inc()
+        logger.error(f"Error creating file {form.get('filename', '')}: {str(e)}")
+        return await send_response(send, 500, f"Error creating file: {str(e)}")
+    return await send_response(send, 302, b'', headers=[('location', '/')])
+
+async def stream_generator(send, status, content_type, body, headers=()):
+    """Send a response whose body comes from a blocking generator, one step per pool task"""
+    try:
+        await start_response(send, status, content_type, headers)
+        while True:
+            chunk = await run_blocking(next, body, None)
+            if chunk is None:
+                break
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        await run_blocking(body.close)
+    return status
+
+async def batch_read(request, send, paths):
+    """Stream many files in one response (see app.read_batch)"""
+    if len(paths) > k8s_app.BATCH_MAX_FILES:
+        ERRORS.inc()
+        return await send_json(send, {'error': f"More than {k8s_app.BATCH_MAX_FILES} files in one batch"}, 400)
+    try:
+        fmt = k8s_app.batch_response_format(request.args.get('format'), request.headers.get('accept'))
+    except ValueError as e:
+        return await send_json(send, {'error': str(e)}, 400)
+    logger.info(f"Batch read of {len(paths)} files as {fmt}")
+    headers = [('content-disposition', 'attachment; filename="files.tar"')] if fmt == 'tar' else []
+    return await stream_generator(send, 200, k8s_app.BATCH_FORMATS[fmt], k8s_app.read_batch(paths, fmt), headers)
+
+async def files_batch(request, send):
+    """Read (GET) or write (POST) many files in one request (see app.files_batch)"""
+    if request.method != 'POST':
+        return await batch_read(request, send, request.multi_args.get('path', []))
+    content_type = request.headers.get('content-type', '').split(';')[0].strip().lower()
+    fmt = k8s_app.BATCH_BODY_FORMATS.get(content_type)
+    if fmt is None:
+        ERRORS.inc()
+        return await send_json(send, {'error': f"Send the files as {' or '.join(k8s_app.BATCH_FORMATS.values())}"}, 415)
+    body = io.BufferedReader(BodyReader(request, asyncio.get_running_loop()))
+    result = await run_blocking(k8s_app.write_batch, body, fmt)
+    return await send_json(send, result, k8s_app.batch_write_status(result))
+
+async def files_batch_read(request, send):
+    """Like GET /api/files/batch, with the paths in a JSON body"""
+    try:
+        paths = json.loads(await request.body()).get('paths')
+    except (ValueError, AttributeError):
+        paths = None
+    if not isinstance(paths, list) or not all(isinstance(path, str) for path in paths):
+        ERRORS.inc()
+        return await send_json(send, {'error': 'Expected a JSON body like {"paths": ["/data/a.txt"]}'}, 400)
+    return await batch_read(request, send, paths)
+
+async def search(request, send):
+    """Files in the data and log volumes that contain every word of ?q="""
+    try:
+        limit = min(k8s_app.SEARCH_MAX_PAGE_SIZE,
+                    max(1, int(request.args.get('limit', k8s_app.SEARCH_PAGE_SIZE))))
+    except ValueError:
+        return await send_json(send, {'error': 'limit must be an integer'}, 400)
+    document, status = await run_blocking(k8s_app.search_payload, request.args.get('q', ''), limit)
+    return await send_json(send, document, status)
+
+class AsyncLogSubscription:
+    """A LogSubscription whose queue is read from the event loop"""
+    def __init__(self, loop):
+        self.loop = loop
+        self.queue = asyncio.Queue(k8s_app.LOG_STREAM_QUEUE_SIZE)
+        self.dropped = 0
+
+    def deliver(self, lines):
+        # Called on a scheduler thread
+        self.loop.call_soon_threadsafe(self._put, lines)
+
+    def _put(self, lines):
+        try:
+            self.queue.put_nowait(lines)
+        except asyncio.QueueFull:
+            self.dropped += len(lines)
+            k8s_app.LOG_STREAM_DROPPED.inc(len(lines))
+
+    def take_dropped(self):
+        dropped, self.dropped = self.dropped, 0
+        return dropped
+
+async def wait_for_disconnect(request):
+    while (await request._receive())['type'] != 'http.disconnect':
+        pass
+
+async def stream_log(request, send):
+    """Follow a log file as server-sent events: ?file=app.log&lines=100"""
+    try:
+        path, lines = k8s_app.parse_log_stream_args(request.args)
+    except ValueError as e:
+        return await send_json(send, {'error': str(e)}, 400)
+    logger.info(f"Following log file: {path}")
+    subscription = AsyncLogSubscription(asyncio.get_running_loop())
+    follower = await run_blocking(k8s_app.subscribe_log, path, subscription)
+    # A follower costs no thread while it waits, so only the disconnect tells us to stop
+    disconnected = asyncio.ensure_future(wait_for_disconnect(request))
+    try:
+        await start_response(send, 200, 'text/event-stream; charset=utf-8', k8s_app.SSE_HEADERS.items())
+        await send({'type': 'http.response.body', 'more_body': True,
+                    'body': b': following ' + os.path.basename(path).encode('utf-8') + b'\n\n'})
+        if lines:
+            backlog = await run_blocking(follower.backlog, lines)
+            await send({'type': 'http.response.body', 'body': k8s_app.sse_lines(backlog), 'more_body': True})
+        while not disconnected.done():
+            batch = asyncio.ensure_future(subscription.queue.get())
+            await asyncio.wait([batch, disconnected], timeout=k8s_app.LOG_STREAM_HEARTBEAT,
+                               return_when=asyncio.FIRST_COMPLETED)
+            if not batch.done():
+                batch.cancel()
+                if not disconnected.done():
+                    await send({'type': 'http.response.body', 'body': b': keepalive\n\n', 'more_body': True})
+                continue
+            body = k8s_app.sse_lines(batch.result())
+            dropped = subscription.take_dropped()
+            if dropped:
+                body = k8s_app.sse_dropped(dropped) + body
+            await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+    finally:
+        disconnected.cancel()
+        await run_blocking(k8s_app.unsubscribe_log, follower, subscription)
+    return 200
+
+async def log_segments(request, send):
+    """Rotated segments of a log file and the times they cover: ?file=app.log"""
+    try:
+        path = k8s_app.log_file_path(request.args.get('file', ''))
+    except ValueError as e:
+        return await send_json(send, {'error': str(e)}, 400)
+    return await send_json(send, await run_blocking(k8s_app.log_segments_payload, path))
+
+async def view_log(request, send):
+    """Show a log from a point in time: ?file=app.log&at=2026-10-18T19:00:00"""
+    try:
+        path = k8s_app.log_file_path(request.args.get('file', ''))
+        at = k8s_app.parse_log_time(request.args.get('at', ''))
+    except ValueError as e:
+        ERRORS.inc()
+        return await send_response(send, 400, str(e))
+    try:
+        f, segment_path, start, end, size = await run_blocking(k8s_app.open_log_at, path, at)
+    except Exception as e:
+        ERRORS.inc()
+        logger.error(f"Error viewing log {path}: {str(e)}")
+        return await send_response(send, 500, f"Error reading file: {str(e)}")
+    DATA_READS.inc()
+    logger.info(f"Log viewed: {segment_path} from {datetime.datetime.fromtimestamp(at).isoformat()}")
+    # Pages are at most VIEW_LOG_BYTES, so render them whole on the pool
+    body = await run_blocking(k8s_app.render_file_page, f, segment_path, start, end, size, None)
+    return await send_response(send, 200, body)
+
+async def api_info(request, send):
+    """API endpoint returning application information"""
+    body, etag = await run_blocking(k8s_app.api_info_document)
+    validators = k8s_app.validator_headers(etag, weak=True)
+    if k8s_app.client_has_current(request.headers.get('if-none-match'), None, etag):
+        return await send_not_modified(send, validators)
+    return await send_response(send, 200, body, 'application/json', validators)
+
+async def health_check(request, send):
+    """Health check endpoint for Kubernetes liveness and readiness probes"""
+    body, status_code = k8s_app.health_checks.response()
+    return await send_response(send, status_code, body, 'application/json')
+
+async def get_metrics(request, send):
+    """API endpoint for application metrics"""
+    return await send_json(send, await run_blocking(k8s_app.metrics_payload))
+
+async def metrics_history(request, send):
+    """Recent metrics as time series: ?range=1h&step=1m"""
+    try:
+        document = await run_blocking(k8s_app.history_payload, request.args.get('range'), request.args.get('step'))
+    except ValueError as e:
+        return await send_json(send, {'error': str(e)}, 400)
+    return await send_json(send, document)
+
+async def prometheus_metrics(request, send):
+    """Metrics in Prometheus text format"""
+    body = await run_blocking(k8s_app.render_prometheus)
+    return await send_response(send, 200, body, k8s_app.PROMETHEUS_CONTENT_TYPE)
+
+# path -> (endpoint name, handler, allowed methods). Endpoint names match the
+# Flask view functions so both modes report the same latency labels.
+ROUTES = {
+    '/': ('index', index, {'GET', 'HEAD'}),
+    '/assets/dashboard.css': ('dashboard_css', dashboard_css, {'GET', 'HEAD'}),
+    '/view-file': ('view_file', view_file, {'GET', 'HEAD'}),
+    '/create-file': ('create_file', create_file, {'GET', 'HEAD', 'POST', 'PUT'}),
+    '/api/info': ('api_info', api_info, {'GET', 'HEAD'}),
+    '/api/health': ('health_check', health_check, {'GET', 'HEAD'}),
+    '/api/metrics': ('get_metrics', get_metrics, {'GET', 'HEAD'}),
+    '/api/metrics/history': ('metrics_history_view', metrics_history, {'GET', 'HEAD'}),
+    '/metrics': ('prometheus_metrics', prometheus_metrics, {'GET', 'HEAD'}),
+    '/api/files/batch': ('files_batch', files_batch, {'GET', 'HEAD', 'POST'}),
+    '/api/files/batch/read': ('files_batch_read', files_batch_read, {'POST'}),
+    '/api/search': ('search', search, {'GET', 'HEAD'}),
+    '/api/logs/stream': ('stream_log', stream_log, {'GET'}),
+    '/api/logs/segments': ('log_segments_view', log_segments, {'GET', 'HEAD'}),
+    '/view-log': ('view_log', view_log, {'GET', 'HEAD'}),
+}
+VOLUME_PREFIX = '/api/volumes/'
+
+async def route(request, send):
+    """Route a request; returns (endpoint name, status code)"""
+    route = ROUTES.get(request.path)
+    if route is None and request.path.startswith(VOLUME_PREFIX):
+        name = request.path[len(VOLUME_PREFIX):]
+        if name and '/' not in name:
+            return 'list_volume', await list_volume(request, send, name)
+    if route is None:
+        return 'unmatched', await send_response(send, 404, "Not Found")
+    endpoint, handler, methods = route
+    if request.method not in methods:
+        return endpoint, await send_response(send, 405, "Method Not Allowed")
+    return endpoint, await handler(request, send)
+
+def endpoint_for(path):
+    if path.startswith(VOLUME_PREFIX) and path not in ROUTES:
+        return 'list_volume'
+    return ROUTES.get(path, ('unmatched',))[0]
+
+async def dispatch(request, send):
+    """Route a request through admission control; returns (endpoint name, status code)"""
+    endpoint = endpoint_for(request.path)
+    rejected = k8s_app.admission.admit(endpoint)
+    if rejected is not None:
+        status, reason, retry_after = rejected
+        body = k8s_app.json_dumps(k8s_app.rejection_document(endpoint, reason))
+        return endpoint, await send_response(send, status, body, 'application/json',
+                                             [('retry-after', math.ceil(retry_after))])
+    try:
+        return await route(request, send)
+    finally:
+        k8s_app.admission.release(endpoint)
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await run_blocking(k8s_app.start_background_services)
+            logger.info(f"Starting {k8s_app.APP_NAME} v{k8s_app.APP_VERSION} in ASGI mode")
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            file_io_pool.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def application(scope, receive, send):
+    """ASGI entry point"""
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    if scope['type'] != 'http':
+        return
+    started = time.perf_counter()
+    # Servers without lifespan support start the services on first request,
+    # on the pool: starting them reads the volumes and must not stall the loop
+    if k8s_app.background_pid != os.getpid():
+        await run_blocking(k8s_app.start_background_services)
+    request = Request(scope, receive)
+    send = compressing_send(request, send)
+    try:
+        endpoint, status = await dispatch(request, send)
+    except Exception as e:
+        ERRORS.inc()
+        logger.error(f"Unhandled error for {request.path}: {str(e)}")
+        endpoint, status = ROUTES.get(request.path, ('unmatched',))[0], 500
+        try:
+            await send_response(send, 500, "Internal Server Error")
+        except Exception:
+            # The response had already started
+            pass
+    HTTP_LATENCY.labels(endpoint=endpoint, status=status).observe(time.perf_counter() - started)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+JSON serialisation benchmark
+============================
+
+Measures, for each JSON endpoint, how long it takes to build the payload and
+to serialise it with the old encoder (json.dumps with default settings, which
+is what jsonify did) and with app.json_dumps() - orjson when installed,
+otherwise the compact stdlib encoder - plus the full request through the test
+client.
+
+Usage:
+    python bench/bench_json.py [--iterations N]
+
+Set JSON_ENCODER=stdlib to measure the fallback even when orjson is installed.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+# Point the app at temporary volumes before importing it
+_volumes = tempfile.mkdtemp(prefix='k8s-bench-')
+for _name in ('data', 'config', 'logs'):
+    os.makedirs(os.path.join(_volumes, _name), exist_ok=True)
+os.environ.setdefault('DATA_PATH', os.path.join(_volumes, 'data'))
+os.environ.setdefault('CONFIG_PATH', os.path.join(_volumes, 'config'))
+os.environ.setdefault('LOG_PATH', os.path.join(_volumes, 'logs'))
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import logging  # noqa: E402
+
+import app as k8s_app  # noqa: E402
+
+# Per-request INFO logging would dominate the timings
+logging.disable(logging.INFO)
+
+
+def timed(func, n):
+    """Run func n times and return microseconds per call"""
+    func()  # warm up
+    start = time.perf_counter()
+    for _ in range(n):
+        func()
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def old_dumps(value):
+    return json.dumps(value, default=k8s_app.json_default).encode('utf-8')
+
+
+def health_payload():
+    return json.loads(k8s_app.health_checks.response()[0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--iterations', type=int, default=5000)
+    args = parser.parse_args()
+
+    client = k8s_app.app.test_client()
+    # The first request starts the background services (stats snapshot, health checks)
+    client.get('/api/health')
+
+    endpoints = [
+        ('/api/info', k8s_app.api_info_payload),
+        ('/api/metrics', k8s_app.metrics_payload),
+        ('/api/health', health_payload),
+        ('/api/volumes/data', lambda: k8s_app.volume_indexes['data'].page()),
+    ]
+    encoder = k8s_app.json_backend()[0]
+    n = args.iterations
+    print(f"Encoder in use: {encoder}  ({n} iterations, microseconds per call)\n")
+    print(f"{'endpoint':<20} {'build':>9} {'json.dumps':>11} {'json_dumps()':>13} {'speedup':>8} {'request':>9}")
+    for path, build in endpoints:
+        payload = build()
+        build_us = timed(build, n)
+        old_us = timed(lambda: old_dumps(payload), n)
+        new_us = timed(lambda: k8s_app.json_dumps(payload), n)
+        request_us = timed(lambda: client.get(path), n // 5 or 1)
+        print(f"{path:<20} {build_us:>9.1f} {old_us:>11.1f} {new_us:>13.1f} "
+              f"{old_us / new_us:>7.1f}x {request_us:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Load test
+=========
+
+Starts the app against temporary data/config/logs directories, drives each
+route in turn with a fixed number of concurrent clients, and reports latency
+percentiles, requests per second, errors and the server's resident memory.
+Results are saved as JSON so runs from different commits can be compared.
+
+Usage:
+    python bench/bench_load.py [--mode wsgi|asgi|gunicorn] [--concurrency 20]
+                               [--duration 5] [--routes /,/api/info,...]
+                               [--output results.json] [--compare old.json]
+
+Routes are GET unless prefixed with a method, e.g. "PUT /create-file?filename=x";
+PUT and POST send --body-kb KB of data. {data} in a route is replaced with the
+temporary data directory, which holds sample.txt (--file-kb KB of text).
+
+Each request uses a new connection, like the Flask development server
+requires. The client is a single asyncio process, so at high concurrency it
+can become the bottleneck before the server does - compare runs made with the
+same settings on the same machine.
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+
+import bench_serving_modes
+from bench_serving_modes import make_volumes, percentile, start_server
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Also run under the gunicorn launcher; server.py reads its port from the environment
+SERVER_COMMANDS = bench_serving_modes.SERVER_COMMANDS
+SERVER_COMMANDS.setdefault('gunicorn', lambda port: [
+    sys.executable, '-c', f"import os; os.environ['PORT'] = '{port}'; import server; server.main()"])
+
+DEFAULT_ROUTES = [
+    '/',
+    '/api/info',
+    '/api/health',
+    '/api/metrics',
+    '/metrics',
+    '/api/volumes/data',
+    '/view-file?path={data}/sample.txt',
+    '/view-file?path={data}/sample.txt&raw=1',
+    'PUT /create-file?filename=load.bin',
+]
+
+def parse_route(spec, data_path):
+    """'PUT /path' -> ('PUT', '/path'); a bare path is a GET"""
+    method, _, path = spec.strip().rpartition(' ')
+    return (method or 'GET').upper(), path.replace('{data}', data_path)
+
+async def http_request(port, method, path, body=b''):
+    """Send one request on a new connection; returns (status, bytes received)"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        head = (f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n"
+                f"Content-Length: {len(body)}\r\nContent-Type: application/octet-stream\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+        status_line = await reader.readline()
+        received = len(status_line)
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                break
+            received += len(data)
+        return int(status_line.split()[1]), received
+    finally:
+        writer.close()
+
+def process_rss(pid):
+    """Resident memory of pid and its children (gunicorn workers), in bytes"""
+    try:
+        import psutil
+        process = psutil.Process(pid)
+        return sum(p.memory_info().rss for p in [process] + process.children(recursive=True))
+    except ImportError:
+        # Without psutil, only the server process itself
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except Exception:
+        return 0
+    return 0
+
+async def drive_route(port, method, path, body, concurrency, duration, server_pid):
+    """Run `concurrency` clients against one route for `duration` seconds"""
+    latencies = []
+    statuses = {}
+    errors = 0
+    peak_rss = 0
+    deadline = time.perf_counter() + duration
+
+    async def client():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                status, _ = await asyncio.wait_for(http_request(port, method, path, body), timeout=30)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+            if status >= 400:
+                errors += 1
+
+    async def sample_rss():
+        nonlocal peak_rss
+        while time.perf_counter() < deadline:
+            peak_rss = max(peak_rss, process_rss(server_pid))
+            await asyncio.sleep(0.5)
+
+    started = time.perf_counter()
+    await asyncio.gather(sample_rss(), *(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        'method': method,
+        'requests': len(latencies),
+        'errors': errors,
+        'statuses': {str(code): count for code, count in sorted(statuses.items())},
+        'rps': len(latencies) / elapsed,
+        'p50_ms': percentile(latencies, 0.5) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'max_ms': max(latencies) * 1000 if latencies else float('nan'),
+        'peak_rss_mb': peak_rss / (1024 * 1024),
+    }
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=APP_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+def print_results(results, baseline=None):
+    print(f"{'route':<48} {'RPS':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7} {'RSS MB':>7}")
+    for route, stats in results['routes'].items():
+        line = (f"{route[:48]:<48} {stats['rps']:>8.1f} {stats['p50_ms']:>8.2f} {stats['p99_ms']:>8.2f} "
+                f"{stats['errors']:>7} {stats['peak_rss_mb']:>7.1f}")
+        previous = (baseline or {}).get('routes', {}).get(route)
+        if previous and previous['rps'] and previous['p99_ms']:
+            line += (f"   RPS {(stats['rps'] / previous['rps'] - 1) * 100:+.0f}%"
+                     f"  p99 {(stats['p99_ms'] / previous['p99_ms'] - 1) * 100:+.0f}%")
+        print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--mode', choices=sorted(SERVER_COMMANDS), default='wsgi')
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--duration', type=float, default=5)
+    parser.add_argument('--routes', help='comma-separated routes (default: every route)')
+    parser.add_argument('--file-kb', type=int, default=64, help='size of {data}/sample.txt')
+    parser.add_argument('--body-kb', type=int, default=16, help='body size for PUT/POST routes')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--compare', help='JSON results of an earlier run to compare against')
+    args = parser.parse_args()
+
+    root, volumes, _ = make_volumes(0)
+    with open(os.path.join(volumes['data'], 'sample.txt'), 'w') as f:
+        f.write(''.join(f"line {i}: the quick brown fox jumps over the lazy dog\n"
+                        for i in range(args.file_kb * 1024 // 50)))
+    routes = [parse_route(spec, volumes['data'])
+              for spec in (args.routes.split(',') if args.routes else DEFAULT_ROUTES)]
+    body = os.urandom(args.body_kb * 1024)
+
+    results = {
+        'revision': git_revision(),
+        'recorded_at': datetime.datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'settings': {'mode': args.mode, 'concurrency': args.concurrency, 'duration': args.duration,
+                     'file_kb': args.file_kb, 'body_kb': args.body_kb},
+        'routes': {},
+    }
+    try:
+        process, port = start_server(args.mode, volumes)
+        try:
+            results['idle_rss_mb'] = process_rss(process.pid) / (1024 * 1024)
+            for method, path in routes:
+                route = f"{method} {path.replace(volumes['data'], '{data}')}"
+                print(f"  {route} ...", file=sys.stderr)
+                results['routes'][route] = asyncio.run(drive_route(
+                    port, method, path, body if method in ('PUT', 'POST') else b'',
+                    args.concurrency, args.duration, process.pid))
+        finally:
+            process.terminate()
+            process.wait()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"Compared with {baseline.get('revision')} ({baseline.get('recorded_at')})")
+    print(f"{args.mode} at revision {results['revision']}, concurrency {args.concurrency}, "
+          f"idle RSS {results['idle_rss_mb']:.1f} MB")
+    print_results(results, baseline)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+WSGI vs ASGI load test
+======================
+
+Starts the app twice - once under the threaded Flask server (app.py) and once
+under uvicorn (asgi_app.py) - and in each mode holds a number of slow clients
+that download a large file from the data volume a few KB at a time, while fast
+clients measure the latency of /api/info alongside them.
+
+Usage:
+    python bench/bench_serving_modes.py [--slow-clients 500] [--fast-clients 10]
+                                        [--duration 10] [--modes wsgi,asgi]
+
+ASGI mode needs uvicorn installed (pip install uvicorn).
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVER_COMMANDS = {
+    'wsgi': lambda port: [sys.executable, '-c',
+                          f"import app; app.app.run(host='127.0.0.1', port={port}, threaded=True)"],
+    'asgi': lambda port: [sys.executable, '-m', 'uvicorn', 'asgi_app:application',
+                          '--host', '127.0.0.1', '--port', str(port), '--log-level', 'warning',
+                          '--backlog', '4096'],
+}
+
+def make_volumes(big_file_mb):
+    """Create temporary data/config/logs directories with one large data file"""
+    root = tempfile.mkdtemp(prefix='k8s-bench-')
+    paths = {}
+    for name in ('data', 'config', 'logs'):
+        paths[name] = os.path.join(root, name)
+        os.makedirs(paths[name])
+    big_file = os.path.join(paths['data'], 'big.bin')
+    with open(big_file, 'wb') as f:
+        f.write(os.urandom(1024 * 1024) * big_file_mb)
+    return root, paths, big_file
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def start_server(mode, volumes):
+    """Start the app in the given mode and wait until it answers health checks"""
+    port = free_port()
+    env = dict(os.environ, DATA_PATH=volumes['data'], CONFIG_PATH=volumes['config'],
+               LOG_PATH=volumes['logs'], PYTHONUNBUFFERED='1')
+    process = subprocess.Popen(SERVER_COMMANDS[mode](port), cwd=APP_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{mode} server exited with code {process.returncode}")
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/api/health", timeout=1)
+            return process, port
+        except Exception:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"{mode} server did not start")
+
+async def http_get(port, path, read_size=65536, read_delay=0.0, stop=None):
+    """
+    GET path over a new connection and read the whole response.
+    With read_delay, sleeps between reads to act as a slow client.
+    Returns the number of bytes received.
+    """
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n".encode())
+        await writer.drain()
+        received = 0
+        while True:
+            data = await reader.read(read_size)
+            if not data:
+                break
+            received += len(data)
+            if read_delay:
+                if stop is not None and stop.is_set():
+                    break
+                await asyncio.sleep(read_delay)
+        return received
+    finally:
+        writer.close()
+
+async def slow_client(port, path, stop, stats):
+    while not stop.is_set():
+        try:
+            stats['slow_connected'] += 1
+            await http_get(port, path, read_size=4096, read_delay=0.1, stop=stop)
+        except Exception:
+            stats['slow_errors'] += 1
+        finally:
+            stats['slow_connected'] -= 1
+
+async def fast_client(port, path, stop, latencies, stats):
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(http_get(port, path), timeout=10)
+            latencies.append(time.perf_counter() - started)
+        except Exception:
+            stats['fast_errors'] += 1
+
+async def run_load(port, big_file, slow_clients, fast_clients, duration):
+    stop = asyncio.Event()
+    stats = {'slow_connected': 0, 'slow_errors': 0, 'fast_errors': 0}
+    latencies = []
+    slow_path = f"/view-file?path={big_file}&raw=1"
+    tasks = [asyncio.create_task(slow_client(port, slow_path, stop, stats)) for _ in range(slow_clients)]
+    # Let the slow clients connect before measuring
+    await asyncio.sleep(2)
+    started = time.perf_counter()
+    tasks += [asyncio.create_task(fast_client(port, '/api/info', stop, latencies, stats))
+              for _ in range(fast_clients)]
+    await asyncio.sleep(duration)
+    elapsed = time.perf_counter() - started
+    peak_slow = stats['slow_connected']
+    stop.set()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return latencies, elapsed, peak_slow, stats
+
+def percentile(values, fraction):
+    if not values:
+        return float('nan')
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--slow-clients', type=int, default=500)
+    parser.add_argument('--fast-clients', type=int, default=10)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--file-mb', type=int, default=64)
+    parser.add_argument('--modes', default='wsgi,asgi')
+    args = parser.parse_args()
+
+    root, volumes, big_file = make_volumes(args.file_mb)
+    try:
+        compare_modes(args, volumes, big_file)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+def compare_modes(args, volumes, big_file):
+    print(f"{'mode':<6} {'slow held':>9} {'RPS':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for mode in args.modes.split(','):
+        try:
+            process, port = start_server(mode, volumes)
+        except RuntimeError as e:
+            print(f"{mode:<6} skipped: {e}")
+            continue
+        try:
+            latencies, elapsed, peak_slow, stats = asyncio.run(
+                run_load(port, big_file, args.slow_clients, args.fast_clients, args.duration))
+        finally:
+            process.terminate()
+            process.wait()
+        errors = stats['fast_errors'] + stats['slow_errors']
+        print(f"{mode:<6} {peak_slow:>9} {len(latencies) / elapsed:>8.1f} "
+              f"{percentile(latencies, 0.5) * 1000:>8.1f} {percentile(latencies, 0.99) * 1000:>8.1f} "
+              f"{errors:>7}")
+        if latencies:
+            print(f"       mean {statistics.mean(latencies) * 1000:.1f} ms over {len(latencies)} requests")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark
+=================
+
+Measures how long a fresh process takes to import app.py and to answer its
+first request (which starts the background services), reports the slowest
+imports as seen by `python -X importtime`, and fails if the median time to
+first response is over the startup budget.
+
+Usage:
+    python bench/bench_startup.py [--runs 5] [--budget-ms 1000] [--top 15]
+
+Exit status is 1 when the budget is exceeded, so this can gate a CI job.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child process: time the import and the first request. The
+# result goes to a file because the app's log listener shares stdout.
+PROBE = """
+import json, os, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.app.test_client().get('/api/health')
+served = time.perf_counter()
+with open(os.environ['STARTUP_RESULT_FILE'], 'w') as f:
+    json.dump({'import_ms': (imported - started) * 1000,
+               'first_request_ms': (served - imported) * 1000,
+               'stages': app.startup_report()}, f)
+"""
+
+def run_probe(env, importtime=False):
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    command += ['-c', PROBE]
+    with tempfile.NamedTemporaryFile(suffix='.json') as result_file:
+        env = dict(env, STARTUP_RESULT_FILE=result_file.name)
+        result = subprocess.run(command, cwd=APP_DIR, env=env, capture_output=True, text=True, check=True)
+        timings = json.load(result_file)
+    return timings, result.stderr
+
+def slowest_imports(importtime_output, top):
+    """Return the top-level imports with the largest cumulative time (us)"""
+    imports = []
+    for line in importtime_output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        # "import time:  <self> | <cumulative> | <indent><module>", indented
+        # by two spaces per level of nesting
+        _, cumulative_us, module = line.split('|')
+        depth = (len(module) - len(module.lstrip()) - 1) // 2
+        if depth == 0:
+            imports.append((int(cumulative_us), module.strip()))
+    return sorted(imports, reverse=True)[:top]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=1000.0)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    volumes = tempfile.mkdtemp(prefix='k8s-bench-')
+    env = dict(os.environ)
+    for name, variable in (('data', 'DATA_PATH'), ('config', 'CONFIG_PATH'), ('logs', 'LOG_PATH')):
+        os.makedirs(os.path.join(volumes, name))
+        env[variable] = os.path.join(volumes, name)
+
+    try:
+        runs = [run_probe(env)[0] for _ in range(args.runs)]
+        _, importtime_output = run_probe(env, importtime=True)
+    finally:
+        shutil.rmtree(volumes, ignore_errors=True)
+
+    import_ms = statistics.median(run['import_ms'] for run in runs)
+    first_request_ms = statistics.median(run['first_request_ms'] for run in runs)
+    total_ms = statistics.median(run['import_ms'] + run['first_request_ms'] for run in runs)
+
+    print("Slowest top-level imports (python -X importtime, cumulative):")
+    for cumulative_us, module in slowest_imports(importtime_output, args.top):
+        print(f"  {module:<30} {cumulative_us / 1000:8.1f} ms")
+    print("\nModule body stages (app.startup_report):")
+    for stage, ms in runs[-1]['stages']:
+        print(f"  {stage:<30} {ms:8.2f} ms")
+    print(f"\nMedian of {args.runs} runs:")
+    print(f"  import app                     {import_ms:8.1f} ms")
+    print(f"  first request                  {first_request_ms:8.1f} ms")
+    print(f"  time to first response         {total_ms:8.1f} ms  (budget {args.budget_ms:.0f} ms)")
+
+    if total_ms > args.budget_ms:
+        print("FAIL: startup budget exceeded")
+        sys.exit(1)
+    print("OK: within startup budget")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Dashboard template benchmark
+============================
+
+Compares the old way of rendering the index page (render_template_string on
+every request, which parses and compiles the template source each time) with
+the dashboard template that app.py compiles once per process.
+
+Usage:
+    python bench/bench_template.py [--requests N]
+
+The mounted volumes are replaced with temporary directories so the benchmark
+can run on any machine.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Point the app at temporary volumes before importing it
+_volumes = tempfile.mkdtemp(prefix='k8s-bench-')
+for _name in ('data', 'config', 'logs'):
+    os.makedirs(os.path.join(_volumes, _name), exist_ok=True)
+os.environ.setdefault('DATA_PATH', os.path.join(_volumes, 'data'))
+os.environ.setdefault('CONFIG_PATH', os.path.join(_volumes, 'config'))
+os.environ.setdefault('LOG_PATH', os.path.join(_volumes, 'logs'))
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import logging  # noqa: E402
+
+from flask import render_template_string  # noqa: E402
+
+import app as k8s_app  # noqa: E402
+
+# Per-request INFO logging would dominate the timings
+logging.disable(logging.INFO)
+
+
+def sample_context():
+    """Build a representative dashboard context with a few files per volume"""
+    files = [f'file-{i}.txt' for i in range(20)]
+
+    def volume(path):
+        return {'path': path, 'files': files, 'count': len(files), 'status': 'mounted'}
+
+    return {
+        'app_name': k8s_app.APP_NAME,
+        'app_version': k8s_app.APP_VERSION,
+        'environment': k8s_app.ENVIRONMENT,
+        'instance_id': k8s_app.INSTANCE_ID,
+        'system_info': {
+            'hostname': 'bench', 'platform': 'bench', 'python_version': '3',
+            'cpu_count': 1, 'memory': '1.0 MB', 'uptime': '1.0 seconds'
+        },
+        'resource_usage': {'cpu_percent': 1.0, 'memory_percent': 1.0, 'disk_usage': '1%'},
+        'volumes': {
+            'data': volume(k8s_app.DATA_PATH),
+            'config': volume(k8s_app.CONFIG_PATH),
+            'logs': volume(k8s_app.LOG_PATH)
+        },
+        'request_count': 1,
+        'metrics': k8s_app.application_metrics(),
+        'data_path': k8s_app.DATA_PATH,
+        'config_path': k8s_app.CONFIG_PATH,
+        'log_path': k8s_app.LOG_PATH,
+        'secret_key': k8s_app.SECRET_KEY,
+        'css_version': k8s_app.DASHBOARD_CSS_ETAG
+    }
+
+
+def timed(label, func, n):
+    """Run func n times and print the achieved rate"""
+    func()  # warm up
+    start = time.perf_counter()
+    for _ in range(n):
+        func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {n / elapsed:>10.1f} /sec  ({elapsed / n * 1e6:.1f} us each)")
+    return n / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    context = sample_context()
+    flask_app = k8s_app.app
+
+    print("Template render only")
+    with flask_app.test_request_context('/'):
+        before = timed("render_template_string (before)",
+                       lambda: render_template_string(k8s_app.DASHBOARD_TEMPLATE_SOURCE, **context),
+                       args.requests)
+        after = timed("precompiled dashboard_template() (after)",
+                      lambda: k8s_app.dashboard_template().render(**context),
+                      args.requests)
+    print(f"Speedup: {after / before:.1f}x\n")
+
+    print("Full GET / through the test client")
+    client = flask_app.test_client()
+    timed("GET /", lambda: client.get('/'), args.requests)
+    timed("GET /assets/dashboard.css", lambda: client.get('/assets/dashboard.css'), args.requests)
+    etag = client.get('/assets/dashboard.css').headers['ETag']
+    timed("GET /assets/dashboard.css (304)",
+          lambda: client.get('/assets/dashboard.css', headers={'If-None-Match': etag}),
+          args.requests)
+
+
+if __name__ == '__main__':
+    main()
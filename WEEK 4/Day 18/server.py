@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Kubernetes Master Application - production launcher
+===================================================
+
+Runs app.py under gunicorn with several preforked worker processes, each
+serving requests on a pool of threads, instead of the single-process Flask
+development server.
+
+- The application is imported once in the master process (preload) and the
+  workers are forked from it, so they share its memory pages.
+- Background services (log listener, stats sampler, volume watcher, health
+  checks) are started in each worker after the fork.
+- Metrics from all workers are merged through METRICS_MULTIPROC_DIR, so
+  /api/metrics and /metrics report totals for the whole pod.
+- Each worker runs at most THREADS - 1 requests at a time besides the
+  health and metrics endpoints (see app.py's admission control), so a
+  thread is always free for /api/health even when every other request is slow.
+  Log stream followers hold a thread for as long as they are connected, so
+  they get STREAM_THREADS extra threads of their own instead.
+- SIGHUP starts a fresh set of workers and gracefully stops the old ones
+  once they finish their in-flight requests; SIGTERM shuts down gracefully.
+
+Configuration (environment variables):
+    PORT                 port to listen on (default 5000)
+    WORKERS              worker processes (default 2 x CPUs + 1)
+    THREADS              threads per worker (default 4)
+    STREAM_THREADS       extra threads per worker for /api/logs/stream
+                         followers, and the most a worker accepts (default 2)
+    TIMEOUT              seconds before a silent worker is restarted (default 30)
+    GRACEFUL_TIMEOUT     seconds workers get to finish on reload/shutdown (default 30)
+    KEEPALIVE            seconds to keep idle connections open (default 5)
+    MAX_REQUESTS         restart a worker after this many requests, 0 = never (default 0)
+    PRELOAD              1 to import the app in the master (default 1); set to 0
+                         if SIGHUP should also pick up new application code
+    ADMISSION_MAX_INFLIGHT  requests a worker runs at once apart from the
+                         health and metrics endpoints (default THREADS - 1)
+
+Usage:
+    python server.py
+
+Requires gunicorn (pip install gunicorn).
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+PORT = int(os.environ.get('PORT', '5000'))
+WORKERS = int(os.environ.get('WORKERS', str((os.cpu_count() or 1) * 2 + 1)))
+THREADS = int(os.environ.get('THREADS', '4'))
+STREAM_THREADS = int(os.environ.get('STREAM_THREADS', '2'))
+TIMEOUT = int(os.environ.get('TIMEOUT', '30'))
+GRACEFUL_TIMEOUT = int(os.environ.get('GRACEFUL_TIMEOUT', '30'))
+KEEPALIVE = int(os.environ.get('KEEPALIVE', '5'))
+MAX_REQUESTS = int(os.environ.get('MAX_REQUESTS', '0'))
+PRELOAD = os.environ.get('PRELOAD', '1') == '1'
+
+def prepare_metrics_dir():
+    """
+    Give the workers a shared, empty directory for their metrics files.
+    This must happen before app.py is imported because it reads
+    METRICS_MULTIPROC_DIR at import time.
+    """
+    metrics_dir = os.environ.get('METRICS_MULTIPROC_DIR')
+    if not metrics_dir:
+        metrics_dir = tempfile.mkdtemp(prefix='k8s-metrics-')
+        os.environ['METRICS_MULTIPROC_DIR'] = metrics_dir
+    os.makedirs(metrics_dir, exist_ok=True)
+    # Files left over from a previous run would be counted again
+    for filename in os.listdir(metrics_dir):
+        if filename.startswith('metrics_') and filename.endswith('.db'):
+            os.remove(os.path.join(metrics_dir, filename))
+    return metrics_dir
+
+def reserve_health_thread():
+    """
+    Leave one of each worker's threads for the endpoints admission control
+    exempts, and keep log stream followers on their own STREAM_THREADS.
+    Like METRICS_MULTIPROC_DIR, app.py reads these at import time.
+    """
+    os.environ.setdefault('ADMISSION_MAX_INFLIGHT', str(max(1, THREADS - 1)))
+    os.environ.setdefault('ADMISSION_SEPARATE', f'stream_log={STREAM_THREADS}')
+
+def post_fork(server, worker):
+    """gunicorn hook: start the background threads inside the new worker"""
+    import app
+    app.start_background_services()
+
+def on_exit(server):
+    """gunicorn hook: remove the metrics directory if we created it"""
+    metrics_dir = os.environ.get('METRICS_MULTIPROC_DIR', '')
+    if os.path.basename(metrics_dir).startswith('k8s-metrics-'):
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+
+def gunicorn_options():
+    return {
+        'bind': f"0.0.0.0:{PORT}",
+        'workers': WORKERS,
+        'threads': THREADS + STREAM_THREADS,
+        # gthread serves each worker's connections from a pool of threads
+        'worker_class': 'gthread' if THREADS + STREAM_THREADS > 1 else 'sync',
+        'timeout': TIMEOUT,
+        'graceful_timeout': GRACEFUL_TIMEOUT,
+        'keepalive': KEEPALIVE,
+        'max_requests': MAX_REQUESTS,
+        'max_requests_jitter': MAX_REQUESTS // 10,
+        'preload_app': PRELOAD,
+        'post_fork': post_fork,
+        'on_exit': on_exit,
+        # The app already logs requests through its own pipeline
+        'accesslog': None,
+        'errorlog': '-',
+    }
+
+def main():
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        sys.exit("gunicorn is required for the production launcher: pip install gunicorn")
+
+    class K8sMasterServer(BaseApplication):
+        """Embeds gunicorn so the launcher is configured from the environment"""
+        def __init__(self, options):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            import app
+            return app.app
+
+    prepare_metrics_dir()
+    reserve_health_thread()
+    print(f"Starting gunicorn on port {PORT} with {WORKERS} workers x {THREADS} threads "
+          f"(+{STREAM_THREADS} for log streams)")
+    K8sMasterServer(gunicorn_options()).run()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,24 @@
+"""
+Shared setup for the tests. app.py reads its configuration at import time,
+so the temporary volumes and limits are set here, before any test module
+imports it.
+
+Run from WEEK 4/Day 18 with:
+    python -m pytest -q tests
+"""
+import os
+import sys
+import tempfile
+
+_volumes = tempfile.mkdtemp(prefix='k8s-test-')
+for _name in ('data', 'config', 'logs'):
+    os.makedirs(os.path.join(_volumes, _name), exist_ok=True)
+os.environ['DATA_PATH'] = os.path.join(_volumes, 'data')
+os.environ['CONFIG_PATH'] = os.path.join(_volumes, 'config')
+os.environ['LOG_PATH'] = os.path.join(_volumes, 'logs')
+os.environ['ADMISSION_CONCURRENCY'] = 'view_file=2'
+os.environ['ADMISSION_SEPARATE'] = 'stream_log=2'
+os.environ['ADMISSION_MAX_INFLIGHT'] = '3'
+os.environ['ADMISSION_RATES'] = ''
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,55 @@
+"""Admission control regression tests (limits are set in conftest.py)"""
+import os
+import unittest
+
+import app as k8s_app
+
+VIEW_FILE_LIMIT = k8s_app.admission.limits['view_file']
+STREAM_LIMIT = k8s_app.admission.limits['stream_log']
+MAX_INFLIGHT = k8s_app.admission.max_inflight
+
+
+class RawDownloadAdmissionTest(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(os.environ['DATA_PATH'], 'download.txt')
+        with open(self.path, 'w') as f:
+            f.write('hello\n' * 100)
+        self.client = k8s_app.app.test_client()
+
+    def test_raw_downloads_release_their_slot(self):
+        # One more download than the endpoint admits at once: every slot has
+        # to come back when a send_file response finishes
+        for _ in range(VIEW_FILE_LIMIT + 1):
+            response = self.client.get('/view-file', query_string={'path': self.path, 'raw': '1'})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data, b'hello\n' * 100)
+            response.close()
+
+    def test_streamed_views_release_their_slot(self):
+        for _ in range(VIEW_FILE_LIMIT + 1):
+            response = self.client.get('/view-file', query_string={'path': self.path})
+            self.assertEqual(response.status_code, 200)
+            response.close()
+
+
+class LogStreamAdmissionTest(unittest.TestCase):
+    def setUp(self):
+        with open(os.path.join(os.environ['LOG_PATH'], 'stream.log'), 'a') as f:
+            f.write('started\n')
+        self.client = k8s_app.app.test_client()
+
+    def test_log_streams_have_their_own_lane(self):
+        streams = []
+        try:
+            # As many followers as the global cap would allow requests
+            for _ in range(MAX_INFLIGHT):
+                streams.append(self.client.get('/api/logs/stream', query_string={'file': 'stream.log'},
+                                               buffered=False))
+            self.assertEqual([r.status_code for r in streams], [200] * STREAM_LIMIT + [503])
+            self.assertEqual(self.client.get('/api/info').status_code, 200)
+            self.assertEqual(self.client.get('/').status_code, 200)
+        finally:
+            for response in streams:
+                response.close()
+        self.assertEqual(k8s_app.admission.inflight['stream_log'], 0)
+        self.assertEqual(k8s_app.admission.total, 0)
@@ -0,0 +1,105 @@
+"""Log rotation tests: segments, compression, expiry and reading a log from a time"""
+import datetime
+import glob
+import os
+import unittest
+from unittest import mock
+
+import app as k8s_app
+
+BACKUP_COUNT = 3
+ROUNDS = BACKUP_COUNT + 2
+# A round a minute, starting on a minute boundary a day ago
+START = (datetime.datetime.now() - datetime.timedelta(days=1)).replace(second=0, microsecond=0).timestamp()
+
+
+def round_start(number):
+    return START + 60 * number
+
+
+def log_line(when, text):
+    stamp = datetime.datetime.fromtimestamp(when).strftime('%Y-%m-%d %H:%M:%S')
+    return f"{stamp},000 - k8s-master-app - INFO -{text}\n"
+
+
+class LogRotationTest(unittest.TestCase):
+    """
+    Every round writes lines 10s apart, then runs the maintenance job 30s in:
+    the file rotates each time (LOG_ROTATE_BYTES=1), segments older than a
+    minute are gzipped and only BACKUP_COUNT segments are kept.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.path = os.path.join(os.environ['LOG_PATH'], 'rotation.log')
+        cls.handler = k8s_app.BatchFileHandler(cls.path, delay=True)
+        settings = {'LOG_ROTATE_BYTES': 1, 'LOG_ROTATE_INTERVAL': 0, 'LOG_BACKUP_COUNT': BACKUP_COUNT,
+                    'LOG_COMPRESS_DELAY': 60}
+        with mock.patch.multiple(k8s_app, **settings):
+            for number in range(ROUNDS):
+                cls.write_round(number)
+                k8s_app.maintain_log_file(cls.handler, round_start(number) + 30)
+        # Lines in the active file, after the last rotation
+        cls.write_round(ROUNDS)
+        cls.client = k8s_app.app.test_client()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.handler.close()
+
+    @classmethod
+    def write_round(cls, number):
+        with open(cls.path, 'a') as f:
+            for line in range(3):
+                f.write(log_line(round_start(number) + 10 * line, f"round {number} line {line}"))
+
+    def segments(self):
+        return k8s_app.log_segments(self.path)['segments']
+
+    def view_log(self, at):
+        response = self.client.get('/view-log', query_string={'file': 'rotation.log', 'at': repr(at)})
+        try:
+            self.assertEqual(response.status_code, 200)
+            return response.get_data(as_text=True)
+        finally:
+            # The page is streamed, so it holds an admission slot until closed
+            response.close()
+
+    def test_keeps_backup_count_segments(self):
+        segments = self.segments()
+        self.assertEqual(len(segments), BACKUP_COUNT)
+        on_disk = sorted(os.path.basename(path) for path in glob.glob(self.path + '.*'))
+        self.assertEqual(on_disk, sorted(segment['file'] for segment in segments))
+        # The oldest rounds were expired; the newest segment ends at the last rotation
+        self.assertEqual([segment['end'] for segment in segments],
+                         [round_start(number) + 30 for number in range(ROUNDS - BACKUP_COUNT, ROUNDS)])
+
+    def test_compresses_segments_after_the_delay(self):
+        segments = self.segments()
+        self.assertEqual([segment['compressed'] for segment in segments], [True] * (BACKUP_COUNT - 1) + [False])
+        for segment in segments[:-1]:
+            self.assertTrue(segment['file'].endswith('.gz'))
+            self.assertGreater(segment['size'], 0)
+
+    def test_view_log_finds_the_line_at_a_time(self):
+        # In a gzipped segment, in the newest plain one and in the active file
+        for number in (ROUNDS - BACKUP_COUNT, ROUNDS - 1, ROUNDS):
+            page = self.view_log(round_start(number) + 5)
+            self.assertNotIn(f"round {number} line 0", page)
+            self.assertIn(f"round {number} line 1", page)
+
+    def test_view_log_after_the_last_line_of_a_segment(self):
+        # Between a segment's last line and its end: the log continues in the next file
+        page = self.view_log(round_start(ROUNDS - 1) + 25)
+        self.assertNotIn(f"round {ROUNDS - 1} line", page)
+        self.assertIn(f"round {ROUNDS} line 0", page)
+
+    def test_view_log_before_the_oldest_segment(self):
+        # Expired times start at the oldest line still kept
+        page = self.view_log(START)
+        self.assertNotIn("round 0 line", page)
+        self.assertIn(f"round {ROUNDS - BACKUP_COUNT} line 0", page)
+
+    def test_segments_endpoint(self):
+        document = self.client.get('/api/logs/segments', query_string={'file': 'rotation.log'}).get_json()
+        self.assertEqual([segment['file'] for segment in document['segments']],
+                         [segment['file'] for segment in self.segments()])
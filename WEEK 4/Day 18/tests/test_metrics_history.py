@@ -0,0 +1,94 @@
+"""Metrics history tests: ring buffers, choosing a level and downsampling"""
+import time
+import unittest
+
+import app as k8s_app
+
+# Levels small enough to fill: 10 x 1s, 6 x 5s and 4 x 30s
+LEVELS = ((1.0, 10), (5.0, 6), (30.0, 4))
+
+
+class RingBufferTest(unittest.TestCase):
+    def test_wraps_around_and_keeps_the_newest_rows(self):
+        ring = k8s_app.RingBuffer(4, 1)
+        for timestamp in range(1, 7):
+            ring.append(float(timestamp), [timestamp * 10.0])
+        self.assertEqual(ring.count, 4)
+        self.assertEqual(ring.since(0), [[3.0, 4.0, 5.0, 6.0], [30.0, 40.0, 50.0, 60.0]])
+        self.assertEqual(ring.since(4.5), [[5.0, 6.0], [50.0, 60.0]])
+        self.assertEqual(ring.since(7), [[], []])
+
+    def test_partly_filled(self):
+        ring = k8s_app.RingBuffer(4, 1)
+        self.assertEqual(ring.since(0), [[], []])
+        ring.append(1.0, [1.0])
+        ring.append(2.0, [2.0])
+        self.assertEqual(ring.since(2), [[2.0], [2.0]])
+
+
+class MetricsHistoryTest(unittest.TestCase):
+    def setUp(self):
+        self.history = k8s_app.MetricsHistory(LEVELS, ('value',))
+        # A minute of one sample per second, value = seconds since start,
+        # ending just before now and starting on a 30s boundary
+        self.start = (time.time() // 30) * 30 - 60
+        for second in range(60):
+            self.history.record(self.start + second, [float(second)])
+
+    def test_level_for_range(self):
+        steps = {range_seconds: self.history.level_for(range_seconds, None).step
+                 for range_seconds in (1, 10, 11, 30, 31, 120, 10000)}
+        # The finest level whose buffer spans the range, else the coarsest
+        self.assertEqual(steps, {1: 1.0, 10: 1.0, 11: 5.0, 30: 5.0, 31: 30.0, 120: 30.0, 10000: 30.0})
+
+    def test_level_for_step(self):
+        steps = {step: self.history.level_for(10000, step).step for step in (0.5, 1, 4, 5, 29, 30, 60)}
+        # The coarsest level that is no coarser than the step
+        self.assertEqual(steps, {0.5: 1.0, 1: 1.0, 4: 1.0, 5: 5.0, 29: 5.0, 30: 30.0, 60: 30.0})
+
+    def test_finest_level_keeps_the_last_samples(self):
+        step, columns = self.history.query(10000, 1)
+        self.assertEqual(step, 1.0)
+        self.assertEqual(columns[1], [float(second) for second in range(50, 60)])
+
+    def test_levels_average_each_step(self):
+        # 5s level: the last 6 finished buckets plus the one still being averaged
+        step, (timestamps, values) = self.history.query(10000, 5)
+        self.assertEqual(step, 5.0)
+        self.assertEqual(timestamps, [self.start + offset for offset in range(25, 60, 5)])
+        self.assertEqual(values, [offset + 2.0 for offset in range(25, 60, 5)])
+
+        step, (timestamps, values) = self.history.query(10000, None)
+        self.assertEqual(step, 30.0)
+        self.assertEqual(timestamps, [self.start, self.start + 30])
+        self.assertEqual(values, [14.5, 44.5])
+
+    def test_steps_between_levels_are_downsampled(self):
+        # 10s is built from the 5s level, two of its points at a time
+        step, (timestamps, values) = self.history.query(10000, 10)
+        self.assertEqual(step, 10)
+        self.assertEqual(timestamps, [self.start + offset for offset in (20, 30, 40, 50)])
+        self.assertEqual(values, [27.0, 34.5, 44.5, 54.5])
+
+    def test_range_limits_the_rows(self):
+        # A range reaching 2.5s before the newest sample: older rows are left out
+        newest = self.start + 59
+        _, (timestamps, _) = self.history.query(time.time() - newest + 2.5, 1)
+        self.assertEqual(timestamps, [newest - 2, newest - 1, newest])
+
+
+class HistoryEndpointTest(unittest.TestCase):
+    def setUp(self):
+        self.client = k8s_app.app.test_client()
+
+    def test_default_range(self):
+        document = self.client.get('/api/metrics/history').get_json()
+        self.assertEqual(document['range_seconds'], 900)
+        self.assertEqual(document['step_seconds'], k8s_app.HISTORY_INTERVAL)
+        self.assertEqual(set(document['series']), set(k8s_app.HISTORY_FIELDS))
+
+    def test_rejects_bad_arguments(self):
+        for query in ({'range': '7d', 'step': '1s'}, {'range': 'soon'}, {'range': '1h', 'step': '0'}):
+            response = self.client.get('/api/metrics/history', query_string=query)
+            self.assertEqual(response.status_code, 400, query)
+            self.assertIn('error', response.get_json())
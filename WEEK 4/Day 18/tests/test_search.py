@@ -0,0 +1,128 @@
+"""Search index tests: the in-memory delta, merges into the mapped file and deletes"""
+import os
+import shutil
+import tempfile
+import unittest
+
+import app as k8s_app
+
+
+class SearchIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.volume = tempfile.mkdtemp(dir=os.environ['DATA_PATH'])
+        self.volumes = {'data': self.volume}
+        self._saved_volumes = k8s_app.SEARCH_VOLUMES
+        k8s_app.SEARCH_VOLUMES = self.volumes
+        os.makedirs(k8s_app.SEARCH_INDEX_DIR, exist_ok=True)
+        self.index_path = os.path.join(k8s_app.SEARCH_INDEX_DIR, f'test-{id(self)}.idx')
+        self.index = k8s_app.SearchIndex(self.index_path)
+
+    def tearDown(self):
+        k8s_app.SEARCH_VOLUMES = self._saved_volumes
+        shutil.rmtree(self.volume)
+        if os.path.exists(self.index_path):
+            os.remove(self.index_path)
+
+    def write(self, name, text, mode='w'):
+        with open(os.path.join(self.volume, name), mode) as f:
+            f.write(text)
+        return self.index.update_file('data', name)
+
+    def replace(self, name, text):
+        """Rewrite a file the way uploads do: a new file renamed over the old one"""
+        with open(os.path.join(self.volume, '.tmp'), 'w') as f:
+            f.write(text)
+        os.replace(os.path.join(self.volume, '.tmp'), os.path.join(self.volume, name))
+        return self.index.update_file('data', name)
+
+    def remove(self, name):
+        os.remove(os.path.join(self.volume, name))
+        return self.index.update_file('data', name)
+
+    def names(self, query, index=None):
+        terms = k8s_app.search_terms(query.encode('utf-8'))
+        return sorted(doc[1] for doc in (index or self.index).search(terms))
+
+    def assert_results(self, expected):
+        """Check every query against this index and a fresh reader of the file"""
+        reader = k8s_app.SearchIndex(self.index_path)
+        for query, names in expected.items():
+            self.assertEqual(self.names(query), names, query)
+            if os.path.exists(self.index_path):
+                self.assertEqual(self.names(query, reader), names, query)
+
+    def test_delta_answers_before_the_first_merge(self):
+        self.write('alpha.txt', 'apple banana')
+        self.write('beta.txt', 'banana cherry')
+        self.assertFalse(os.path.exists(self.index_path))
+        self.assertEqual(self.names('banana'), ['alpha.txt', 'beta.txt'])
+        self.assertEqual(self.names('banana apple'), ['alpha.txt'])
+        self.assertEqual(self.names('durian'), [])
+
+    def test_merge_keeps_results_and_empties_the_delta(self):
+        self.write('alpha.txt', 'apple banana')
+        self.write('beta.txt', 'banana cherry')
+        self.assertTrue(self.index.merge())
+        self.assertEqual(self.index.status()['delta_postings'], 0)
+        self.assertEqual(self.index.status()['terms'], 3)
+        self.assertFalse(self.index.merge())
+        self.assert_results({'banana': ['alpha.txt', 'beta.txt'], 'cherry': ['beta.txt'], 'apple banana': ['alpha.txt']})
+
+    def test_deletes_before_and_after_a_merge(self):
+        self.write('alpha.txt', 'apple banana')
+        self.write('beta.txt', 'banana cherry')
+        self.write('gamma.txt', 'cherry')
+        self.index.merge()
+
+        # Deleted after the merge: the file still has its postings, the doc is gone
+        self.assertTrue(self.remove('alpha.txt'))
+        self.assertEqual(self.names('banana'), ['beta.txt'])
+        self.assertEqual(self.names('apple'), [])
+        self.index.merge()
+        self.assert_results({'banana': ['beta.txt'], 'apple': [], 'cherry': ['beta.txt', 'gamma.txt']})
+        # Documents are renumbered and terms nobody contains are dropped
+        self.assertEqual(len(self.index.docs), 2)
+        self.assertEqual(self.index.status()['terms'], 2)
+
+        # Added and deleted again between merges
+        self.write('delta.txt', 'banana')
+        self.remove('beta.txt')
+        self.assertEqual(self.names('banana'), ['delta.txt'])
+        self.index.merge()
+        self.assert_results({'banana': ['delta.txt'], 'cherry': ['gamma.txt']})
+
+        # Merging away the last document leaves an empty index
+        self.remove('delta.txt')
+        self.remove('gamma.txt')
+        self.index.merge()
+        self.assert_results({'banana': [], 'cherry': []})
+        self.assertEqual(self.index.docs, [])
+
+    def test_rewritten_and_appended_files(self):
+        self.write('notes.txt', 'apple banana')
+        self.write('app.log', 'started\n')
+        self.index.merge()
+
+        # A replaced file is a new document; an append only adds terms
+        self.replace('notes.txt', 'cherry durian')
+        self.write('app.log', 'stopped\n', mode='a')
+        self.assertEqual(self.names('apple'), [])
+        self.assertEqual(self.names('durian'), ['notes.txt'])
+        self.assertEqual(self.names('started stopped'), ['app.log'])
+        self.index.merge()
+        self.assert_results({'apple': [], 'durian': ['notes.txt'], 'started stopped': ['app.log']})
+
+    def test_scan_notices_removed_files(self):
+        self.write('alpha.txt', 'apple')
+        self.write('beta.txt', 'apple')
+        self.index.merge()
+        os.remove(os.path.join(self.volume, 'alpha.txt'))
+        # scan() lists the volume through its DirectoryIndex
+        saved = k8s_app.volume_indexes.get('data')
+        k8s_app.volume_indexes['data'] = k8s_app.DirectoryIndex(self.volume)
+        try:
+            self.assertEqual(self.index.scan('data'), 1)
+        finally:
+            k8s_app.volume_indexes['data'] = saved
+        self.index.merge()
+        self.assert_results({'apple': ['beta.txt']})